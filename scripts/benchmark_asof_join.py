@@ -0,0 +1,66 @@
+import os
+import sys
+import argparse
+
+import pandas as pd
+import numpy as np
+
+from merge_datasets import (
+    ValuationIndex, calendar_year_join, parse_cutoff, season_cutoff_days, processed_dir,
+    SEASON_CUTOFF, MAX_VALUATION_AGE_DAYS,
+)
+from benchmark_utils import best_time
+
+repeats = 3
+
+
+# pandas.merge_asof on the same inputs, used to check the index lookups
+def reference_join(df_perf, df_market, cutoff):
+    perf = df_perf.assign(
+        cutoff_date=pd.to_datetime(season_cutoff_days(df_perf['season_start_year'], cutoff), unit='D').astype('datetime64[ns]'),
+        row=np.arange(len(df_perf)),
+    ).sort_values('cutoff_date', kind='stable')
+    market = df_market.assign(date_unix=pd.to_datetime(df_market['date_unix'], errors='coerce').astype('datetime64[ns]'))
+    market = market.dropna(subset=['date_unix', 'value']).sort_values('date_unix', kind='stable')
+    joined = pd.merge_asof(
+        perf, market[['player_id', 'date_unix', 'value']],
+        left_on='cutoff_date', right_on='date_unix', by='player_id',
+        tolerance=None if MAX_VALUATION_AGE_DAYS is None else pd.Timedelta(days=MAX_VALUATION_AGE_DAYS),
+    )
+    return joined.sort_values('row')['value'].to_numpy()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the as-of valuation join with the calendar-year merge")
+    parser.add_argument('--cutoff', type=parse_cutoff, default=SEASON_CUTOFF, help="In-season cutoff date MM-DD")
+    args = parser.parse_args(argv)
+
+    df_perf = pd.read_csv(os.path.join(processed_dir, 'player_performances_clean_2000.csv'))
+    df_market = pd.read_csv(os.path.join(processed_dir, 'player_market_value_clean.csv'))
+    print(f"Performances: {len(df_perf):,} rows, valuations: {len(df_market):,} rows")
+
+    calendar_time, calendar = best_time(lambda: calendar_year_join(df_perf, df_market), repeats)
+    index_time, valuations = best_time(lambda: ValuationIndex(df_market), repeats)
+    lookup_time, asof = best_time(lambda: valuations.join(df_perf, args.cutoff), repeats)
+
+    results = pd.DataFrame({
+        'rows_out': [len(calendar), len(asof)],
+        'rows_with_value': [int(calendar['value'].notna().sum()), int(asof['value'].notna().sum())],
+        'seconds': [calendar_time, index_time + lookup_time],
+    }, index=['Calendar-year merge (before)', 'As-of join'])
+    results['rows_per_input_row'] = results['rows_out'] / len(df_perf)
+
+    pd.options.display.float_format = '{:,.3f}'.format
+    print(results.to_string())
+    print(f"\nAs-of join: index build {index_time:.3f}s, lookups {lookup_time:.3f}s")
+
+    expected = reference_join(df_perf, df_market, args.cutoff)
+    same = np.array_equal(np.isnan(expected), np.isnan(asof['value'].to_numpy())) and np.allclose(
+        expected[~np.isnan(expected)], asof['value'].to_numpy()[~np.isnan(expected)])
+    print(f"Matches pandas.merge_asof: {same}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
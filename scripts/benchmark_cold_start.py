@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+cli_path = os.path.join(script_dir, '..', 'src', 'cli.py')
+sys.path.insert(0, os.path.join(script_dir, '..', 'src'))
+
+from cli import COMMANDS
+
+
+# Top-level imports from python -X importtime output: (module, cumulative seconds).
+# Nested imports are indented under their parent and already counted in its cumulative time.
+def top_level_imports(stderr):
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if name.startswith('  '):
+            continue
+        imports.append((name.strip(), int(cumulative) / 1e6))
+    return imports
+
+
+# Cold start of one subcommand: a fresh interpreter running `<command> --help`,
+# which imports the subcommand's module and exits before doing any work.
+def cold_start(command):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', cli_path, command, '--help'],
+        capture_output=True, text=True,
+    )
+    wall_seconds = time.perf_counter() - start
+    imports = top_level_imports(result.stderr)
+    heaviest = sorted(imports, key=lambda x: -x[1])[:3]
+    return {
+        'command': command,
+        'wall_seconds': wall_seconds,
+        'import_seconds': sum(seconds for _, seconds in imports),
+        'heaviest': ', '.join(f"{name} {seconds:.2f}s" for name, seconds in heaviest),
+        'ok': result.returncode == 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of each CLI subcommand")
+    parser.add_argument('commands', nargs='*', help="Subcommands to measure (default: all)")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    results = pd.DataFrame([cold_start(c) for c in args.commands or COMMANDS])
+
+    pd.options.display.float_format = '{:,.3f}'.format
+    pd.options.display.max_colwidth = 80
+    print(results.to_string(index=False))
+
+    if not results['ok'].all():
+        print("\nFailed:", ', '.join(results.loc[~results['ok'], 'command']))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
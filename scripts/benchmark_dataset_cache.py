@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import pandas as pd
+import numpy as np
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'src'))
+
+import feature_store
+import train_model
+from dataset_cache import DatasetCache
+from experiment_store import ExperimentStore
+
+
+# The search as it ran before the dataset cache: every fit bins its fold from pandas
+def pandas_search(X_train, y_train, cv, n_iter):
+    import lightgbm as lgb
+    from sklearn.model_selection import RandomizedSearchCV
+
+    search = RandomizedSearchCV(
+        estimator=lgb.LGBMRegressor(random_state=42, n_jobs=-1, verbose=-1),
+        param_distributions=train_model.param_grid_lgb,
+        n_iter=n_iter,
+        scoring='neg_mean_absolute_error',
+        cv=cv,
+        n_jobs=1,
+        random_state=42,
+    )
+    search.fit(X_train, y_train)
+    return search.best_params_
+
+
+# An empty experiment store per run, so every candidate is fitted
+def cached_search(snapshot, train_rows, cv, n_iter, cache_dir):
+    cache = DatasetCache(snapshot, cache_dir=cache_dir)
+    store = ExperimentStore(tempfile.mkdtemp(dir=cache_dir), save_models=False)
+    params = train_model.tune_lgb(cache, train_rows, cv, n_iter=n_iter, store=store)
+    return params, cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the LGB search with and without the binned dataset cache")
+    parser.add_argument('--candidates', type=int, default=20, help="Search candidates (training uses 20)")
+    args = parser.parse_args(argv)
+
+    from sklearn.model_selection import TimeSeriesSplit
+
+    snapshot = feature_store.load_snapshot()
+    X_train, _, y_train, _, train_mask, _ = train_model.split_snapshot(snapshot)
+    train_rows = np.flatnonzero(train_mask)
+    cv = TimeSeriesSplit(n_splits=3)
+    print(f"Train rows: {len(train_rows)} x {X_train.shape[1]} features, {args.candidates} candidates x 3 folds")
+
+    # Cost of binning each fold once from pandas
+    import lightgbm as lgb
+    fold_bin_seconds = 0.0
+    for fold_train_idx, _ in cv.split(train_rows):
+        start = time.perf_counter()
+        lgb.Dataset(X_train.iloc[fold_train_idx], label=y_train.iloc[fold_train_idx], params={'verbose': -1}).construct()
+        fold_bin_seconds += time.perf_counter() - start
+
+    cache_dir = tempfile.mkdtemp(prefix='lgb_dataset_cache_')
+    try:
+        start = time.perf_counter()
+        pandas_params = pandas_search(X_train, y_train, cv, args.candidates)
+        pandas_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cold_params, cold_cache = cached_search(snapshot, train_rows, cv, args.candidates, cache_dir)
+        cold_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm_params, warm_cache = cached_search(snapshot, train_rows, cv, args.candidates, cache_dir)
+        warm_time = time.perf_counter() - start
+    finally:
+        shutil.rmtree(cache_dir)
+
+    results = pd.DataFrame({
+        'seconds': [pandas_time, cold_time, warm_time],
+        'binning_seconds': [fold_bin_seconds * args.candidates, cold_cache.build_seconds, warm_cache.load_seconds],
+    }, index=['Re-bin every fit (before)', 'Cache, first run', 'Cache, later runs'])
+    results['binning_share'] = results['binning_seconds'] / results['seconds']
+    results['vs_before'] = results['seconds'] / pandas_time
+
+    pd.options.display.float_format = '{:,.3f}'.format
+    print(results)
+
+    print(f"\nSame best params: {pandas_params == cold_params == warm_params}")
+    print(f"Search wall time removed per later run: {pandas_time - warm_time:.1f}s "
+          f"({1 - warm_time / pandas_time:.0%})")
+
+
+if __name__ == '__main__':
+    main()
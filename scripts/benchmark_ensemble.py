@@ -0,0 +1,58 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'src'))
+
+import model_registry
+import feature_store
+from benchmark_utils import best_time
+
+batch_size = 50_000
+repeats = 5
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Time ensemble scoring against the single LGB model").parse_args(argv)
+
+    lgb_model, lgb_manifest = model_registry.load_model('lgb_market_value')
+    ensemble_model, ens_manifest = model_registry.load_model('ensemble_market_value')
+
+    snapshot = feature_store.load_snapshot()
+    snapshot.check(ens_manifest.get('schema_hash'))
+    X = snapshot.X.iloc[:batch_size]
+    print(f"Batch: {len(X)} rows x {X.shape[1]} features, best of {repeats} runs")
+
+    # Both paths start from the same snapshot rows, so conversion cost is included in each
+    single_time, _ = best_time(lambda: lgb_model.predict(X), repeats)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        ensemble_time, _ = best_time(lambda: ensemble_model.predict(X, executor=pool), repeats)
+
+    # Models run back to back for comparison with the threaded version
+    def score_sequential():
+        M = ensemble_model.to_matrix(X)
+        return ensemble_model._predict_lgb(M), ensemble_model._predict_hgb(M)
+
+    sequential_time, _ = best_time(score_sequential, repeats)
+
+    results = pd.DataFrame({
+        'seconds': [single_time, sequential_time, ensemble_time],
+    }, index=['LGB only', 'Ensemble (sequential)', 'Ensemble (threaded)'])
+    results['rows_per_sec'] = len(X) / results['seconds']
+    results['vs_single'] = results['seconds'] / single_time
+
+    pd.options.display.float_format = '{:,.3f}'.format
+    print(results)
+
+    ratio = ensemble_time / single_time
+    print(f"\nEnsemble costs {ratio:.2f}x single-model scoring (target <= 1.2x)")
+
+
+if __name__ == '__main__':
+    main()
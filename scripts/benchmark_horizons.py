@@ -0,0 +1,82 @@
+import os
+import sys
+import time
+import argparse
+
+import pandas as pd
+import numpy as np
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'src'))
+
+import feature_store
+import model_registry
+from horizons import HorizonModel
+from predict_model import distinct_feature_rows, horizon_model_name
+
+
+# Load the snapshot, find the distinct rows and gather them: the part a shared pass does only once
+def prepare():
+    snapshot = feature_store.load_snapshot()
+    scored_rows, _ = distinct_feature_rows(snapshot)
+    return np.ascontiguousarray(snapshot.matrix[scored_rows])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+# One horizon per pipeline run, each preparing its own matrix
+def separate_runs(model):
+    prepare_seconds = score_seconds = 0.0
+    columns = []
+    for i, h in enumerate(model.horizons):
+        M, seconds = timed(prepare)
+        prepare_seconds += seconds
+        single = HorizonModel([model.models[i]], [h], model.features)
+        P, seconds = timed(single.predict_horizons, M)
+        score_seconds += seconds
+        columns.append(P[:, 0])
+    return np.column_stack(columns), prepare_seconds, score_seconds
+
+
+# All horizons over one prepared matrix in one batched call
+def shared_run(model):
+    M, prepare_seconds = timed(prepare)
+    P, score_seconds = timed(model.predict_horizons, M)
+    return P, prepare_seconds, score_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time scoring all horizons together against one run per horizon")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    model, manifest = model_registry.load_model(horizon_model_name)
+    print(f"{horizon_model_name}:{manifest['version']}, horizons {list(model.horizons)}")
+
+    runs = {'One run per horizon (before)': separate_runs, 'Shared feature pass': shared_run}
+    best = {}
+    for _ in range(args.repeat):
+        for name, run in runs.items():
+            P, prepare_seconds, score_seconds = run(model)
+            if name not in best or prepare_seconds + score_seconds < sum(best[name][1:]):
+                best[name] = (P, prepare_seconds, score_seconds)
+
+    results = pd.DataFrame({
+        'prepare_seconds': [best[name][1] for name in runs],
+        'score_seconds': [best[name][2] for name in runs],
+    }, index=list(runs))
+    results['seconds'] = results['prepare_seconds'] + results['score_seconds']
+    results['vs_before'] = results['seconds'] / results['seconds'].iloc[0]
+    print(results.to_string(float_format='{:,.3f}'.format))
+
+    separate, shared = (best[name][0] for name in runs)
+    print(f"\nSame forecasts: {np.allclose(separate, shared)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import sys
+import time
+import argparse
+import tracemalloc
+
+import pandas as pd
+import numpy as np
+
+from profile_dataset import stages, profile_csv
+
+
+# What explore_master_dataset.py did: load the whole file, then dtypes, describe, nunique and isna
+def full_load_summary(path):
+    df = pd.read_csv(path, low_memory=False)
+    return df.dtypes, df.describe(), df.nunique(), df.isna().sum()
+
+
+def measure(fn, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn(path)
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the streaming profiler with a full-load pandas summary")
+    parser.add_argument('stage', nargs='?', default='raw-player_performances', choices=sorted(stages))
+    args = parser.parse_args(argv)
+    path = stages[args.stage]
+
+    full_seconds, full_mb, (_, describe, nunique, nulls) = measure(full_load_summary, path)
+    profile_seconds, profile_mb, report = measure(profile_csv, path)
+
+    print(f"{report['path']}: {report['rows']:,} rows, {len(report['columns'])} columns\n")
+    print(pd.DataFrame({
+        'seconds': [full_seconds, profile_seconds],
+        'peak_mb': [full_mb, profile_mb],
+    }, index=['Full load + describe/nunique/isna (before)', 'Streaming profile']).to_string(float_format='{:,.2f}'.format))
+
+    # Accuracy of the approximate statistics against the exact ones
+    columns = report['columns']
+    distinct_error = max(abs(columns[c]['distinct'] - nunique[c]) / max(nunique[c], 1) for c in columns)
+    exact_nulls = all(columns[c]['nulls'] == nulls[c] for c in columns)
+    numeric = [c for c in describe.columns if 'mean' in columns[c]]
+    mean_error = max((abs(columns[c]['mean'] - describe.loc['mean', c]) / max(abs(describe.loc['mean', c]), 1e-12)
+                      for c in numeric), default=0.0)
+    # Quantile error as the distance in rank, the usual guarantee of a sample-based sketch
+    df = pd.read_csv(path, usecols=numeric)
+    rank_error = 0.0
+    for c in numeric:
+        values = np.sort(df[c].dropna().to_numpy(dtype=np.float64))
+        for q in (0.25, 0.5, 0.75):
+            estimate = columns[c][f'p{int(q * 100):02d}']
+            low = np.searchsorted(values, estimate, side='left') / len(values)
+            high = np.searchsorted(values, estimate, side='right') / len(values)
+            rank_error = max(rank_error, max(0.0, low - q, q - high))
+
+    print(f"\nNull counts exact: {exact_nulls}")
+    print(f"Max relative error: distinct {distinct_error:.2%}, mean {mean_error:.2e}")
+    print(f"Max quantile rank error (p25/p50/p75): {rank_error:.2%}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
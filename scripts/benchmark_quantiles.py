@@ -0,0 +1,66 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'src'))
+
+import model_registry
+import feature_store
+from benchmark_utils import best_time
+
+batch_size = 50_000
+repeats = 5
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Time P10/P50/P90 scoring against the single LGB model").parse_args(argv)
+
+    lgb_model, lgb_manifest = model_registry.load_model('lgb_market_value')
+    quantile_model, q_manifest = model_registry.load_model('lgb_quantiles_market_value')
+
+    snapshot = feature_store.load_snapshot()
+    snapshot.check(q_manifest.get('schema_hash'))
+    X = snapshot.X.iloc[:batch_size]
+    print(f"Batch: {len(X)} rows x {X.shape[1]} features, best of {repeats} runs")
+
+    # Both paths start from the same snapshot rows, so conversion cost is included in each
+    point_time, _ = best_time(lambda: lgb_model.predict(X), repeats)
+
+    # Each quantile model converting its own input, the way separate predict calls would
+    def score_separately():
+        return np.column_stack([model.predict(X) for model in quantile_model.models])
+
+    separate_time, _ = best_time(score_separately, repeats)
+
+    with ThreadPoolExecutor(max_workers=len(quantile_model.models)) as pool:
+        batched_time, _ = best_time(lambda: quantile_model.predict_quantiles(X, executor=pool), repeats)
+
+    results = pd.DataFrame({
+        'seconds': [point_time, separate_time, batched_time],
+    }, index=['Point LGB', 'Quantiles (separate calls)', 'Quantiles (one pass)'])
+    results['rows_per_sec'] = len(X) / results['seconds']
+    results['vs_point'] = results['seconds'] / point_time
+
+    pd.options.display.float_format = '{:,.3f}'.format
+    print(results)
+
+    # Crossings in the raw model outputs, which the per-row sort in predict_quantiles removes
+    P = quantile_model.predict_quantiles(X, monotone=False)
+    crossed = np.any(np.diff(P, axis=1) < 0, axis=1)
+    print(f"\nRows with crossed quantiles before sorting: {int(crossed.sum())} ({crossed.mean():.2%})")
+    print(f"Rows with crossed quantiles after sorting: {int((np.diff(quantile_model.predict_quantiles(X), axis=1) < 0).any(axis=1).sum())}")
+
+    ratio = batched_time / point_time
+    per_model = separate_time / len(quantile_model.models) / point_time
+    print(f"Quantile bands cost {ratio:.2f}x point scoring (target < 2x), "
+          f"{per_model:.2f}x per quantile model on {os.cpu_count() or 1} cores")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import argparse
+
+import pandas as pd
+import numpy as np
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'src'))
+
+from feature_engineering import file_path
+from teammate_graph import add_teammate_features, teammate_features
+from benchmark_utils import best_time
+
+
+# The same features from pandas groupbys: one per aggregation level, plus a reindex for the previous season
+def groupby_teammate_features(df):
+    df = df.copy()
+    season_value = df.groupby(['player_id', 'season_start_year'])['value'].max()
+    prev = pd.MultiIndex.from_arrays([df['player_id'], df['season_start_year'] - 1])
+    prev_value = season_value.reindex(prev).to_numpy()
+    has_value = ~np.isnan(prev_value)
+
+    stints = df.assign(prev_value=np.where(has_value, prev_value, 0.0), has_value=has_value.astype(float),
+                       minutes=df['minutes_played'].fillna(0))
+    stints = stints.groupby(['player_id', 'team_id', 'season_start_year'], as_index=False).agg(
+        minutes=('minutes', 'sum'), prev_value=('prev_value', 'first'), has_value=('has_value', 'first'))
+    stints['value_x_minutes'] = stints['minutes'] * stints['prev_value']
+    stints['valued_minutes'] = stints['minutes'] * stints['has_value']
+    stints['valued_player'] = stints['has_value'] * (stints['minutes'] > 0)
+    team = stints.groupby(['team_id', 'season_start_year'])[['value_x_minutes', 'valued_minutes', 'valued_player']].sum()
+
+    keys = ['player_id', 'team_id', 'season_start_year']
+    rows = df[keys].merge(stints, on=keys, how='left').merge(
+        team, left_on=['team_id', 'season_start_year'], right_index=True, how='left', suffixes=('', '_team'))
+    value_sum = rows['value_x_minutes_team'] - rows['value_x_minutes']
+    minutes_sum = rows['valued_minutes_team'] - rows['valued_minutes']
+    df['teammate_prev_value_wavg'] = (value_sum / minutes_sum).where(minutes_sum > 0).to_numpy()
+    df['teammate_prev_value_pct'] = df.groupby('season_start_year')['teammate_prev_value_wavg'].rank(pct=True)
+    df['teammates_with_prev_value'] = (rows['valued_player_team'] - rows['valued_player']).to_numpy()
+    return df
+
+
+# The model-ready rows repeated with shifted player and team ids, to time larger histories
+def scaled(df, copies):
+    players = df['player_id'].max() + 1
+    teams = df['team_id'].max() + 1
+    parts = [df.assign(player_id=df['player_id'] + i * players, team_id=df['team_id'] + i * teams)
+             for i in range(copies)]
+    return pd.concat(parts, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the sparse teammate features against pandas groupbys")
+    parser.add_argument('--copies', type=int, nargs='+', default=[1, 10],
+                        help="Sizes to time, as copies of the model-ready dataset")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    base = pd.read_csv(file_path, usecols=['player_id', 'season_start_year', 'team_id', 'minutes_played', 'value'])
+
+    results = []
+    same = True
+    for copies in args.copies:
+        df = scaled(base, copies)
+        groupby_time, expected = best_time(lambda: groupby_teammate_features(df.copy()), args.repeat)
+        sparse_time, actual = best_time(lambda: add_teammate_features(df.copy()), args.repeat)
+        same &= all(np.allclose(expected[c], actual[c], rtol=1e-9, equal_nan=True) for c in teammate_features)
+        results.append({'rows': len(df), 'groupby_seconds': groupby_time, 'sparse_seconds': sparse_time,
+                        'speedup': groupby_time / sparse_time})
+
+    pd.options.display.float_format = '{:,.3f}'.format
+    print(pd.DataFrame(results).to_string(index=False))
+    print(f"\nSame features as the groupby version: {same}")
+    return 0 if same else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,11 @@
+import time
+
+
+# Best of several runs to reduce noise: the fastest run's seconds and the last run's result
+def best_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
@@ -0,0 +1,79 @@
+import os
+import sys
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'src'))
+
+import career_state
+import league_strength
+import feature_engineering
+
+# Built from the longest contract of all players up to each season, which one player's state can't know
+CROSS_PLAYER = {'contract_remaining_ratio'}
+
+
+# Columns career_features computes, as opposed to the ones it copies from the row
+def computed_columns():
+    row = {'season_start_year': 2000}
+    return [c for c in career_state.career_features(None, row, 2000, 0.0) if c not in row]
+
+
+# Hold back each player's latest season: build the career state from the batch features of the
+# remaining history, compute the held-back seasons online and compare them with the batch features
+# of the full history. Returns (column, mismatched rows, max abs difference) for mismatched columns.
+def compare(df, league_table, tolerance=1e-9):
+    df = df.sort_values(['player_id', 'season_start_year']).reset_index(drop=True)
+    latest = ~df['player_id'].duplicated(keep='last')
+
+    history, _ = feature_engineering.build_features(df[~latest], league_table)
+    table = career_state.build_career_state(history)
+    # Dataset-wide season origin, as in the batch features of the full history
+    table.attrs['min_season'] = int(df['season_start_year'].min())
+
+    full, _ = feature_engineering.build_features(df, league_table)
+    batch = full[~full['player_id'].duplicated(keep='last')].reset_index(drop=True)
+
+    columns = [c for c in computed_columns() if c not in CROSS_PLAYER]
+    raw = df[latest].drop(columns=[c for c in columns if c in df], errors='ignore')
+    online = pd.DataFrame([
+        career_state.new_season_features(table, row) for row in raw.to_dict('records')
+    ])[columns]
+
+    mismatches = []
+    for col in columns:
+        expected = batch[col].to_numpy(dtype=float)
+        actual = online[col].to_numpy(dtype=float)
+        bad = ~np.isclose(actual, expected, rtol=0, atol=tolerance, equal_nan=True)
+        if bad.any():
+            mismatches.append((col, int(bad.sum()), float(np.nanmax(np.abs(actual - expected)))))
+    return len(batch), len(columns), mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the online career-state features against build_features")
+    parser.add_argument('--path', default=feature_engineering.file_path, help="Model-ready dataset CSV")
+    parser.add_argument('--players', type=int, default=None, help="Only check the first N players")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.path)
+    if args.players is not None:
+        keep = df['player_id'].drop_duplicates().head(args.players)
+        df = df[df['player_id'].isin(keep)]
+
+    n_rows, n_columns, mismatches = compare(df, league_strength.load_table())
+    print(f"Compared {n_columns} columns on {n_rows} held-back seasons "
+          f"(skipped cross-player: {', '.join(sorted(CROSS_PLAYER))})")
+    for col, count, diff in mismatches:
+        print(f"  {col}: {count} rows differ (max abs diff {diff:.6g})")
+    if mismatches:
+        sys.exit(1)
+    print("Online features match the batch features")
+
+
+if __name__ == '__main__':
+    main()
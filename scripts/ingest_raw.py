@@ -0,0 +1,281 @@
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from preprocess_market_value import clean_market_value
+from preprocess_player_profiles import clean_player_profiles, read_dtypes as profile_dtypes
+from preprocess_player_performances import clean_performances_chunk
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Path to the raw and processed data directories
+raw_dir = os.path.join(script_dir, '..', 'data', 'raw')
+processed_dir = os.path.join(script_dir, '..', 'data', 'processed')
+
+# Validation report, also used to skip sources that haven't changed since the last run
+report_path = os.path.join(processed_dir, 'ingest_report.json')
+
+# Rows per chunk, this bounds the memory used by each worker
+chunksize = 100_000
+
+# Expected columns and the maximum allowed null rate of critical columns per source
+sources = {
+    'player_market_value': {
+        'raw_file': 'player_market_value.csv',
+        'clean_file': 'player_market_value_clean.csv',
+        'required_columns': ['player_id', 'date_unix', 'value'],
+        'max_null_rate': {'player_id': 0.0, 'date_unix': 0.01, 'value': 0.05},
+        'read_dtypes': None,
+    },
+    'player_performances': {
+        'raw_file': 'player_performances.csv',
+        'clean_file': 'player_performances_clean_2000.csv',
+        'required_columns': [
+            'player_id', 'season_name', 'competition_id', 'competition_name',
+            'team_id', 'team_name', 'nb_in_group', 'nb_on_pitch', 'goals',
+            'assists', 'own_goals', 'subed_in', 'subed_out', 'yellow_cards',
+            'second_yellow_cards', 'direct_red_cards', 'penalty_goals',
+            'minutes_played', 'goals_conceded', 'clean_sheets',
+        ],
+        'max_null_rate': {'player_id': 0.0, 'season_name': 0.01, 'team_id': 0.01},
+        'read_dtypes': None,
+    },
+    'player_profiles': {
+        'raw_file': 'player_profiles.csv',
+        'clean_file': 'player_profiles_clean.csv',
+        'required_columns': [
+            'player_id', 'player_name', 'date_of_birth', 'height', 'position', 'main_position',
+            'foot', 'is_eu', 'current_club_id', 'current_club_name', 'joined', 'contract_expires',
+            'date_of_death',
+        ],
+        'max_null_rate': {'player_id': 0.0, 'player_name': 0.01, 'position': 0.05, 'main_position': 0.05},
+        'read_dtypes': profile_dtypes,
+    },
+}
+
+
+def raw_path(name):
+    return os.path.join(raw_dir, name, sources[name]['raw_file'])
+
+
+# Size and modification time identify a new drop without reading the file
+def fingerprint(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def load_report():
+    if not os.path.exists(report_path):
+        return {}
+    with open(report_path, 'r') as f:
+        return json.load(f)
+
+
+# Market values are sorted by these keys, which needs every row. Each cleaned chunk is sorted and written
+# as a run file, then the runs are merged, so memory stays bounded by the chunk size.
+market_sort_keys = ['player_id', 'date_unix']
+
+
+def write_sorted_run(chunk, run_dir, i):
+    path = os.path.join(run_dir, f'run_{i:05d}.csv')
+    chunk.sort_values(market_sort_keys, kind='mergesort').to_csv(path, index=False)
+    return path
+
+
+# Merge of sorted run files, reading each in small chunks. Buffered rows up to the smallest of the
+# buffers' last keys are final, since no run can still produce a smaller key; they are written out
+# and the emptied buffers are refilled.
+def merge_sorted_runs(paths, out_path, run_chunksize):
+    # round_trip parsing reads values back exactly as they were before the run was written
+    readers = [
+        pd.read_csv(p, chunksize=run_chunksize, parse_dates=['date_unix'], float_precision='round_trip')
+        for p in paths
+    ]
+    try:
+        buffers = [next(reader, None) for reader in readers]
+        rows = 0
+        while any(b is not None for b in buffers):
+            active = [i for i, b in enumerate(buffers) if b is not None]
+            bound_id, bound_date = min(tuple(buffers[i].iloc[-1][market_sort_keys]) for i in active)
+
+            parts = []
+            for i in active:
+                b = buffers[i]
+                final = (b['player_id'] < bound_id) | ((b['player_id'] == bound_id) & (b['date_unix'] <= bound_date))
+                parts.append(b[final])
+                buffers[i] = b[~final] if not final.all() else next(readers[i], None)
+
+            merged = pd.concat(parts, ignore_index=True).sort_values(market_sort_keys, kind='mergesort')
+            merged.to_csv(out_path, mode='w' if rows == 0 else 'a', header=(rows == 0), index=False)
+            rows += len(merged)
+        return rows
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+# Runs in a worker process, a broken file fails its own source without stopping the others
+def ingest_source(name):
+    try:
+        return stream_source(name)
+    except (ValueError, KeyError, pd.errors.ParserError) as e:
+        tmp_path = os.path.join(processed_dir, sources[name]['clean_file']) + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return {
+            'source': name, 'status': 'failed', 'rows_read': 0,
+            'errors': [f"{type(e).__name__}: {e}"], 'fingerprint': fingerprint(raw_path(name)),
+        }
+
+
+# One streaming pass that validates every chunk and writes the cleaned rows,
+# so the cleaning stage never reads the raw file again
+def stream_source(name):
+    source = sources[name]
+    path = raw_path(name)
+    clean_path = os.path.join(processed_dir, source['clean_file'])
+    tmp_path = clean_path + '.tmp'
+    start = time.perf_counter()
+
+    rows = 0
+    clean_rows = 0
+    null_counts = None
+    columns = None
+    run_paths = []
+    run_dir = tempfile.mkdtemp(prefix='runs_', dir=processed_dir) if name == 'player_market_value' else None
+
+    try:
+        reader = pd.read_csv(path, chunksize=chunksize, dtype=source['read_dtypes'])
+        for i, chunk in enumerate(reader):
+            if i == 0:
+                columns = list(chunk.columns)
+                missing = [c for c in source['required_columns'] if c not in columns]
+                if missing:
+                    return {
+                        'source': name, 'status': 'failed', 'rows_read': len(chunk),
+                        'errors': [f"Missing columns: {missing}"], 'fingerprint': fingerprint(path),
+                    }
+                null_counts = chunk.isna().sum()
+            else:
+                null_counts = null_counts.add(chunk.isna().sum(), fill_value=0)
+            rows += len(chunk)
+
+            if name == 'player_market_value':
+                cleaned = clean_market_value(chunk)
+                if len(cleaned):
+                    run_paths.append(write_sorted_run(cleaned, run_dir, i))
+                continue
+
+            if name == 'player_performances':
+                cleaned = clean_performances_chunk(chunk)
+            else:
+                cleaned = clean_player_profiles(chunk)
+
+            cleaned.to_csv(tmp_path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            clean_rows += len(cleaned)
+
+        if run_paths:
+            # About one chunk of rows buffered in total, however many runs there are
+            clean_rows = merge_sorted_runs(run_paths, tmp_path, max(1_000, chunksize // len(run_paths)))
+    finally:
+        if run_dir is not None:
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    null_rates = (null_counts / max(rows, 1)).round(4) if null_counts is not None else pd.Series(dtype=float)
+    errors = [
+        f"{col} null rate {null_rates.get(col, 0):.2%} exceeds {limit:.2%}"
+        for col, limit in source['max_null_rate'].items()
+        if null_rates.get(col, 0) > limit
+    ]
+    if rows == 0:
+        errors.append("File has no rows")
+
+    # Only a valid drop replaces the previous clean file
+    if errors:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, clean_path)
+
+    return {
+        'source': name,
+        'status': 'failed' if errors else 'ok',
+        'rows_read': rows,
+        'rows_clean': clean_rows,
+        'columns': columns,
+        'unexpected_columns': [c for c in columns or [] if c not in source['required_columns']],
+        'null_rates': {k: float(v) for k, v in null_rates.items() if v > 0},
+        'errors': errors,
+        'seconds': round(time.perf_counter() - start, 2),
+        'fingerprint': fingerprint(path),
+    }
+
+
+# Sources whose raw file is new or changed since it was last ingested
+def changed_sources(report, force=False):
+    changed = []
+    for name in sources:
+        path = raw_path(name)
+        if not os.path.exists(path):
+            continue
+        previous = report.get(name, {})
+        if force or previous.get('fingerprint') != fingerprint(path):
+            changed.append(name)
+    return changed
+
+
+async def ingest(names, pool):
+    loop = asyncio.get_running_loop()
+    tasks = [loop.run_in_executor(pool, ingest_source, name) for name in names]
+    return await asyncio.gather(*tasks)
+
+
+async def run(watch=False, interval=60, force=False, workers=3):
+    report = load_report()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            names = changed_sources(report, force)
+            force = False
+
+            if names:
+                print(f"Ingesting: {', '.join(names)}")
+                for result in await ingest(names, pool):
+                    report[result['source']] = result
+                    print(f"  {result['source']}: {result['status']}, "
+                          f"{result['rows_read']:,} rows read, {result.get('rows_clean', 0):,} clean rows")
+                    for error in result['errors']:
+                        print(f"    {error}")
+
+                with open(report_path, 'w') as f:
+                    json.dump(report, f, indent=2)
+            elif not watch:
+                print("No new raw data")
+
+            if not watch:
+                return report
+            await asyncio.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and clean new raw data drops in one streaming pass")
+    parser.add_argument('--watch', action='store_true', help="Keep polling the raw directories for new files")
+    parser.add_argument('--interval', type=int, default=60, help="Seconds between polls in watch mode")
+    parser.add_argument('--force', action='store_true', help="Ingest all sources even if unchanged")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(watch=args.watch, interval=args.interval, force=args.force))
+    if any(r['status'] != 'ok' for r in report.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
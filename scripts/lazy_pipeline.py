@@ -0,0 +1,145 @@
+import time
+import argparse
+
+import pandas as pd
+
+from ingest_raw import sources, raw_path, chunksize
+from merge_datasets import (
+    ValuationIndex, merge_master, parse_cutoff, season_cutoff_days, SEASON_CUTOFF, MAX_VALUATION_AGE_DAYS,
+)
+from preprocess_market_value import clean_market_value
+from preprocess_player_performances import clean_performances_chunk, min_season
+from preprocess_player_profiles import (
+    clean_player_profiles, required_values, read_dtypes as profile_dtypes, cols_to_drop as profile_drops,
+)
+from preprocess_master_dataset import (
+    clean_master, encode_categoricals, cols_to_drop as master_drops, derived_inputs, output_path,
+)
+
+# Profile columns merge_master reads before preprocess_master_dataset drops them
+merge_inputs = ['on_loan_from_club_id', 'on_loan_from_club_name']
+
+
+def read_header(name):
+    return list(pd.read_csv(raw_path(name), nrows=0).columns)
+
+
+# The raw -> model-ready stages (ingest cleaning, merge_datasets, preprocess_master_dataset) as one plan.
+# Columns dropped downstream are pruned from the raw readers, the season filter is applied while
+# reading, and the performances stream through the merge in chunks, so the clean files and
+# master_dataset.csv are never written.
+class LazyPlan:
+    def __init__(self, columns, filters, cutoff=SEASON_CUTOFF, max_age_days=MAX_VALUATION_AGE_DAYS):
+        self.columns = columns    # source -> (columns read, columns in the raw file)
+        self.filters = filters    # source -> description of the pushed-down filter
+        self.cutoff = cutoff
+        self.max_age_days = max_age_days
+
+    # Valuations older than this can't be the as-of match of any kept season (None without an age limit)
+    @staticmethod
+    def earliest_valuation(cutoff=SEASON_CUTOFF, max_age_days=MAX_VALUATION_AGE_DAYS):
+        if max_age_days is None:
+            return None
+        first_cutoff = season_cutoff_days([min_season], cutoff)[0]
+        return pd.Timestamp(first_cutoff - max_age_days, unit='D')
+
+    @classmethod
+    def from_sources(cls, cutoff=SEASON_CUTOFF, max_age_days=MAX_VALUATION_AGE_DAYS):
+        headers = {name: read_header(name) for name in sources}
+        for name, header in headers.items():
+            missing = [c for c in sources[name]['required_columns'] if c not in header]
+            if missing:
+                raise ValueError(f"{raw_path(name)} is missing columns: {missing}")
+
+        # A column is read if it survives to the model-ready dataset or feeds a filter or derived column
+        needed = set(required_values) | set(derived_inputs) | set(merge_inputs) | {'player_id', 'season_name', 'team_id'}
+        dropped = set(master_drops) | set(profile_drops)
+        columns = {
+            'player_market_value': ['player_id', 'date_unix', 'value'],
+            'player_performances': [c for c in headers['player_performances'] if c not in dropped or c in needed],
+            'player_profiles': [c for c in headers['player_profiles'] if c not in dropped or c in needed],
+        }
+        filters = {
+            'player_performances': f"season_start_year >= {min_season}, applied per chunk before the merge",
+        }
+        earliest = cls.earliest_valuation(cutoff, max_age_days)
+        if earliest is not None:
+            filters['player_market_value'] = (f"date_unix >= {earliest.date()}, "
+                                              f"pushed through the as-of join from season_start_year >= {min_season}")
+        return cls({name: (columns[name], headers[name]) for name in sources}, filters, cutoff, max_age_days)
+
+    def explain(self):
+        lines = []
+        for name, (read, header) in self.columns.items():
+            line = f"{name}: read {len(read)} of {len(header)} columns"
+            if name in self.filters:
+                line += f"; filter {self.filters[name]}"
+            lines.append(line)
+            skipped = [c for c in header if c not in read]
+            if skipped:
+                lines.append(f"  skipped: {', '.join(skipped)}")
+        lines.append(f"output: {output_path}")
+        return '\n'.join(lines)
+
+    def read(self, name, **kwargs):
+        usecols = self.columns[name][0]
+        return pd.read_csv(raw_path(name), usecols=usecols, chunksize=chunksize, **kwargs)
+
+    # Valuations (as a sorted index) and profiles are the small sides of the joins and are held in memory;
+    # performances are streamed through the merge and row-level cleaning chunk by chunk
+    def execute(self, output_path=output_path):
+        timings = {}
+        start = time.perf_counter()
+        market = pd.concat([clean_market_value(chunk) for chunk in self.read('player_market_value')], ignore_index=True)
+        earliest = self.earliest_valuation(self.cutoff, self.max_age_days)
+        if earliest is not None:
+            market = market[market['date_unix'] >= earliest]
+        valuations = ValuationIndex(market)
+
+        dtypes = {c: t for c, t in profile_dtypes.items() if c in self.columns['player_profiles'][0]}
+        profiles = pd.concat([clean_player_profiles(chunk) for chunk in self.read('player_profiles', dtype=dtypes)],
+                             ignore_index=True)
+        timings['build_sides_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parts = []
+        rows_read = 0
+        for chunk in self.read('player_performances'):
+            rows_read += len(chunk)
+            chunk = clean_performances_chunk(chunk)
+            parts.append(clean_master(merge_master(chunk, valuations, profiles, self.cutoff, self.max_age_days)))
+        timings['stream_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = pd.concat(parts, ignore_index=True).sort_values(by=['player_id', 'season_start_year'], kind='stable')
+        df = encode_categoricals(df)
+        df.to_csv(output_path, index=False)
+        timings['write_seconds'] = time.perf_counter() - start
+
+        return {'rows_read': rows_read, 'rows_out': len(df), **timings}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the model-ready dataset from the raw CSVs in one streaming pass")
+    parser.add_argument('--explain', action='store_true', help="Print the plan without running it")
+    parser.add_argument('--cutoff', type=parse_cutoff, default=SEASON_CUTOFF,
+                        help="In-season date MM-DD; each season gets the latest valuation on or before it")
+    parser.add_argument('--max-age-days', type=int, default=MAX_VALUATION_AGE_DAYS,
+                        help="Drop a season when its latest valuation is older than this at the cutoff (default: no limit)")
+    args = parser.parse_args(argv)
+
+    plan = LazyPlan.from_sources(args.cutoff, args.max_age_days)
+    print(plan.explain())
+    if args.explain:
+        return
+
+    result = plan.execute()
+    print(f"\n{result['rows_read']:,} performance rows read, {result['rows_out']:,} model-ready rows")
+    for key, seconds in result.items():
+        if key.endswith('_seconds'):
+            print(f"{key}: {seconds:.1f}s")
+    print("Saved model-ready dataset to:", output_path)
+
+
+if __name__ == '__main__':
+    main()
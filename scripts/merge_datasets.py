@@ -1,5 +1,7 @@
 import os
+import argparse
 import pandas as pd
+import numpy as np
 
 # Get the folder where this script is located
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -17,61 +19,175 @@ clean_csvs = ['player_market_value_clean.csv',
              'player_profiles_clean.csv',
 ]
 
-# Dictionary for DataFrames (key = file name, value = DataFrame)
-dataframes = {}
-for file_name in clean_csvs:
-    # Build the full path to the CSV file
-    file_path = os.path.join(processed_dir, file_name)
+# Valuations are matched to a season as of this in-season date (month, day).
+# Months from July on fall in the season's start year, earlier months in the following year.
+SEASON_CUTOFF = (12, 31)
+
+# Valuations older than this at the cutoff are not used for the season (--max-age-days).
+# None matches the latest valuation before the cutoff however old it is.
+MAX_VALUATION_AGE_DAYS = None
+
+# (player_id, day) packed into one sortable int64: days since 1970 are offset to stay positive
+KEY_DAY_OFFSET = 1 << 16
+KEY_SPAN = 1 << 17
+
+
+def parse_cutoff(text):
+    month, day = (int(part) for part in text.split('-'))
+    return month, day
+
+
+# Cutoff date of each season start year, in days since 1970
+def season_cutoff_days(season_start_year, cutoff=SEASON_CUTOFF):
+    month, day = cutoff
+    year = np.asarray(season_start_year, dtype=np.int64) + (0 if month >= 7 else 1)
+    dates = (year - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (month - 1)
+    return (dates.astype('datetime64[D]') + (day - 1)).astype(np.int64)
+
+
+def asof_keys(player_ids, days):
+    return np.asarray(player_ids, dtype=np.int64) * KEY_SPAN + (np.asarray(days, dtype=np.int64) + KEY_DAY_OFFSET)
+
+
+# Valuations sorted by player and date in flat arrays. A player's valuations are one contiguous
+# run of the key array, so finding the latest one before a date is a single binary search.
+# Same-day valuations keep their file order, so the later row wins.
+class ValuationIndex:
+    def __init__(self, df_market):
+        dates = pd.to_datetime(df_market['date_unix'], errors='coerce')
+        valid = (dates.notna() & df_market['value'].notna()).to_numpy()
+        player_ids = df_market['player_id'].to_numpy()[valid].astype(np.int64)
+        days = dates.to_numpy()[valid].astype('datetime64[D]').astype(np.int64)
+
+        keys = asof_keys(player_ids, days)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.player_ids = player_ids[order]
+        self.days = days[order]
+        self.dates = dates.to_numpy()[valid][order]
+        self.values = df_market['value'].to_numpy(dtype=np.float64)[valid][order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    # Position of the latest valuation on or before each day for each player, -1 when there is none
+    # or it is more than max_age_days old
+    def lookup(self, player_ids, days, max_age_days=MAX_VALUATION_AGE_DAYS):
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        if len(self.keys) == 0:
+            return np.full(len(player_ids), -1, dtype=np.intp)
+        positions = np.searchsorted(self.keys, asof_keys(player_ids, days), side='right') - 1
+
+        candidate = np.clip(positions, 0, None)
+        matched = (positions >= 0) & (self.player_ids[candidate] == player_ids)
+        if max_age_days is not None:
+            matched &= days - self.days[candidate] <= max_age_days
+        return np.where(matched, positions, -1)
+
+    # Performances with the value and date of their season's valuation, one output row per input row
+    def join(self, df_perf, cutoff=SEASON_CUTOFF, max_age_days=MAX_VALUATION_AGE_DAYS):
+        positions = self.lookup(
+            df_perf['player_id'].to_numpy(),
+            season_cutoff_days(df_perf['season_start_year'].to_numpy(), cutoff),
+            max_age_days,
+        )
+        matched = positions >= 0
+        value = np.full(len(df_perf), np.nan)
+        value[matched] = self.values[positions[matched]]
+        date = np.full(len(df_perf), np.datetime64('NaT'), dtype=self.dates.dtype)
+        date[matched] = self.dates[positions[matched]]
+        return df_perf.assign(value=value, date_unix=date)
+
+    # Performance rows the join leaves without a value: those with no valuation on or before their
+    # season's cutoff, and those whose latest one is more than max_age_days old
+    def unmatched(self, df_perf, cutoff=SEASON_CUTOFF, max_age_days=MAX_VALUATION_AGE_DAYS):
+        player_ids = df_perf['player_id'].to_numpy()
+        days = season_cutoff_days(df_perf['season_start_year'].to_numpy(), cutoff)
+        any_age = self.lookup(player_ids, days, max_age_days=None) >= 0
+        matched = self.lookup(player_ids, days, max_age_days) >= 0
+        return int((~any_age).sum()), int((any_age & ~matched).sum())
+
+
+# The calendar-year equi-join used before the as-of join, kept for benchmarks.
+# Every valuation dated in a season's start year matches, so several valuations multiply the rows.
+def calendar_year_join(df_perf, df_market):
+    df_market = df_market.assign(date_unix=pd.to_datetime(df_market['date_unix'], errors='coerce'))
+    df_market['season_start_year'] = df_market['date_unix'].dt.year
+    return pd.merge(
+        df_perf,
+        df_market[['player_id', 'season_start_year', 'value', 'date_unix']],
+        on=['player_id', 'season_start_year'],
+        how='left',
+    )
 
-    # Read the CSV and store it in the dictionary
-    dataframes[file_name] = pd.read_csv(file_path)
 
-# Assign DataFrames
-df_market = dataframes['player_market_value_clean.csv']
-df_perf = dataframes['player_performances_clean_2000.csv']
-df_profiles = dataframes['player_profiles_clean.csv']
+# Join performances with market values and profiles. Row-level apart from the final sort,
+# so it also works on a chunk of performances against the full valuation index and profiles.
+def merge_master(df_perf, valuations, df_profiles, cutoff=SEASON_CUTOFF, max_age_days=MAX_VALUATION_AGE_DAYS):
+    # Each performance row gets its season's latest valuation as of the cutoff
+    df_master = valuations.join(df_perf, cutoff, max_age_days)
 
-# Ensure date_unix is datetime so we can extract year
-df_market['date_unix'] = pd.to_datetime(df_market['date_unix'], errors='coerce')
+    # Merge player profiles
+    df_master = pd.merge(
+        df_master,
+        df_profiles,
+        on='player_id',
+        how='left'
+        )
 
-# Extract season start year (used as merge key)
-df_market['season_start_year'] = df_market['date_unix'].dt.year
+    # Create a binary column for loan, 1 if player is on loan this season, otherwise 0
+    df_master['is_on_loan'] = df_master['on_loan_from_club_id'].notna().astype(int)
 
-# Merge performances with market values
-df_master = pd.merge(
-    df_perf,
-    df_market[['player_id','season_start_year','value', 'date_unix']], 
-    on=['player_id','season_start_year'],
-    how='left'
-    )
+    # Fill club name for clarity
+    df_master['on_loan_from_club_name'] = df_master['on_loan_from_club_name'].fillna('None')
 
-# Merge player profiles
-df_master = pd.merge(
-    df_master,
-    df_profiles,
-    on='player_id',
-    how='left'
-    )
+    # Sort
+    df_master = df_master.sort_values(by=['player_id', 'season_start_year'])
+
+    # Fill logical NaNs
+    df_master['goals'] = df_master['goals'].fillna(0)
+    df_master['minutes_played'] = df_master['minutes_played'].fillna(0)
+
+    # Drop rows without market value (target variable)
+    return df_master.dropna(subset=['value'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge the clean datasets into the master dataset")
+    parser.add_argument('--cutoff', type=parse_cutoff, default=SEASON_CUTOFF,
+                        help="In-season date MM-DD; each season gets the latest valuation on or before it")
+    parser.add_argument('--max-age-days', type=int, default=MAX_VALUATION_AGE_DAYS,
+                        help="Drop a season when its latest valuation is older than this at the cutoff (default: no limit)")
+    args = parser.parse_args(argv)
+
+    # Dictionary for DataFrames (key = file name, value = DataFrame)
+    dataframes = {}
+    for file_name in clean_csvs:
+        # Build the full path to the CSV file
+        file_path = os.path.join(processed_dir, file_name)
 
-# Create a binary column for loan, 1 if player is on loan this season, otherwise 0
-df_master['is_on_loan'] = df_master['on_loan_from_club_id'].notna().astype(int)
+        # Read the CSV and store it in the dictionary
+        dataframes[file_name] = pd.read_csv(file_path)
 
-# Fill club name for clarity
-df_master['on_loan_from_club_name'] = df_master['on_loan_from_club_name'].fillna('None')
+    # Assign DataFrames
+    valuations = ValuationIndex(dataframes['player_market_value_clean.csv'])
+    df_perf = dataframes['player_performances_clean_2000.csv']
+    df_profiles = dataframes['player_profiles_clean.csv']
 
-# Sort
-df_master = df_master.sort_values(by=['player_id', 'season_start_year'])
+    missing, stale = valuations.unmatched(df_perf, args.cutoff, args.max_age_days)
+    print(f"Dropping performance rows without a season valuation: {missing:,} with none before the cutoff")
+    if args.max_age_days is not None:
+        print(f"Dropping {stale:,} more whose latest valuation is older than {args.max_age_days} days")
+    df_master = merge_master(df_perf, valuations, df_profiles, args.cutoff, args.max_age_days)
 
-# Fill logical NaNs
-df_master['goals'] = df_master['goals'].fillna(0)
-df_master['minutes_played'] = df_master['minutes_played'].fillna(0)
+    # Quick sanity check
+    print(df_master.isna().sum())
 
-# Drop rows without market value (target variable)
-df_master = df_master.dropna(subset=['value'])
+    # Save master dataset
+    df_master.to_csv(output_path, index=False)
+    print("Saved master dataset to data/processed/master_dataset.csv")
 
-# Quick sanity check
-print(df_master.isna().sum())
 
-# Save master dataset
-df_master.to_csv(output_path, index=False)
-print("Saved master dataset to data/processed/master_dataset.csv")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
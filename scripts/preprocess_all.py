@@ -1,18 +1,31 @@
 import os
+import argparse
 
 scripts = [
-    "scripts/preprocess.py"
-    "scripts/preprocess_player_profiles.py",
-    "scripts/preprocess_player_performances.py",
-    "scripts/preprocess_market_value.py",
+    "scripts/ingest_raw.py",
     "scripts/preprocess_master_dataset.py",
     "scripts/merge_datasets.py",
 ]
  
-total_steps = len(scripts)
 
-for step, script in enumerate(scripts, start=1):
-    print(f"Step {step}/{total_steps}: Running {script} ...")
-    os.system(f"python {script}")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the raw data preprocessing and merge steps in order")
+    parser.add_argument('--lazy', action='store_true',
+                        help="Run all steps as one streaming plan without writing the intermediate files")
+    args = parser.parse_args(argv)
 
-print("Done preprocessing and merging raw datasets. Next step: Make features dataset.")
+    if args.lazy:
+        os.system("python scripts/lazy_pipeline.py")
+        return
+
+    total_steps = len(scripts)
+
+    for step, script in enumerate(scripts, start=1):
+        print(f"Step {step}/{total_steps}: Running {script} ...")
+        os.system(f"python {script}")
+
+    print("Done preprocessing and merging raw datasets. Next step: Make features dataset.")
+
+
+if __name__ == '__main__':
+    main()
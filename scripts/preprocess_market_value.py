@@ -1,4 +1,5 @@
 import os
+import argparse
 import pandas as pd
 
 # Get the folder where this script is located
@@ -10,25 +11,40 @@ raw_dir = os.path.join(script_dir, '..', 'data', 'raw', 'player_market_value', '
 # Path to the processed data directory
 processed_dir = os.path.join(script_dir, '..', 'data', 'processed', 'player_market_value_clean.csv')
 
-# Load CSV
-df = pd.read_csv(raw_dir)
 
-# Basic inspection
-print(df.info())
-print(df.isna().sum())
+# Row-level cleaning, safe to apply chunk by chunk
+def clean_market_value(df):
+    #Fix data types
+    df['date_unix'] = pd.to_datetime(df['date_unix'], errors='coerce')
+    df['player_id'] = df['player_id'].astype(int)
 
-#Fix data types
-df['date_unix'] = pd.to_datetime(df['date_unix'], errors='coerce')
-df['player_id'] = df['player_id'].astype(int)
+    # Drop rows with missing important values
+    return df.dropna(subset=['player_id', 'date_unix', 'value'])
 
-# Drop rows with missing important values
-df = df.dropna(subset=['player_id', 'date_unix', 'value'])
 
 # Sort rows by player_id first (group each player together),
 # then by date_unix so each player's records are in chronological order
-df = df.sort_values(by=['player_id', 'date_unix'])
+def sort_market_value(df):
+    return df.sort_values(by=['player_id', 'date_unix'])
 
-# Save cleaned version
-df.to_csv(processed_dir, index=False)
 
-print("Saved clean market value data")
\ No newline at end of file
+def main(argv=None):
+    argparse.ArgumentParser(description="Clean the raw market value data").parse_args(argv)
+
+    # Load CSV
+    df = pd.read_csv(raw_dir)
+
+    # Basic inspection
+    print(df.info())
+    print(df.isna().sum())
+
+    df = sort_market_value(clean_market_value(df))
+
+    # Save cleaned version
+    df.to_csv(processed_dir, index=False)
+
+    print("Saved clean market value data")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import argparse
 import pandas as pd
 
 # Get the folder where this script is located
@@ -9,37 +10,6 @@ file_path = os.path.join(script_dir, '..', 'data', 'processed', 'master_dataset.
 
 output_path = os.path.join(script_dir, '..', 'data', 'processed', 'model_ready_dataset.csv')
 
-# Load dataset
-df_master = pd.read_csv(file_path)
-
-# Fill missing small categorical columns
-df_master['foot'] = df_master['foot'].fillna('Unknown')
-df_master['position'] = df_master['position'].fillna('Unknown')
-df_master['main_position'] = df_master['main_position'].fillna('Unknown')
-
-df_master['is_eu'] = df_master['is_eu'].fillna(False)
-
-# Make the is_eu column's datatype is a boolean
-df_master['is_eu'] = df_master['is_eu'].astype(bool)
-
-# Convert contract_expires to datetime
-df_master['contract_expires'] = pd.to_datetime(df_master['contract_expires'], errors='coerce')
-
-# Create a new column: years remaining on contract at the time of the season
-df_master['contract_remaining_years'] = (
-    df_master['contract_expires'].dt.year - df_master['season_start_year']
-)
-
-# Remove negative values (expired contracts before the season)
-df_master['contract_remaining_years'] = df_master['contract_remaining_years'].clip(lower=0)
-
-# Convert date_unix to datetime
-df_master['date_unix'] = pd.to_datetime(df_master['date_unix'], errors='coerce')
-
-# Handle date columns for features like player age in a season
-df_master['date_of_birth'] = pd.to_datetime(df_master['date_of_birth'], errors='coerce')
-df_master['age'] = (df_master['date_unix'] - df_master['date_of_birth']).dt.days / 365.25
-
 # Drop columns that leak info, aren't useable, or extremely sparse
 cols_to_drop = [
     'player_name',
@@ -56,11 +26,65 @@ cols_to_drop = [
     'on_loan_from_club_id',
     'on_loan_from_club_name',
 ]
-df_master = df_master.drop(columns=[c for c in cols_to_drop if c in df_master.columns])
 
-# Encode categorical columns
-df_master = pd.get_dummies(df_master, columns=['foot', 'is_eu'], sparse=True)
+# Columns the derived columns are computed from before the drop
+derived_inputs = ['contract_expires', 'date_of_birth', 'date_unix', 'season_start_year']
+
+# Categorical columns one-hot encoded for the model
+categorical_columns = ['foot', 'is_eu']
+
+
+# Row-level cleaning, safe to apply chunk by chunk
+def clean_master(df_master):
+    # Fill missing small categorical columns
+    df_master['foot'] = df_master['foot'].fillna('Unknown')
+    df_master['position'] = df_master['position'].fillna('Unknown')
+    df_master['main_position'] = df_master['main_position'].fillna('Unknown')
+
+    df_master['is_eu'] = df_master['is_eu'].fillna(False)
+
+    # Make the is_eu column's datatype is a boolean
+    df_master['is_eu'] = df_master['is_eu'].astype(bool)
+
+    # Convert contract_expires to datetime
+    df_master['contract_expires'] = pd.to_datetime(df_master['contract_expires'], errors='coerce')
+
+    # Create a new column: years remaining on contract at the time of the season
+    df_master['contract_remaining_years'] = (
+        df_master['contract_expires'].dt.year - df_master['season_start_year']
+    )
+
+    # Remove negative values (expired contracts before the season)
+    df_master['contract_remaining_years'] = df_master['contract_remaining_years'].clip(lower=0)
+
+    # Convert date_unix to datetime
+    df_master['date_unix'] = pd.to_datetime(df_master['date_unix'], errors='coerce')
+
+    # Handle date columns for features like player age in a season
+    df_master['date_of_birth'] = pd.to_datetime(df_master['date_of_birth'], errors='coerce')
+    df_master['age'] = (df_master['date_unix'] - df_master['date_of_birth']).dt.days / 365.25
+
+    return df_master.drop(columns=[c for c in cols_to_drop if c in df_master.columns])
+
+
+# Encode categorical columns. The dummy columns depend on every value present,
+# so this runs once over the full table, never per chunk.
+def encode_categoricals(df_master):
+    return pd.get_dummies(df_master, columns=categorical_columns, sparse=True)
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Clean the master dataset into the model-ready dataset").parse_args(argv)
+
+    # Load dataset
+    df_master = pd.read_csv(file_path)
+
+    df_master = encode_categoricals(clean_master(df_master))
+
+    # Save model-ready dataset
+    df_master.to_csv(output_path, index=False)
+    print("Saved model-ready dataset")
+
 
-# Save model-ready dataset
-df_master.to_csv(output_path, index=False)
-print("Saved model-ready dataset")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 import os
+import argparse
 import pandas as pd
 from datetime import datetime
 
@@ -21,7 +22,9 @@ processed_dir = os.path.join(script_dir, '..', 'data', 'processed', 'player_perf
 
 # Chunk size
 chunksize = 100_000
-first_chunk = True # For writing header only once
+
+# First season kept
+min_season = 2000
 
 # columns = ['player_id', 'season_name', 'competition_id', 'competition_name',
 #            'team_id', 'team_name', 'nb_in_group', 'nb_on_pitch', 'goals',
@@ -29,8 +32,8 @@ first_chunk = True # For writing header only once
 #            'second_yellow_cards', 'direct_red_cards', 'penalty_goals',
 #            'minutes_played', 'goals_conceded', 'clean_sheets']
 
-# Process the CSV file in chunks
-for chunk in pd.read_csv(raw_dir, chunksize=chunksize):
+
+def clean_performances_chunk(chunk):
     # Drop rows with missing critical values
     chunk = chunk.dropna(subset=['player_id', 'season_name', 'team_id'])
 
@@ -38,7 +41,7 @@ for chunk in pd.read_csv(raw_dir, chunksize=chunksize):
     chunk['season_start_year'] = chunk['season_name'].apply(season_to_year)
 
     # Keep only seasons starting in 2000 or later
-    chunk = chunk[chunk['season_start_year'] >= 2000]
+    chunk = chunk[chunk['season_start_year'] >= min_season]
 
     # Convert 'season_start_year' to int
     chunk['season_start_year'] = chunk['season_start_year'].astype(int)
@@ -47,23 +50,37 @@ for chunk in pd.read_csv(raw_dir, chunksize=chunksize):
     chunk = chunk.sort_values(by=['player_id', 'season_start_year'])
 
     # Drop rows with invalid or missing season years
-    chunk = chunk.dropna(subset=['season_start_year'])
+    return chunk.dropna(subset=['season_start_year'])
 
-    # For the first chunk only
-    if first_chunk:
-        # Basic inspection
-        print(chunk.info())
-        print(chunk.isna().sum())
 
-        # Save the first chunk to CSV including the header (column names)
-        chunk.to_csv(processed_dir, index=False)
+def main(argv=None):
+    argparse.ArgumentParser(description="Clean the raw player performances data").parse_args(argv)
+
+    first_chunk = True # For writing header only once
+
+    # Process the CSV file in chunks
+    for chunk in pd.read_csv(raw_dir, chunksize=chunksize):
+        chunk = clean_performances_chunk(chunk)
+
+        # For the first chunk only
+        if first_chunk:
+            # Basic inspection
+            print(chunk.info())
+            print(chunk.isna().sum())
+
+            # Save the first chunk to CSV including the header (column names)
+            chunk.to_csv(processed_dir, index=False)
+
+            # Set first_chunk to False to ensure subsequent chunks do not print headers or basic inspection details
+            first_chunk = False
+
+        # For all remaining chunks:
+        else:
+            # Append to the same CSV file
+            chunk.to_csv(processed_dir, mode='a', header=False, index=False)
+
+    print("Saved player performances data")
 
-        # Set first_chunk to False to ensure subsequent chunks do not print headers or basic inspection details
-        first_chunk = False
-        
-    # For all remaining chunks:
-    else:
-        # Append to the same CSV file
-        chunk.to_csv(processed_dir, index=False)
 
-print("Saved player performances data")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
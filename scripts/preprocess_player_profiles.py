@@ -1,4 +1,5 @@
 import os
+import argparse
 import pandas as pd
 
 # Get the folder where this script is located
@@ -10,12 +11,13 @@ raw_dir = os.path.join(script_dir, '..', 'data', 'raw', 'player_profiles', 'play
 # Path to the processed data directory
 processed_dir = os.path.join(script_dir, '..', 'data', 'processed', 'player_profiles_clean.csv')
 
-# Load CSV
-df = pd.read_csv(raw_dir)
-
-# Basic inspection
-print(df.info())
-print(df.isna().sum())
+# Sparse club columns are read as strings so pandas doesn't guess mixed types
+read_dtypes = {
+    'third_club_url': str,
+    'third_club_name': str,
+    'fourth_club_url': str,
+    'fourth_club_name': str,
+}
 
 # Fix data types
 date_cols = [
@@ -25,12 +27,6 @@ date_cols = [
     'date_of_death',
 ]
 
-for col in date_cols:
-    df[col] = pd.to_datetime(df[col], errors='coerce')
-
-# Drop rows with missing important values
-df = df.dropna(subset=['player_id', 'player_name', 'position', 'main_position'])
-
 # Drop extremely sparse columns
 cols_to_drop = [
     'outfitter',
@@ -48,11 +44,40 @@ cols_to_drop = [
     'fourth_club_name',
 ]
 
-for col in cols_to_drop:
-    if col in df.columns:
-        df = df.drop(columns=col)
 
-# Save cleaned version
-df.to_csv(processed_dir, index=False)
+# Rows missing any of these are dropped
+required_values = ['player_id', 'player_name', 'position', 'main_position']
+
+
+# Row-level cleaning, safe to apply chunk by chunk and to a subset of the columns
+def clean_player_profiles(df):
+    for col in date_cols:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # Drop rows with missing important values
+    df = df.dropna(subset=required_values)
+
+    return df.drop(columns=[c for c in cols_to_drop if c in df.columns])
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Clean the raw player profiles data").parse_args(argv)
+
+    # Load CSV
+    df = pd.read_csv(raw_dir, dtype=read_dtypes)
+
+    # Basic inspection
+    print(df.info())
+    print(df.isna().sum())
+
+    df = clean_player_profiles(df)
+
+    # Save cleaned version
+    df.to_csv(processed_dir, index=False)
+
+    print("Saved clean player profiles data")
+
 
-print("Saved clean player profiles data")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import argparse
+
+import pandas as pd
+import numpy as np
+
+from ingest_raw import sources, raw_path, processed_dir, chunksize
+
+# Get the folder where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# CSV written by each pipeline stage
+stages = {
+    **{f'raw-{name}': raw_path(name) for name in sources},
+    **{name: os.path.join(processed_dir, source['clean_file']) for name, source in sources.items()},
+    'master': os.path.join(processed_dir, 'master_dataset.csv'),
+    'model-ready': os.path.join(processed_dir, 'model_ready_dataset.csv'),
+    'features': os.path.join(processed_dir, 'features_dataset.csv'),
+}
+
+# Quantiles in the report
+QUANTILES = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+# Values kept per numeric column for the quantiles; exact below this many rows
+SAMPLE_SIZE = 20_000
+
+# HyperLogLog registers are 2^HLL_PRECISION, standard error about 1.04 / sqrt(2^HLL_PRECISION) (0.8%)
+HLL_PRECISION = 14
+
+
+# Approximate distinct count in a fixed 16 KB of registers, merged chunk by chunk.
+# Each value is hashed to 64 bits: the top bits pick a register, which keeps the
+# longest run of leading zeros seen in the remaining bits.
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, hashes):
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+        # The tail fits a float64 mantissa exactly, so frexp's exponent is its bit length
+        tail = (hashes & np.uint64((1 << tail_bits) - 1)).astype(np.float64)
+        rank = (tail_bits - np.frexp(tail)[1] + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+
+
+# One column's summary, updated chunk by chunk in constant memory: counts, min/max,
+# mean/variance (merged with Chan's formula), a uniform sample for quantiles, and HyperLogLog.
+class ColumnProfile:
+    def __init__(self, name, seed=42, sample_size=SAMPLE_SIZE):
+        self.name = name
+        self.dtype = None
+        self.count = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.finite = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sample_size = sample_size
+        self.sample = np.empty(0)
+        self.priorities = np.empty(0)
+        self.rng = np.random.default_rng(seed)
+        self.hll = HyperLogLog()
+
+    @property
+    def numeric(self):
+        return self.dtype is not None and self.dtype != np.dtype(object)
+
+    def update(self, series):
+        # A column is numeric while every chunk reads as numeric, as pandas would infer it for the whole file
+        dtype = series.dtype if series.dtype.kind in 'biuf' else np.dtype(object)
+        if self.dtype is not None and (dtype == np.dtype(object)) != (self.dtype == np.dtype(object)):
+            dtype = np.dtype(object)
+            self.min = self.max = None
+            self.finite = 0
+        self.dtype = dtype if self.dtype is None else np.result_type(self.dtype, dtype)
+
+        values = series.dropna()
+        self.nulls += len(series) - len(values)
+        self.count += len(values)
+        if not len(values):
+            return self
+
+        if self.numeric:
+            values = values.to_numpy(dtype=np.float64)
+            self.hll.update(pd.util.hash_array(values))
+            self._update_numeric(values[np.isfinite(values)])
+        else:
+            # Object columns read from CSV hold strings only, so they compare and hash as is
+            values = values.to_numpy(dtype=object)
+            self.hll.update(pd.util.hash_array(values))
+            low, high = values.min(), values.max()
+            self.min = low if self.min is None else min(self.min, low)
+            self.max = high if self.max is None else max(self.max, high)
+        return self
+
+    def _update_numeric(self, values):
+        if not len(values):
+            return
+        low, high = values.min(), values.max()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+        n = len(values)
+        mean = values.mean()
+        m2 = np.square(values - mean).sum()
+        total = self.finite + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.finite * n / total
+        self.finite = total
+
+        # Bottom-k sample: every value gets a random priority and the k lowest are kept,
+        # which is a uniform sample of everything seen so far
+        self.sample = np.concatenate([self.sample, values])
+        self.priorities = np.concatenate([self.priorities, self.rng.random(n)])
+        if len(self.sample) > self.sample_size:
+            keep = np.argpartition(self.priorities, self.sample_size)[:self.sample_size]
+            self.sample = self.sample[keep]
+            self.priorities = self.priorities[keep]
+
+    def report(self):
+        rows = self.count + self.nulls
+        report = {
+            'dtype': str(self.dtype),
+            'count': self.count,
+            'nulls': self.nulls,
+            'null_rate': self.nulls / rows if rows else 0.0,
+            'distinct': int(round(min(self.hll.estimate(), self.count))),
+            'min': self.min,
+            'max': self.max,
+        }
+        if self.numeric and self.finite:
+            report['mean'] = self.mean
+            report['std'] = np.sqrt(self.m2 / (self.finite - 1)) if self.finite > 1 else 0.0
+            for q, value in zip(QUANTILES, np.quantile(self.sample, QUANTILES)):
+                report[f'p{int(q * 100):02d}'] = value
+        # Plain Python values, so the report is JSON
+        return {key: value.item() if isinstance(value, np.generic) else value for key, value in report.items()}
+
+
+# Profile a CSV in one chunked pass
+def profile_csv(path, chunk_rows=chunksize, sample_size=SAMPLE_SIZE):
+    start = time.perf_counter()
+    profiles = None
+    rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_rows, low_memory=False):
+        if profiles is None:
+            profiles = {c: ColumnProfile(c, sample_size=sample_size) for c in chunk.columns}
+        rows += len(chunk)
+        for column, profile in profiles.items():
+            profile.update(chunk[column])
+
+    return {
+        'path': os.path.relpath(path, os.path.join(script_dir, '..')),
+        'rows': rows,
+        'seconds': time.perf_counter() - start,
+        'columns': {c: p.report() for c, p in (profiles or {}).items()},
+    }
+
+
+def format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if np.isnan(value):
+            return ''
+        return f'{value:,.0f}' if value.is_integer() and abs(value) < 1e15 else f'{value:,.4g}'
+    if isinstance(value, int):
+        return f'{value:,}'
+    return str(value)
+
+
+# The report as one line per column
+def report_table(report):
+    table = pd.DataFrame.from_dict(report['columns'], orient='index').drop(columns=['count'])
+    table['null_rate'] = table['null_rate'].map('{:.2%}'.format)
+    return table.astype(object).map(format_value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Profile a pipeline stage's CSV in one streaming pass: counts, nulls, min/max, "
+                    "mean/std, approximate quantiles and distinct counts")
+    parser.add_argument('stage', nargs='?', default='master', choices=sorted(stages),
+                        help="Stage output to profile (default: master)")
+    parser.add_argument('--path', help="Profile this CSV instead of a stage output")
+    parser.add_argument('--chunksize', type=int, default=chunksize, help="Rows read per chunk")
+    parser.add_argument('--json', help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    report = profile_csv(args.path or stages[args.stage], chunk_rows=args.chunksize)
+
+    pd.options.display.width = 200
+    pd.options.display.max_columns = None
+    pd.options.display.max_rows = None
+    print(f"{report['path']}: {report['rows']:,} rows, {len(report['columns'])} columns, "
+          f"profiled in {report['seconds']:.1f}s")
+    print(report_table(report).to_string())
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print("Saved profile to:", args.json)
+
+
+if __name__ == '__main__':
+    main()
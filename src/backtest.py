@@ -0,0 +1,162 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+import feature_store
+import model_registry
+from dataset_cache import DatasetCache
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Per-season results of the last backtest
+output_path = os.path.join(script_dir, '..', 'data', 'processed', 'backtest_results.csv')
+
+# First season scored by the walk-forward backtest
+START_SEASON = 2010
+
+# Used when no model is registered yet
+DEFAULT_PARAMS = {
+    'num_leaves': 31,
+    'learning_rate': 0.05,
+    'n_estimators': 300,
+    'min_child_samples': 20,
+}
+
+# Set in each worker process by _init_worker
+_snapshot = None
+_cache = None
+
+
+# Every worker memory-maps the same snapshot matrix, so the OS shares its pages between processes.
+# Fold training sets are binned once and reused by later backtests and training runs.
+def _init_worker(input_dir):
+    global _snapshot, _cache
+    _snapshot = feature_store.load_snapshot(input_dir, mmap=True)
+    _cache = DatasetCache(_snapshot)
+
+
+# One walk-forward fold: train on every season before test_season, score test_season.
+# Features are point-in-time, so rows of earlier seasons never depend on the test season.
+def run_fold(test_season, params, threads):
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    timings = {}
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    season = _snapshot.column('season_start_year')
+    y = _snapshot.keys['value'].to_numpy(dtype=np.float64)
+    has_target = ~np.isnan(y)
+
+    train_rows = np.flatnonzero(has_target & (season < test_season))
+    test_rows = np.flatnonzero(has_target & (season == test_season))
+    if len(train_rows) == 0 or len(test_rows) == 0:
+        return None
+
+    X_test = _snapshot.X.iloc[test_rows]
+    y_train = np.log1p(y[train_rows])
+    y_test = y[test_rows]
+    timings['load_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = _cache.hits
+    _cache.dataset(train_rows)
+    timings['bin_seconds'] = time.perf_counter() - start
+    cached = _cache.hits > hits
+
+    start = time.perf_counter()
+    model = _cache.train(params, train_rows, threads=threads)
+    timings['fit_seconds'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = np.expm1(model.predict(X_test))
+    timings['predict_seconds'] = time.perf_counter() - start
+    timings['cpu_seconds'] = time.process_time() - cpu_start
+
+    baseline_pred = np.full(len(y_test), np.expm1(y_train.mean()))
+    return {
+        'season': int(test_season),
+        'train_rows': len(train_rows),
+        'test_rows': len(test_rows),
+        'mae': mean_absolute_error(y_test, y_pred),
+        'r2': r2_score(y_test, y_pred) if len(y_test) > 1 else np.nan,
+        'baseline_mae': mean_absolute_error(y_test, baseline_pred),
+        'dataset_cached': cached,
+        **timings,
+    }
+
+
+# Params of the latest registered model, so the backtest judges what is actually deployed
+def model_params(name):
+    if not model_registry.has_model(name):
+        return dict(DEFAULT_PARAMS)
+    manifest = model_registry.load_manifest(name)
+    params = {k: v for k, v in manifest['params'].items() if k not in ('quantiles', 'weights')}
+    return params or dict(DEFAULT_PARAMS)
+
+
+def walk_forward(seasons, params, workers=1, input_dir=feature_store.snapshot_dir):
+    # LightGBM threads are capped so parallel folds don't oversubscribe the CPU
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(input_dir,)) as pool:
+        # Largest folds first so the slowest ones don't start last
+        futures = [pool.submit(run_fold, s, params, threads) for s in sorted(seasons, reverse=True)]
+        results = [f.result() for f in futures]
+
+    results = pd.DataFrame([r for r in results if r is not None])
+    return results.sort_values('season').reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest: train on prior seasons, score the next")
+    parser.add_argument('--start', type=int, default=START_SEASON, help="First season to score")
+    parser.add_argument('--end', type=int, help="Last season to score (default: latest in the snapshot)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Folds run in parallel")
+    parser.add_argument('--model', default='lgb_market_value', help="Registered model whose params are backtested")
+    args = parser.parse_args(argv)
+
+    # Turn off scientific notation and force commas
+    pd.options.display.float_format = '{:,.3f}'.format
+
+    snapshot = feature_store.load_snapshot()
+    all_seasons = np.unique(snapshot.column('season_start_year'))
+    end = args.end if args.end is not None else int(all_seasons.max())
+    seasons = [int(s) for s in all_seasons if args.start <= s <= end]
+
+    params = model_params(args.model)
+    print(f"Backtesting {len(seasons)} seasons ({seasons[0]}-{seasons[-1]}) with {args.workers} workers")
+    print("Params:", params)
+
+    start = time.perf_counter()
+    results = walk_forward(seasons, params, workers=args.workers)
+    wall_seconds = time.perf_counter() - start
+
+    print("\nPer-season results:")
+    print(results[['season', 'train_rows', 'test_rows', 'mae', 'r2', 'baseline_mae']].to_string(
+        index=False, formatters={'mae': '€{:,.0f}'.format, 'baseline_mae': '€{:,.0f}'.format},
+    ))
+
+    print("\nStability:")
+    print(f"MAE mean €{results['mae'].mean():,.0f}, std €{results['mae'].std():,.0f}")
+    print(f"R² mean {results['r2'].mean():.3f}, min {results['r2'].min():.3f}")
+    print(f"Beats baseline in {(results['mae'] < results['baseline_mae']).sum()} of {len(results)} seasons")
+
+    timing_cols = ['load_seconds', 'bin_seconds', 'fit_seconds', 'predict_seconds']
+    print("\nTiming breakdown (seconds, summed over folds):")
+    print(results[timing_cols + ['cpu_seconds']].sum().to_string())
+    print(f"Fold datasets loaded from cache: {results['dataset_cached'].sum()} of {len(results)}")
+    cpu_seconds = results['cpu_seconds'].sum()
+    print(f"Wall time: {wall_seconds:.1f}s for {cpu_seconds:.1f}s of fold CPU time "
+          f"({cpu_seconds / wall_seconds:.1f}x parallelism)")
+
+    results.to_csv(output_path, index=False)
+    print("\nSaved backtest results to:", output_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# Model inputs as one contiguous float32 matrix, columns in the order the models were trained on
+def to_matrix(X, features):
+    if hasattr(X, 'columns'):
+        if list(X.columns) != features:
+            X = X[features]
+        X = X.to_numpy(dtype=np.float32)
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+# Each model's share of the cores when n_models score at the same time, so together they don't oversubscribe them
+def threads_per_model(n_models):
+    return max(1, (os.cpu_count() or 1) // n_models)
+
+
+# Several LightGBM models scored over one shared float32 matrix
+class MultiBoosterModel:
+    def __init__(self, models, features):
+        self.models = list(models)
+        self.features = list(features)
+
+    def to_matrix(self, X):
+        return to_matrix(X, self.features)
+
+    # (n_rows, n_models) raw predictions. Boosters run concurrently since LightGBM releases the GIL,
+    # each with its share of the cores.
+    def predict_all(self, X, executor=None):
+        M = self.to_matrix(X)
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=len(self.models)) as pool:
+                return self._run(pool, M)
+        return self._run(executor, M)
+
+    def _run(self, executor, M):
+        threads = threads_per_model(len(self.models))
+        futures = [executor.submit(model.booster_.predict, M, num_threads=threads) for model in self.models]
+        return np.column_stack([f.result() for f in futures])
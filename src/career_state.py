@@ -0,0 +1,265 @@
+import os
+import math
+
+import pandas as pd
+import numpy as np
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Persisted career-state table, one row per player_id
+state_path = os.path.join(script_dir, '..', 'data', 'processed', 'career_state.pkl')
+
+# Smoothing of ewm_goals_contrib in feature_engineering.py (span=10, adjust=False)
+EWM_ALPHA = 2 / (10 + 1)
+
+# Running sums kept per player and the per-season column each one adds up
+SUM_COLUMNS = {
+    'sum_goals': 'goals',
+    'sum_assists': 'assists',
+    'sum_clean_sheets': 'clean_sheets',
+    'sum_goals_conceded': 'goals_conceded',
+}
+
+# Last three seasons, most recent first (suffix _1)
+LAST3_COLUMNS = {
+    'minutes': 'minutes_played',
+    'g90': 'goals_per_90_season',
+    'a90': 'assists_per_90_season',
+    'gc90': 'goals_contrib_per_90_season',
+}
+
+
+# Build the table from the feature-engineered frame (sorted by player_id, season_start_year).
+# Each player's state is the state after their latest season.
+def build_career_state(df):
+    g = df.groupby('player_id', sort=False)
+    last = g.tail(1).set_index('player_id')
+
+    state = pd.DataFrame(index=last.index)
+    state['n_seasons'] = g.size()
+    state['sum_goals'] = last['career_goals']
+    state['sum_assists'] = last['career_assists']
+    state['sum_clean_sheets'] = last['career_clean_sheets']
+    state['sum_goals_conceded'] = last['career_goals_conceded']
+    state['max_value'] = g['value'].max()
+    state['first_season'] = g['season_start_year'].min()
+    state['last_season'] = last['season_start_year']
+    state['last_goals'] = last['goals']
+    state['last_assists'] = last['assists']
+    state['ewm_goals_contrib'] = last['ewm_goals_contrib']
+
+    for k in (1, 2, 3):
+        nth = g.nth(-k).set_index('player_id')
+        for prefix, col in LAST3_COLUMNS.items():
+            state[f'{prefix}_{k}'] = nth[col].reindex(state.index)
+
+    # Dataset-wide constants used by a few row-level features
+    state.attrs['min_season'] = int(df['season_start_year'].min())
+    state.attrs['max_contract_remaining_years'] = float(df['contract_remaining_years'].max())
+    return state
+
+
+def save_career_state(state, path=state_path):
+    state.to_pickle(path)
+
+
+def load_career_state(path=state_path):
+    return pd.read_pickle(path)
+
+
+# A player's stored state as a dict, or None for a player with no history
+def get_state(table, player_id):
+    if player_id not in table.index:
+        return None
+    return table.loc[player_id].to_dict()
+
+
+def _num(row, key):
+    value = row.get(key, 0)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return 0.0
+    return float(value)
+
+
+# Like _num, but missing stays NaN: the batch features keep NaN age and contract values as they are
+def _float(row, key):
+    value = row.get(key, np.nan)
+    return np.nan if value is None else float(value)
+
+
+# Per-90 rate, 0 without minutes. Takes scalars or arrays, so what_if.py can apply it to a whole grid.
+def per_90(count, minutes):
+    minutes = np.asarray(minutes, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(minutes > 0, count / (minutes / 90), 0.0)
+    return rate if rate.ndim else float(rate)
+
+
+def _last3_mean(state, prefix):
+    values = [state[f'{prefix}_{k}'] for k in (1, 2, 3)]
+    values = [v for v in values if not math.isnan(v)]
+    return sum(values) / len(values) if values else 0.0
+
+
+# Full feature row for a new season from the raw season row and the player's stored state, in constant time.
+# Cross-player aggregates (team, position and competition features) can't come from one player's state;
+# they are taken from the row when the caller provides them.
+def career_features(state, row, min_season, max_contract_remaining_years):
+    goals = _num(row, 'goals')
+    assists = _num(row, 'assists')
+    clean_sheets = _num(row, 'clean_sheets')
+    goals_conceded = _num(row, 'goals_conceded')
+    minutes = _num(row, 'minutes_played')
+    season = int(row['season_start_year'])
+    age = _float(row, 'age')
+    contract_years = _float(row, 'contract_remaining_years')
+    goal_contributions = goals + assists
+
+    n = state['n_seasons'] if state else 0
+    sums = {k: (state[k] if state else 0.0) for k in SUM_COLUMNS}
+
+    f = dict(row)
+    f['goal_contributions'] = goal_contributions
+
+    # Career totals including this season
+    f['career_goals'] = sums['sum_goals'] + goals
+    f['career_assists'] = sums['sum_assists'] + assists
+    f['career_goals_contrib'] = f['career_goals'] + f['career_assists']
+    f['career_clean_sheets'] = sums['sum_clean_sheets'] + clean_sheets
+    f['career_goals_conceded'] = sums['sum_goals_conceded'] + goals_conceded
+
+    # Career totals until last season
+    f['career_goals_prev'] = sums['sum_goals']
+    f['career_assists_prev'] = sums['sum_assists']
+    f['career_goals_contrib_prev'] = sums['sum_goals'] + sums['sum_assists']
+    f['career_clean_sheets_prev'] = sums['sum_clean_sheets']
+    f['career_goals_conceded_prev'] = sums['sum_goals_conceded']
+
+    # Averages including this season and until last season
+    f['avg_goals_per_season'] = f['career_goals'] / (n + 1)
+    f['avg_assists_per_season'] = f['career_assists'] / (n + 1)
+    f['avg_goals_contrib_per_season'] = f['career_goals_contrib'] / (n + 1)
+    f['avg_clean_sheets_per_season'] = f['career_clean_sheets'] / (n + 1)
+    f['avg_goals_conceded_per_season'] = f['career_goals_conceded'] / (n + 1)
+    f['avg_goals_per_season_prev'] = f['career_goals_prev'] / n if n else 0.0
+    f['avg_assists_per_season_prev'] = f['career_assists_prev'] / n if n else 0.0
+    f['avg_goals_contrib_per_season_prev'] = f['career_goals_contrib_prev'] / n if n else 0.0
+    f['avg_clean_sheets_per_season_prev'] = f['career_clean_sheets_prev'] / n if n else 0.0
+    f['avg_goals_conceded_per_season_prev'] = f['career_goals_conceded_prev'] / n if n else 0.0
+
+    # Per 90 metrics
+    f['goals_per_90_season'] = per_90(goals, minutes)
+    f['assists_per_90_season'] = per_90(assists, minutes)
+    f['goals_contrib_per_90_season'] = per_90(goal_contributions, minutes)
+
+    # Last season and last 3 seasons
+    if state:
+        f['goals_per_90_last_season'] = state['g90_1']
+        f['assists_per_90_last_season'] = state['a90_1']
+        f['goals_contrib_per_90_last_season'] = state['gc90_1']
+        f['minutes_last_season'] = state['minutes_1']
+        f['goals_per_90_last3_avg'] = _last3_mean(state, 'g90')
+        f['assists_per_90_last3_avg'] = _last3_mean(state, 'a90')
+        f['goals_contrib_per_90_last3_avg'] = _last3_mean(state, 'gc90')
+        f['minutes_last3_avg'] = _last3_mean(state, 'minutes')
+        f['max_value_prev_seasons'] = 0.0 if math.isnan(state['max_value']) else state['max_value']
+        f['experience_years'] = season - state['first_season']
+        f['ewm_goals_contrib'] = EWM_ALPHA * goal_contributions + (1 - EWM_ALPHA) * state['ewm_goals_contrib']
+        f['goals_change_vs_last_season'] = goals - state['last_goals']
+        f['assists_change_vs_last_season'] = assists - state['last_assists']
+        f['minutes_change_vs_last_season'] = minutes - state['minutes_1']
+    else:
+        for col in [
+            'goals_per_90_last_season', 'assists_per_90_last_season', 'goals_contrib_per_90_last_season',
+            'minutes_last_season', 'goals_per_90_last3_avg', 'assists_per_90_last3_avg',
+            'goals_contrib_per_90_last3_avg', 'minutes_last3_avg', 'max_value_prev_seasons',
+            'experience_years', 'goals_change_vs_last_season', 'assists_change_vs_last_season',
+        ]:
+            f[col] = 0.0
+        f['ewm_goals_contrib'] = goal_contributions
+        f['minutes_change_vs_last_season'] = minutes
+
+    # Row-level features, same formulas as feature_engineering.py
+    nb_on_pitch = _num(row, 'nb_on_pitch')
+    f['season_year_offset'] = season - min_season
+    f['clean_sheet_rate'] = clean_sheets / nb_on_pitch if nb_on_pitch > 0 else 0.0
+    f['age_squared'] = age ** 2
+    f['short_contract'] = int(contract_years <= 1)
+    longest_contract = max(max_contract_remaining_years, contract_years)
+    f['contract_remaining_ratio'] = contract_years / longest_contract if longest_contract > 0 else 0.0
+    f['hot_transfer_candidate'] = int(contract_years <= 1 and age < 25 and f['avg_goals_contrib_per_season'] > 5)
+    f['trusted_goals_contrib'] = f['goals_contrib_per_90_season'] * np.log1p(minutes)
+    f['prime_age_factor'] = float(np.clip(1 - abs(age - 26) / 10, 0, None))
+    f['contract_pressure_score'] = f['goals_contrib_per_90_season'] / (1 + contract_years)
+    f['weighted_goals_contrib'] = f['career_goals_contrib_prev'] * 0.7 + f['avg_goals_contrib_per_season_prev'] * 0.3
+    return f
+
+
+# Online path: one dictionary lookup plus career_features, no history scan
+def new_season_features(table, row):
+    return career_features(
+        get_state(table, row['player_id']), row,
+        table.attrs['min_season'], table.attrs['max_contract_remaining_years'],
+    )
+
+
+# Fold a finished season into the player's state, also in constant time
+def update_career_state(state, row):
+    goals = _num(row, 'goals')
+    assists = _num(row, 'assists')
+    minutes = _num(row, 'minutes_played')
+    season = int(row['season_start_year'])
+    value = row.get('value', np.nan)
+    value = np.nan if value is None else float(value)
+
+    if state is None:
+        state = {'n_seasons': 0, 'max_value': np.nan, 'first_season': season, 'ewm_goals_contrib': 0.0}
+        state.update({k: 0.0 for k in SUM_COLUMNS})
+        state.update({f'{p}_{k}': np.nan for p in LAST3_COLUMNS for k in (1, 2, 3)})
+    new = dict(state)
+
+    new['n_seasons'] = state['n_seasons'] + 1
+    for key, col in SUM_COLUMNS.items():
+        new[key] = state[key] + _num(row, col)
+    new['max_value'] = np.fmax(state['max_value'], value)
+    new['first_season'] = min(state['first_season'], season)
+    new['last_season'] = season
+    new['last_goals'] = goals
+    new['last_assists'] = assists
+
+    goal_contributions = goals + assists
+    new['ewm_goals_contrib'] = (
+        goal_contributions if state['n_seasons'] == 0
+        else EWM_ALPHA * goal_contributions + (1 - EWM_ALPHA) * state['ewm_goals_contrib']
+    )
+
+    latest = {
+        'minutes': minutes,
+        'g90': per_90(goals, minutes),
+        'a90': per_90(assists, minutes),
+        'gc90': per_90(goal_contributions, minutes),
+    }
+    for prefix, current in latest.items():
+        new[f'{prefix}_3'] = state[f'{prefix}_2']
+        new[f'{prefix}_2'] = state[f'{prefix}_1']
+        new[f'{prefix}_1'] = current
+    return new
+
+
+# Apply a batch of finished seasons to the table without touching any other player's history
+def update_career_table(table, rows):
+    updated = {}
+    for row in rows.sort_values(['player_id', 'season_start_year']).to_dict('records'):
+        pid = row['player_id']
+        state = updated.get(pid) or get_state(table, pid)
+        updated[pid] = update_career_state(state, row)
+
+    changes = pd.DataFrame.from_dict(updated, orient='index')[table.columns]
+    new_table = pd.concat([table.drop(index=changes.index, errors='ignore'), changes])
+    new_table.attrs = dict(table.attrs)
+    new_table.attrs['min_season'] = min(table.attrs['min_season'], int(rows['season_start_year'].min()))
+    new_table.attrs['max_contract_remaining_years'] = max(
+        table.attrs['max_contract_remaining_years'], float(rows['contract_remaining_years'].max())
+    )
+    return new_table
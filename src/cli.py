@@ -0,0 +1,72 @@
+import os
+import sys
+import importlib
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+scripts_dir = os.path.join(script_dir, '..', 'scripts')
+
+# Subcommand -> (folder, module, help). Modules are only imported when their subcommand runs,
+# so each one pays for the libraries it uses and nothing else.
+COMMANDS = {
+    'ingest': (scripts_dir, 'ingest_raw', "Validate and clean new raw data drops"),
+    'preprocess': (scripts_dir, 'preprocess_all', "Run the raw data preprocessing and merge steps"),
+    'preprocess-lazy': (scripts_dir, 'lazy_pipeline', "Build the model-ready dataset from raw CSVs in one pass"),
+    'preprocess-master': (scripts_dir, 'preprocess_master_dataset', "Clean the master dataset"),
+    'merge': (scripts_dir, 'merge_datasets', "Merge the clean datasets into the master dataset"),
+    'profile': (scripts_dir, 'profile_dataset', "Profile a pipeline stage's CSV in one streaming pass"),
+    'league-strength': (script_dir, 'league_strength', "Solve and save the league-strength ratings"),
+    'features': (script_dir, 'feature_engineering', "Build the features dataset and snapshot"),
+    'train': (script_dir, 'train_model', "Tune, evaluate and register the models"),
+    'predict': (script_dir, 'predict_model', "Score the features snapshot"),
+    'analyze': (script_dir, 'analyze_predictions', "Merge predictions with features and compute errors"),
+    'plot': (script_dir, 'plot_results', "Plot actual vs predicted values"),
+    'backtest': (script_dir, 'backtest', "Walk-forward backtest over seasons"),
+    'drift': (script_dir, 'drift_monitor', "Feature drift and data-quality monitor"),
+    'experiments': (script_dir, 'experiment_store', "Query or clear the recorded hyperparameter trials"),
+    'cache': (script_dir, 'prediction_cache', "Inspect or clear the prediction cache"),
+    'similar': (script_dir, 'similar_players', "Find similar player-seasons"),
+    'screen': (script_dir, 'screen_targets', "Screen for undervalued transfer targets"),
+    'what-if': (script_dir, 'what_if', "Simulate valuations under changed inputs"),
+    'check-career-state': (scripts_dir, 'check_career_state', "Check the online career features against the batch features"),
+    'benchmark-ensemble': (scripts_dir, 'benchmark_ensemble', "Time ensemble scoring"),
+    'benchmark-quantiles': (scripts_dir, 'benchmark_quantiles', "Time quantile scoring"),
+    'benchmark-dataset-cache': (scripts_dir, 'benchmark_dataset_cache', "Time the LGB search with the dataset cache"),
+    'benchmark-teammates': (scripts_dir, 'benchmark_teammate_features', "Time the sparse teammate features against groupbys"),
+    'benchmark-profiler': (scripts_dir, 'benchmark_profiler', "Compare the streaming profiler with a full-load summary"),
+    'benchmark-horizons': (scripts_dir, 'benchmark_horizons', "Time scoring all forecast horizons in one pass"),
+    'benchmark-asof-join': (scripts_dir, 'benchmark_asof_join', "Time the as-of valuation join against the calendar-year merge"),
+}
+
+
+def usage():
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: python src/cli.py <command> [options]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {help_text}" for name, (_, _, help_text) in COMMANDS.items()]
+    lines += ["", "Run python src/cli.py <command> --help for the options of a command."]
+    return '\n'.join(lines)
+
+
+# Import the subcommand's module and hand it the remaining arguments.
+# argparse is not used here so that --help is passed through to the subcommand.
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"Unknown command: {argv[0]}\n", file=sys.stderr)
+        print(usage(), file=sys.stderr)
+        return 2
+
+    folder, module_name, _ = COMMANDS[argv[0]]
+    for path in (script_dir, folder):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    module = importlib.import_module(module_name)
+    return module.main(argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import hashlib
+
+import numpy as np
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# LightGBM binary datasets, one file per (snapshot, row set, binning params)
+cache_dir = os.path.join(script_dir, '..', 'data', 'processed', 'lgb_dataset_cache')
+
+# Params that decide how LightGBM bins the features. Pre-filtering depends on min_child_samples,
+# so it is off and one binned dataset serves every candidate of the search.
+BIN_PARAMS = {
+    'max_bin': 255,
+    'min_data_in_bin': 3,
+    'bin_construct_sample_cnt': 200_000,
+    'feature_pre_filter': False,
+    'verbose': -1,
+}
+
+# LGBMRegressor defaults passed to lgb.train, so boosters match the sklearn models exactly
+TRAIN_PARAMS = {'objective': 'regression', 'random_state': 42, 'verbose': -1}
+
+
+# Cache key of everything but the rows: the snapshot's data and schema, the target's values and the
+# binning params. The binned files store the labels, so they must not be reused once the labels change.
+def snapshot_key(snapshot, target, bin_params=BIN_PARAMS):
+    return hashlib.sha256(json.dumps({
+        'schema_hash': snapshot.schema_hash,
+        'data_hash': snapshot.schema['data_hash'],
+        'target': f'log1p({target})',
+        'target_hash': snapshot.target_hash(target),
+        'bin_params': bin_params,
+    }, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def rows_key(rows):
+    return hashlib.sha256(np.asarray(rows, dtype=np.int64).tobytes()).hexdigest()[:24]
+
+
+# Binned training sets of the features snapshot, saved with Dataset.save_binary and
+# loaded back instead of re-binning the pandas matrix on every fit.
+class DatasetCache:
+    def __init__(self, snapshot, target='value', cache_dir=cache_dir, bin_params=BIN_PARAMS):
+        self.snapshot = snapshot
+        self.target = target
+        self.cache_dir = cache_dir
+        self.bin_params = dict(bin_params)
+        self.prefix = snapshot_key(snapshot, target, self.bin_params)
+        self._datasets = {}
+        self.hits = 0
+        self.misses = 0
+        self.build_seconds = 0.0
+        self.load_seconds = 0.0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f'{self.prefix}-{key}.bin')
+
+    # Constructed Dataset for the given snapshot rows, from memory, disk or built and saved
+    def dataset(self, rows):
+        import lightgbm as lgb
+
+        rows = np.asarray(rows, dtype=np.int64)
+        key = rows_key(rows)
+        if key in self._datasets:
+            return self._datasets[key]
+
+        path = self.path(key)
+        start = time.perf_counter()
+        if os.path.exists(path):
+            dataset = lgb.Dataset(path, params=self.bin_params).construct()
+            self.load_seconds += time.perf_counter() - start
+            self.hits += 1
+        else:
+            y = np.log1p(self.snapshot.keys[self.target].to_numpy(dtype=np.float64)[rows])
+            dataset = lgb.Dataset(self.snapshot.X.iloc[rows], label=y, params=self.bin_params).construct()
+            # Written under a temporary name so parallel workers never read a partial file
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            dataset.save_binary(tmp_path)
+            os.replace(tmp_path, path)
+            self.build_seconds += time.perf_counter() - start
+            self.misses += 1
+
+        self._datasets[key] = dataset
+        return dataset
+
+    # Booster trained on the cached rows with LGBMRegressor-style params
+    def train(self, params, rows, threads=-1):
+        import lightgbm as lgb
+
+        params = {**TRAIN_PARAMS, 'n_jobs': threads, **params}
+        num_boost_round = params.pop('n_estimators', 100)
+        return lgb.train(params, self.dataset(rows), num_boost_round=num_boost_round)
+
+    # Drop the files of other snapshots or binning params, they can never be hit again
+    def prune(self):
+        removed = 0
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith('.bin') and not file_name.startswith(f'{self.prefix}-'):
+                os.remove(os.path.join(self.cache_dir, file_name))
+                removed += 1
+        return removed
+
+    def summary(self):
+        return (f"{self.misses} datasets binned in {self.build_seconds:.2f}s, "
+                f"{self.hits} loaded from cache in {self.load_seconds:.2f}s")
@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+import feature_store
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Training-time sketches and the last monitoring report
+baseline_path = os.path.join(script_dir, '..', 'data', 'processed', 'drift_baseline.pkl')
+report_path = os.path.join(script_dir, '..', 'data', 'processed', 'drift_report.json')
+
+# Quantiles of the training data used as histogram bin edges
+EDGE_QUANTILES = np.linspace(0.05, 0.95, 19)
+
+# Rows sampled to place the bin edges; counting always uses every row
+EDGE_SAMPLE_ROWS = 200_000
+
+# Features that move with time by construction, never compared
+TRENDING_FEATURES = ['season_year_offset']
+
+# (warn, alert) thresholds
+PSI_THRESHOLDS = (0.1, 0.25)
+KS_THRESHOLDS = (0.1, 0.2)
+NULL_RATE_THRESHOLDS = (0.02, 0.1)    # increase in the share of missing values
+OUT_OF_RANGE_THRESHOLDS = (0.01, 0.05)  # share of values outside the training min/max
+
+
+# Streaming per-feature summary over fixed bins: counts per bin plus null, inf, min/max and moments.
+# Sketches over the same edges merge by addition, so batches can be folded in one at a time.
+class FeatureSketches:
+    def __init__(self, features, edges):
+        self.features = list(features)
+        self.edges = edges
+        n = len(self.features)
+        self.counts = [np.zeros(len(e) + 1, dtype=np.int64) for e in edges]
+        self.rows = 0
+        self.nulls = np.zeros(n, dtype=np.int64)
+        self.infs = np.zeros(n, dtype=np.int64)
+        self.finite = np.zeros(n, dtype=np.int64)
+        self.total = np.zeros(n, dtype=np.float64)
+        self.total_sq = np.zeros(n, dtype=np.float64)
+        self.min = np.full(n, np.inf)
+        self.max = np.full(n, -np.inf)
+        self.below_min = np.zeros(n, dtype=np.int64)
+        self.above_max = np.zeros(n, dtype=np.int64)
+
+    def empty_like(self):
+        return FeatureSketches(self.features, self.edges)
+
+    # Fold a batch (rows x features, same column order) into the sketches in one pass per column.
+    # reference: sketches whose min/max define the out-of-range counts.
+    def update(self, M, reference=None):
+        M = np.asarray(M)
+        self.rows += len(M)
+        for j in range(len(self.features)):
+            col = M[:, j].astype(np.float64)
+            is_nan = np.isnan(col)
+            is_inf = np.isinf(col)
+            values = col[~is_nan & ~is_inf]
+
+            self.nulls[j] += int(is_nan.sum())
+            self.infs[j] += int(is_inf.sum())
+            self.finite[j] += len(values)
+            self.counts[j] += np.bincount(np.searchsorted(self.edges[j], values, side='right'),
+                                          minlength=len(self.counts[j]))
+            if len(values):
+                self.total[j] += values.sum()
+                self.total_sq[j] += np.square(values).sum()
+                self.min[j] = min(self.min[j], values.min())
+                self.max[j] = max(self.max[j], values.max())
+                if reference is not None:
+                    self.below_min[j] += int((values < reference.min[j]).sum())
+                    self.above_max[j] += int((values > reference.max[j]).sum())
+        return self
+
+    def merge(self, other):
+        for j in range(len(self.features)):
+            self.counts[j] += other.counts[j]
+        self.rows += other.rows
+        for name in ['nulls', 'infs', 'finite', 'total', 'total_sq', 'below_min', 'above_max']:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def mean(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.finite > 0, self.total / self.finite, np.nan)
+
+
+# Bin edges from training quantiles, one array per feature
+def quantile_edges(M, sample_rows=EDGE_SAMPLE_ROWS, seed=42):
+    if len(M) > sample_rows:
+        rows = np.sort(np.random.default_rng(seed).choice(len(M), sample_rows, replace=False))
+        M = M[rows]
+    M = np.asarray(M, dtype=np.float64)
+    edges = []
+    for j in range(M.shape[1]):
+        col = M[:, j]
+        col = col[np.isfinite(col)]
+        edges.append(np.unique(np.quantile(col, EDGE_QUANTILES)) if len(col) else np.array([]))
+    return edges
+
+
+# Baseline sketches of the training matrix, bound to the snapshot schema
+def build_baseline(M, features, schema_hash):
+    sketches = FeatureSketches(features, quantile_edges(M)).update(M)
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'schema_hash': schema_hash,
+        'sketches': sketches,
+    }
+
+
+def save_baseline(baseline, path=baseline_path):
+    import joblib
+    joblib.dump(baseline, path)
+
+
+def load_baseline(path=baseline_path):
+    import joblib
+    return joblib.load(path)
+
+
+# Population stability index between two binned distributions
+def psi(expected_counts, actual_counts, eps=1e-4):
+    if expected_counts.sum() == 0 or actual_counts.sum() == 0:
+        return 0.0
+    p = np.maximum(expected_counts / expected_counts.sum(), eps)
+    q = np.maximum(actual_counts / actual_counts.sum(), eps)
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+# Kolmogorov-Smirnov statistic evaluated at the shared bin edges
+def ks_statistic(expected_counts, actual_counts):
+    if expected_counts.sum() == 0 or actual_counts.sum() == 0:
+        return 0.0
+    cdf_expected = np.cumsum(expected_counts) / expected_counts.sum()
+    cdf_actual = np.cumsum(actual_counts) / actual_counts.sum()
+    return float(np.max(np.abs(cdf_expected - cdf_actual)))
+
+
+def _level(value, thresholds):
+    warn, alert = thresholds
+    if value >= alert:
+        return 'alert'
+    if value >= warn:
+        return 'warn'
+    return 'ok'
+
+
+# Per-feature drift and data-quality checks of a batch against the baseline
+def compare(baseline_sketches, batch_sketches):
+    levels = ['ok', 'warn', 'alert']
+    features = []
+    for j, name in enumerate(baseline_sketches.features):
+        if name in TRENDING_FEATURES:
+            continue
+        base_null_rate = baseline_sketches.nulls[j] / max(baseline_sketches.rows, 1)
+        null_rate = batch_sketches.nulls[j] / max(batch_sketches.rows, 1)
+        out_of_range = (batch_sketches.below_min[j] + batch_sketches.above_max[j]) / max(batch_sketches.finite[j], 1)
+
+        checks = {
+            'psi': psi(baseline_sketches.counts[j], batch_sketches.counts[j]),
+            'ks': ks_statistic(baseline_sketches.counts[j], batch_sketches.counts[j]),
+            'null_rate_increase': max(null_rate - base_null_rate, 0.0),
+            'out_of_range': out_of_range,
+        }
+        status = {
+            'psi': _level(checks['psi'], PSI_THRESHOLDS),
+            'ks': _level(checks['ks'], KS_THRESHOLDS),
+            'null_rate_increase': _level(checks['null_rate_increase'], NULL_RATE_THRESHOLDS),
+            'out_of_range': _level(checks['out_of_range'], OUT_OF_RANGE_THRESHOLDS),
+        }
+        # Infinite values are never valid model inputs
+        if batch_sketches.infs[j] > 0:
+            status['infinite_values'] = 'alert'
+            checks['infinite_values'] = int(batch_sketches.infs[j])
+
+        features.append({
+            'feature': name,
+            'level': max(status.values(), key=levels.index),
+            **{k: round(float(v), 6) for k, v in checks.items()},
+            'baseline_mean': float(baseline_sketches.mean()[j]),
+            'batch_mean': float(batch_sketches.mean()[j]),
+            'batch_max': float(batch_sketches.max[j]),
+            'failed_checks': [k for k, v in status.items() if v != 'ok'],
+        })
+
+    return sorted(features, key=lambda f: (-levels.index(f['level']), -f['psi']))
+
+
+# Sketch each season partition against the baseline without touching the training rows
+def check_seasons(seasons, baseline, input_dir=feature_store.partitions_dir):
+    manifest = feature_store.load_partitions_manifest(input_dir)
+    if manifest['schema']['schema_hash'] != baseline['schema_hash']:
+        raise feature_store.SchemaMismatchError(
+            "Drift baseline was built for another feature schema. Rebuild it with: python src/drift_monitor.py baseline"
+        )
+
+    reference = baseline['sketches']
+    report = {}
+    for season in seasons:
+        matrix, _ = feature_store.load_partition(season, input_dir, manifest=manifest)
+        batch = reference.empty_like().update(matrix, reference=reference)
+        features = compare(reference, batch)
+        report[str(season)] = {
+            'rows': batch.rows,
+            'alerts': sum(f['level'] == 'alert' for f in features),
+            'warnings': sum(f['level'] == 'warn' for f in features),
+            'features': features,
+        }
+    return report
+
+
+# Baseline of the rows the models train on: seasons before the split year with a known value
+def baseline_from_snapshot(snapshot=None):
+    snapshot = snapshot or feature_store.load_snapshot()
+    has_target = snapshot.keys['value'].notna().to_numpy()
+    train_rows = has_target & (snapshot.column('season_start_year') < snapshot.schema['split_year'])
+    return build_baseline(snapshot.matrix[train_rows], snapshot.feature_columns, snapshot.schema_hash)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Feature drift and data-quality monitor")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('baseline', help="Sketch the training seasons of the features snapshot")
+
+    check_parser = subparsers.add_parser('check', help="Compare season partitions with the training baseline")
+    check_parser.add_argument('--season', type=int, nargs='+',
+                              help="Seasons to check (default: every season from the split year on)")
+    check_parser.add_argument('--strict', action='store_true', help="Exit with status 1 when any alert fires")
+    args = parser.parse_args(argv)
+
+    if args.command == 'baseline':
+        baseline = baseline_from_snapshot()
+        save_baseline(baseline)
+        print(f"Sketched {baseline['sketches'].rows} training rows x {len(baseline['sketches'].features)} features")
+        print("Saved drift baseline to:", baseline_path)
+        return
+
+    baseline = load_baseline()
+    manifest = feature_store.load_partitions_manifest()
+    seasons = args.season or [
+        int(s) for s in manifest['seasons'] if int(s) >= manifest['schema']['split_year']
+    ]
+
+    report = check_seasons(sorted(seasons), baseline)
+    with open(report_path, 'w') as f:
+        json.dump({
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'baseline_created_at': baseline['created_at'],
+            'seasons': report,
+        }, f, indent=2)
+
+    for season, result in report.items():
+        print(f"\nSeason {season}: {result['rows']} rows, {result['alerts']} alerts, {result['warnings']} warnings")
+        for f in result['features']:
+            if f['level'] != 'ok':
+                print(f"  [{f['level']}] {f['feature']}: PSI {f['psi']:.3f}, KS {f['ks']:.3f}, "
+                      f"out of range {f['out_of_range']:.1%} ({', '.join(f['failed_checks'])})")
+
+    print("\nSaved drift report to:", report_path)
+    if args.strict and any(r['alerts'] for r in report.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
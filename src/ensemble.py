@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import boosters
+
+
+# Non-negative blend weights (summing to 1) fitted on held-out log predictions
+def fit_blend_weights(predictions, y):
+    from scipy.optimize import nnls
+
+    P = np.column_stack(predictions)
+    weights, _ = nnls(P, np.asarray(y, dtype=np.float64))
+    if weights.sum() == 0:
+        return np.full(P.shape[1], 1 / P.shape[1])
+    return weights / weights.sum()
+
+
+# LightGBM + HistGradientBoosting blend scored over one shared float32 matrix.
+# The HGB model was trained on scaled numeric features, so the fitted StandardScaler is kept with it.
+class EnsembleModel:
+    def __init__(self, lgb_model, hgb_model, scaler, scaled_features, features, weights):
+        self.lgb_model = lgb_model
+        self.hgb_model = hgb_model
+        self.features = list(features)
+        self.weights = np.asarray(weights, dtype=np.float64)
+
+        # Scaling is applied directly to matrix columns, avoiding a DataFrame copy per batch
+        self.scaled_idx = np.array([self.features.index(c) for c in scaled_features], dtype=np.intp)
+        self.scale_mean = scaler.mean_.astype(np.float32)
+        self.scale_std = scaler.scale_.astype(np.float32)
+
+    def to_matrix(self, X):
+        return boosters.to_matrix(X, self.features)
+
+    # Each model gets half the cores, since both score at the same time
+    def _predict_lgb(self, M):
+        return self.lgb_model.booster_.predict(M, num_threads=boosters.threads_per_model(2))
+
+    def _predict_hgb(self, M):
+        from threadpoolctl import threadpool_limits
+
+        M_scaled = M.copy()
+        M_scaled[:, self.scaled_idx] = (M[:, self.scaled_idx] - self.scale_mean) / self.scale_std
+        # HGB was fitted on a DataFrame, so it gets one with the same column names (a view, not a copy).
+        # Its OpenMP thread count is set for the calling thread only, so the LGB thread keeps its own.
+        with threadpool_limits(limits=boosters.threads_per_model(2), user_api='openmp'):
+            return self.hgb_model.predict(pd.DataFrame(M_scaled, columns=self.features, copy=False))
+
+    # Both models score the same matrix concurrently; their native code releases the GIL
+    def predict_components(self, X, executor=None):
+        M = self.to_matrix(X)
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                return self._run(pool, M)
+        return self._run(executor, M)
+
+    def _run(self, executor, M):
+        lgb_future = executor.submit(self._predict_lgb, M)
+        hgb_future = executor.submit(self._predict_hgb, M)
+        return lgb_future.result(), hgb_future.result()
+
+    def predict(self, X, executor=None):
+        lgb_pred, hgb_pred = self.predict_components(X, executor)
+        return self.weights[0] * lgb_pred + self.weights[1] * hgb_pred
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Append-only log of evaluated folds, and the fold models they fitted
+store_dir = os.path.join(script_dir, '..', 'data', 'processed', 'experiments')
+TRIALS_FILE = 'trials.jsonl'
+MODELS_DIR = 'models'
+
+
+def _hash(payload, length=16):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:length]
+
+
+# Snapshot a trial was scored on: its data and the values of the target, so trials on
+# older labels are never read back as scores for new ones
+def snapshot_id(snapshot, target):
+    return _hash({'data_hash': snapshot.schema['data_hash'], 'target_hash': snapshot.target_hash(target)})
+
+
+# Key of the data a search runs on: the snapshot's schema and data, the target and any preprocessing
+def data_key(snapshot, target, **preprocessing):
+    return _hash({
+        'schema_hash': snapshot.schema_hash,
+        'snapshot': snapshot_id(snapshot, target),
+        'target': f'log1p({target})',
+        'preprocessing': preprocessing,
+    })
+
+
+# Key of the fold definition: the snapshot rows each fold trains and validates on
+def folds_key(folds):
+    digest = hashlib.sha256()
+    for train_rows, val_rows in folds:
+        digest.update(np.asarray(train_rows, dtype=np.int64).tobytes())
+        digest.update(b'|')
+        digest.update(np.asarray(val_rows, dtype=np.int64).tobytes())
+        digest.update(b'/')
+    return digest.hexdigest()[:16]
+
+
+def trial_key(data, folds, model_type, params):
+    return _hash({'data': data, 'folds': folds, 'model_type': model_type, 'params': params})
+
+
+# Fitted fold model: LightGBM boosters as text model files, anything else with joblib
+def save_fold_model(model, path_prefix):
+    import joblib
+
+    if hasattr(model, 'save_model'):
+        path = f'{path_prefix}.txt'
+        model.save_model(path)
+    else:
+        path = f'{path_prefix}.pkl'
+        joblib.dump(model, path)
+    return path
+
+
+# Per-fold scores of search candidates, keyed by (data, folds, model type, params).
+# Every fold is appended to trials.jsonl as soon as it finishes, so an interrupted sweep
+# resumes from the last completed fold and a repeated search only reads the log.
+class ExperimentStore:
+    def __init__(self, directory=store_dir, save_models=True):
+        self.directory = directory
+        self.save_models = save_models
+        self.path = os.path.join(directory, TRIALS_FILE)
+        self.records = {}
+        self.hits = 0
+        self.misses = 0
+        self.fit_seconds = 0.0
+        self._partial_line = False
+        os.makedirs(os.path.join(directory, MODELS_DIR), exist_ok=True)
+
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                line = ''
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Last line of a run killed mid-write
+                        continue
+                    self.records[(record['trial'], record['fold'])] = record
+                self._partial_line = bool(line) and not line.endswith('\n')
+
+    def _append(self, record):
+        with open(self.path, 'a') as f:
+            # Start a new line after a partial one, so this record is not appended to it
+            f.write(('\n' if self._partial_line else '') + json.dumps(record, default=str) + '\n')
+        self._partial_line = False
+        self.records[(record['trial'], record['fold'])] = record
+
+    # Mean validation MAE of each candidate. Folds already in the store are read back;
+    # the others are fitted with fit_fold(params, train_rows, val_rows) -> (model, val_mae) and recorded.
+    # Fold rows are snapshot row positions; preprocessing is anything else that changes the fitted data.
+    def evaluate(self, model_type, snapshot, folds, candidates, fit_fold, target='value', preprocessing=None):
+        data = data_key(snapshot, target, **(preprocessing or {}))
+        snapshot_trials = snapshot_id(snapshot, target)
+        fold_id = folds_key(folds)
+        scores = []
+        for params in candidates:
+            trial = trial_key(data, fold_id, model_type, params)
+            fold_mae = []
+            for i, (train_rows, val_rows) in enumerate(folds):
+                record = self.records.get((trial, i))
+                if record is not None:
+                    self.hits += 1
+                    fold_mae.append(record['mae'])
+                    continue
+
+                start = time.perf_counter()
+                model, mae = fit_fold(params, train_rows, val_rows)
+                seconds = time.perf_counter() - start
+                self.fit_seconds += seconds
+                self.misses += 1
+
+                model_path = None
+                if self.save_models:
+                    model_path = save_fold_model(model, os.path.join(self.directory, MODELS_DIR, f'{trial}-{i}'))
+                self._append({
+                    'trial': trial,
+                    'fold': i,
+                    'model_type': model_type,
+                    'snapshot': snapshot_trials,
+                    'data': data,
+                    'folds': fold_id,
+                    'params': params,
+                    'mae': float(mae),
+                    'fit_seconds': seconds,
+                    'model_path': model_path,
+                    'created_at': datetime.now(timezone.utc).isoformat(),
+                })
+                fold_mae.append(mae)
+            scores.append(float(np.mean(fold_mae)))
+        return scores
+
+    # One row per fully evaluated trial, best first
+    def trials(self, model_type=None, snapshot_hash=None):
+        rows = [r for r in self.records.values()
+                if (model_type is None or r['model_type'] == model_type)
+                and (snapshot_hash is None or r['snapshot'] == snapshot_hash)]
+        if not rows:
+            return pd.DataFrame(columns=['trial', 'model_type', 'data', 'folds', 'n_folds', 'mae', 'fit_seconds',
+                                         'params'])
+
+        df = pd.DataFrame(rows)
+        df['params'] = df['params'].map(lambda p: json.dumps(p, sort_keys=True))
+        trials = df.groupby(['trial', 'model_type', 'data', 'folds', 'params'], as_index=False).agg(
+            n_folds=('fold', 'nunique'), mae=('mae', 'mean'), fit_seconds=('fit_seconds', 'sum'),
+            created_at=('created_at', 'max'))
+        return trials.sort_values('mae', kind='stable').reset_index(drop=True)
+
+    # Delete the saved fold models of trials on other snapshots, and with keep_best only those of
+    # the best trials per model type. The trials themselves stay in the log.
+    def prune_models(self, snapshot=None, keep_best=None):
+        keep = set()
+        trials = self.trials(snapshot_hash=snapshot)
+        if keep_best is not None:
+            trials = trials.groupby('model_type', sort=False).head(keep_best)
+        kept_trials = set(trials['trial'])
+        for record in self.records.values():
+            if record['trial'] in kept_trials and record.get('model_path'):
+                keep.add(os.path.basename(record['model_path']))
+
+        models_dir = os.path.join(self.directory, MODELS_DIR)
+        removed = freed = 0
+        for file_name in os.listdir(models_dir):
+            if file_name not in keep:
+                path = os.path.join(models_dir, file_name)
+                freed += os.path.getsize(path)
+                os.remove(path)
+                removed += 1
+        return removed, freed
+
+    def summary(self):
+        return f"{self.hits} folds read from the experiment store, {self.misses} fitted in {self.fit_seconds:.1f}s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the hyperparameter trials recorded by train_model.py")
+    parser.add_argument('--model', help="Only this model type (lgb, hgb)")
+    parser.add_argument('--all-snapshots', action='store_true',
+                        help="Include trials on other snapshots than the current one")
+    parser.add_argument('--top', type=int, default=10, help="Trials shown per model type")
+    parser.add_argument('--prune-models', action='store_true',
+                        help="Delete the fold models of trials on other snapshots (or, with --all-snapshots, "
+                             "on any snapshot) outside the --top best per model type")
+    parser.add_argument('--clear', action='store_true', help="Delete every recorded trial and fold model")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        import shutil
+        shutil.rmtree(store_dir, ignore_errors=True)
+        print("Cleared experiment store:", store_dir)
+        return
+
+    store = ExperimentStore()
+    snapshot_hash = None
+    if not args.all_snapshots:
+        import feature_store
+        snapshot_hash = snapshot_id(feature_store.load_snapshot(), 'value')
+
+    if args.prune_models:
+        removed, freed = store.prune_models(snapshot_hash, keep_best=args.top)
+        print(f"Removed {removed} fold models ({freed / 2**20:.1f} MB) from {os.path.join(store_dir, MODELS_DIR)}")
+        return
+
+    trials = store.trials(args.model, snapshot_hash)
+
+    print(f"{len(store.records)} folds recorded in {store.path}")
+    if not len(trials):
+        print("No trials recorded")
+        return
+
+    pd.options.display.float_format = '{:,.4f}'.format
+    pd.options.display.max_colwidth = 120
+    for model_type, group in trials.groupby('model_type', sort=True):
+        print(f"\n{model_type}: {len(group)} trials, best {args.top}")
+        print(group.head(args.top)[['mae', 'n_folds', 'fit_seconds', 'params']].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,17 @@
 import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
 
-scaler = StandardScaler()
+import feature_store
+import career_state
+import league_strength
+from teammate_graph import add_teammate_features
+from horizons import add_horizon_targets
 
 # Path to the current directory this script is in
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,172 +22,312 @@ file_path = os.path.join(script_dir, '..', 'data', 'processed', 'model_ready_dat
 # Output path for the features dataset
 output_path = os.path.join(script_dir, '..', 'data', 'processed', 'features_dataset.csv')
 
-# Load DataFrame
-df = pd.read_csv(file_path)
-df = df.sort_values(['player_id', 'season_start_year'])
-
-# Get goal contributions
-df['goal_contributions'] = df['goals'] + df['assists']
-
-# Career stats
-df['career_goals'] = df.groupby('player_id')['goals'].cumsum()
-df['career_assists'] = df.groupby('player_id')['assists'].cumsum()
-df['career_goals_contrib'] =  df['career_goals'] + df['career_assists']
-df['career_clean_sheets'] = df.groupby('player_id')['clean_sheets'].cumsum()
-df['career_goals_conceded'] = df.groupby('player_id')['goals_conceded'].cumsum()
-
-# Career stats until last season
-df['career_goals_prev'] = df.groupby('player_id')['goals'].cumsum().shift(1).fillna(0)
-df['career_assists_prev'] = df.groupby('player_id')['assists'].cumsum().shift(1).fillna(0)
-df['career_goals_contrib_prev'] =  df['career_goals_prev'] + df['career_assists_prev']
-df['career_clean_sheets_prev'] = df.groupby('player_id')['clean_sheets'].cumsum().shift(1).fillna(0)
-df['career_goals_conceded_prev'] = df.groupby('player_id')['goals_conceded'].cumsum().shift(1).fillna(0)
-
-
-# Averages
-df['avg_goals_per_season'] = df.groupby('player_id')['goals'].transform('mean')
-df['avg_assists_per_season'] = df.groupby('player_id')['assists'].transform('mean')
-df['avg_goals_contrib_per_season'] = df.groupby('player_id')['goal_contributions'].transform('mean')
-df['avg_clean_sheets_per_season'] = df.groupby('player_id')['clean_sheets'].transform('mean')
-df['avg_goals_conceded_per_season'] = df.groupby('player_id')['goals_conceded'].transform('mean')
-
-# Averages until last season
-df['avg_goals_per_season_prev'] = df.groupby('player_id')['goals'].transform('mean').shift(1).fillna(0)
-df['avg_assists_per_season_prev'] = df.groupby('player_id')['assists'].transform('mean').shift(1).fillna(0)
-df['avg_goals_contrib_per_season_prev'] = df.groupby('player_id')['goal_contributions'].transform('mean').shift(1).fillna(0)
-df['avg_clean_sheets_per_season_prev'] = df.groupby('player_id')['clean_sheets'].transform('mean').shift(1).fillna(0)
-df['avg_goals_conceded_per_season_prev'] = df.groupby('player_id')['goals_conceded'].transform('mean').shift(1).fillna(0)
-
-
-# Avoid division by zero by replacing 0 minutes with NaN, then fill NaN with 0
-minutes = df['minutes_played'].replace(0, pd.NA)
-
-# Per 90 metrics
-df['minutes_nonzero'] = df['minutes_played'].replace(0, pd.NA)
-df['goals_per_90_season'] = (df['goals'] / (df['minutes_nonzero'] / 90)).fillna(0)
-df['assists_per_90_season'] = (df['assists'] / (df['minutes_nonzero'] / 90)).fillna(0)
-df['goals_contrib_per_90_season'] = (df['goal_contributions'] / (df['minutes_nonzero'] / 90)).fillna(0)
-
-df['goals_per_90_last_season'] = df.groupby('player_id')['goals_per_90_season'].shift(1).fillna(0)
-df['assists_per_90_last_season'] = df.groupby('player_id')['assists_per_90_season'].shift(1).fillna(0)
-df['goals_contrib_per_90_last_season'] = df.groupby('player_id')['goals_contrib_per_90_season'].shift(1).fillna(0)
-df['minutes_last_season'] = df.groupby('player_id')['minutes_played'].shift(1).fillna(0)
-
-# last 3 seasons (exclude current season)
-df['goals_per_90_last3_avg'] = df.groupby('player_id')['goals_per_90_season'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
-df['assists_per_90_last3_avg'] = df.groupby('player_id')['assists_per_90_season'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
-df['goals_contrib_per_90_last3_avg'] = df.groupby('player_id')['goals_contrib_per_90_season'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
-df['minutes_last3_avg'] = df.groupby('player_id')['minutes_played'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
-
-# competition / league level aggregation
-# competition_id column exists - compute competition-season avg/median value (shifted so we don't leak)
-df['competition_prev_avg_value'] = df.groupby('competition_id')['value'].transform(lambda x: x.shift(1).expanding().mean()).fillna(0)
-
-# Also create competition historical median up to previous season to avoid leakage:
-df['competition_prev_median_value'] = df.groupby('competition_id')['value'].transform(lambda x: x.shift(1).expanding().median()).fillna(0)
-
-# - player peak/previous max value
-df['max_value_prev_seasons'] = df.groupby('player_id')['value'].transform(lambda x: x.shift(1).cummax()).fillna(0)
-
-# season-level trend feature 
-df['season_year_offset'] = df['season_start_year'] - df['season_start_year'].min()
-
-# remove temporary minutes_nonzero before saving 
-df.drop(columns=['minutes_nonzero'], inplace=True)
-
-# Clean sheet rate
-df['clean_sheet_rate'] = (df['clean_sheets'] / df['nb_on_pitch']).fillna(0)
-
-
-# Square player's age to capture non-linear effects on value
-df['age_squared'] = df['age'] ** 2
-
-# How long has a player been playing in years
-# Subtract how many years they've been playing until the current season
-df['experience_years'] = df['season_start_year'] - df.groupby('player_id')['season_start_year'].transform('min')
-
-# Team's total and average goals scored in season
-# Being on a high performing team can affect market value
-df['team_total_goals'] = df.groupby(['team_id', 'season_start_year'])['goals'].transform('sum')
-df['team_avg_goals'] = df.groupby(['team_id', 'season_start_year'])['goals'].transform('mean')
-df['team_avg_goals_per_player'] = df['team_total_goals'] / df.groupby(['team_id', 'season_start_year'])['player_id'].transform('nunique')
-
-# Contract-related features
-df['short_contract'] = (df['contract_remaining_years'] <= 1).astype(int)
-df['contract_remaining_ratio'] = df['contract_remaining_years'] / df['contract_remaining_years'].max()
-
-df['is_goalkeeper'] = (df['main_position'] == 'Goalkeepers').astype(int)
-
-# Normalize goals and assists vs position averages
-df['goals_vs_pos_avg'] = df['goals'] / df.groupby(['main_position', 'season_start_year'])['goals'].transform('mean')
-df['assists_vs_pos_avg'] = df['assists'] / df.groupby(['main_position', 'season_start_year'])['assists'].transform('mean')
-df['goal_contrib_vs_pos_avg'] = df['goal_contributions'] / df.groupby(['main_position', 'season_start_year'])['goal_contributions'].transform('mean')
-
-# Replace infs or NaNs from division by zero
-df[['goals_vs_pos_avg', 'assists_vs_pos_avg', 'goal_contrib_vs_pos_avg']] = \
-    df[['goals_vs_pos_avg', 'assists_vs_pos_avg', 'goal_contrib_vs_pos_avg']].replace([float('inf'), -float('inf')], 0).fillna(0)
-
-# Exponentially weighted rolling goal contributions over last 10 games
-df['ewm_goals_contrib'] = df.groupby('player_id')['goal_contributions'].transform(
-    lambda x: x.ewm(span=10, adjust=False).mean()
-)
-
-# Performance vs last season
-df['goals_change_vs_last_season'] = df['goals'] - df.groupby('player_id')['goals'].shift(1)
-df['assists_change_vs_last_season'] = df['assists'] - df.groupby('player_id')['assists'].shift(1)
-df[['goals_change_vs_last_season', 'assists_change_vs_last_season']] = \
-    df[['goals_change_vs_last_season', 'assists_change_vs_last_season']].fillna(0)
-
-# Average teammate value
-df['team_avg_value'] = df.groupby(['team_id', 'season_start_year'])['value'].transform('mean').shift(1)
-
-# Age bins
-df['age_group'] = pd.cut(df['age'], bins=[15, 18, 21, 24, 28, 32, 40], labels=False)
-
-# Hot transfer candidate
-df['hot_transfer_candidate'] = ((df['contract_remaining_years'] <= 1) &
-                                (df['age'] < 25) &
-                                (df['avg_goals_contrib_per_season'] > 5)).astype(int)
-
-# Trusted-weighted performance
-df['trusted_goals_contrib'] = (
-    df['goals_contrib_per_90_season'] * np.log1p(df['minutes_played'])
-)
-
-# Prime-age performance
-df['prime_age_factor'] = 1 - (abs(df['age'] - 26) / 10)
-df['prime_age_factor'] = df['prime_age_factor'].clip(lower=0)
-
-# Contract pressure performance
-df['contract_pressure_score'] = (
-    df['goals_contrib_per_90_season'] /
-    (1 + df['contract_remaining_years'])
-)
-
-# Weighted goal contributions
-df['weighted_goals_contrib'] = (
-    df['career_goals_contrib_prev'] * 0.7 +
-    df['avg_goals_contrib_per_season_prev'] * 0.3
-)
-
-# Minutes trend
-df['minutes_change_vs_last_season'] = df['minutes_played'] - df.groupby('player_id')['minutes_played'].shift(1).fillna(0)
-
-# Age x Position interaction
-position_cols = [c for c in df.columns if c.startswith('main_position_')]
-for pos in position_cols:
-    df[f'{pos}_age'] = df[pos] * df['age']
-
-# Encode main position and position
-df = pd.get_dummies(df, columns=['position', 'main_position', 'age_group'], sparse=True)
+# Columns the per-player features are computed from
+PLAYER_INPUT_COLUMNS = [
+    'player_id',
+    'season_start_year',
+    'goals',
+    'assists',
+    'clean_sheets',
+    'goals_conceded',
+    'minutes_played',
+    'nb_on_pitch',
+    'value',
+    'age',
+    'contract_remaining_years',
+]
 
-# Position and age features
 
-df['prime_attacker'] = ((df['main_position_Attack']==1) & (df['age'].between(20,26))).astype(int)
-df['prime_midfielder'] = ((df['main_position_Midfield']==1) & (df['age'].between(22,28))).astype(int)
-df['prime_defender'] = ((df['main_position_Defender']==1) & (df['age'].between(24,30))).astype(int)
-df['prime_goalkeeper'] = ((df['main_position_Goalkeeper']==1) & (df['age'].between(27,33))).astype(int)
+# Features that only depend on one player's own rows (sorted by season).
+# Players are independent here, so this phase can run on player_id partitions.
+def add_player_features(df):
+    # Get goal contributions
+    df['goal_contributions'] = df['goals'] + df['assists']
+
+    # Career stats
+    df['career_goals'] = df.groupby('player_id')['goals'].cumsum()
+    df['career_assists'] = df.groupby('player_id')['assists'].cumsum()
+    df['career_goals_contrib'] =  df['career_goals'] + df['career_assists']
+    df['career_clean_sheets'] = df.groupby('player_id')['clean_sheets'].cumsum()
+    df['career_goals_conceded'] = df.groupby('player_id')['goals_conceded'].cumsum()
+
+    # Career stats until last season (per player, so one player's totals never spill into the next)
+    df['career_goals_prev'] = df.groupby('player_id')['career_goals'].shift(1).fillna(0)
+    df['career_assists_prev'] = df.groupby('player_id')['career_assists'].shift(1).fillna(0)
+    df['career_goals_contrib_prev'] =  df['career_goals_prev'] + df['career_assists_prev']
+    df['career_clean_sheets_prev'] = df.groupby('player_id')['career_clean_sheets'].shift(1).fillna(0)
+    df['career_goals_conceded_prev'] = df.groupby('player_id')['career_goals_conceded'].shift(1).fillna(0)
+
+    # Number of seasons so far, including the current one
+    seasons_played = df.groupby('player_id').cumcount() + 1
+
+    # Averages up to and including the current season
+    df['avg_goals_per_season'] = df['career_goals'] / seasons_played
+    df['avg_assists_per_season'] = df['career_assists'] / seasons_played
+    df['avg_goals_contrib_per_season'] = df['career_goals_contrib'] / seasons_played
+    df['avg_clean_sheets_per_season'] = df['career_clean_sheets'] / seasons_played
+    df['avg_goals_conceded_per_season'] = df['career_goals_conceded'] / seasons_played
+
+    # Averages until last season
+    df['avg_goals_per_season_prev'] = (df['career_goals_prev'] / (seasons_played - 1)).fillna(0)
+    df['avg_assists_per_season_prev'] = (df['career_assists_prev'] / (seasons_played - 1)).fillna(0)
+    df['avg_goals_contrib_per_season_prev'] = (df['career_goals_contrib_prev'] / (seasons_played - 1)).fillna(0)
+    df['avg_clean_sheets_per_season_prev'] = (df['career_clean_sheets_prev'] / (seasons_played - 1)).fillna(0)
+    df['avg_goals_conceded_per_season_prev'] = (df['career_goals_conceded_prev'] / (seasons_played - 1)).fillna(0)
+
+    # Avoid division by zero by replacing 0 minutes with NaN, then fill NaN with 0
+    minutes_nonzero = df['minutes_played'].replace(0, np.nan)
 
+    # Per 90 metrics
+    df['goals_per_90_season'] = (df['goals'] / (minutes_nonzero / 90)).fillna(0)
+    df['assists_per_90_season'] = (df['assists'] / (minutes_nonzero / 90)).fillna(0)
+    df['goals_contrib_per_90_season'] = (df['goal_contributions'] / (minutes_nonzero / 90)).fillna(0)
+
+    df['goals_per_90_last_season'] = df.groupby('player_id')['goals_per_90_season'].shift(1).fillna(0)
+    df['assists_per_90_last_season'] = df.groupby('player_id')['assists_per_90_season'].shift(1).fillna(0)
+    df['goals_contrib_per_90_last_season'] = df.groupby('player_id')['goals_contrib_per_90_season'].shift(1).fillna(0)
+    df['minutes_last_season'] = df.groupby('player_id')['minutes_played'].shift(1).fillna(0)
+
+    # last 3 seasons (exclude current season)
+    df['goals_per_90_last3_avg'] = df.groupby('player_id')['goals_per_90_season'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
+    df['assists_per_90_last3_avg'] = df.groupby('player_id')['assists_per_90_season'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
+    df['goals_contrib_per_90_last3_avg'] = df.groupby('player_id')['goals_contrib_per_90_season'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
+    df['minutes_last3_avg'] = df.groupby('player_id')['minutes_played'].transform(lambda x: x.shift(1).rolling(window=3, min_periods=1).mean()).fillna(0)
+
+    # - player peak/previous max value
+    df['max_value_prev_seasons'] = df.groupby('player_id')['value'].transform(lambda x: x.shift(1).cummax()).fillna(0)
+
+    # Clean sheet rate, 0 without appearances (like career_state.py) rather than inf
+    df['clean_sheet_rate'] = (df['clean_sheets'] / df['nb_on_pitch'].where(df['nb_on_pitch'] > 0)).fillna(0)
+
+    # Square player's age to capture non-linear effects on value
+    df['age_squared'] = df['age'] ** 2
+
+    # How long has a player been playing in years
+    # Subtract how many years they've been playing until the current season
+    df['experience_years'] = df['season_start_year'] - df.groupby('player_id')['season_start_year'].transform('min')
+
+    # Contract-related features
+    df['short_contract'] = (df['contract_remaining_years'] <= 1).astype(int)
+
+    # Exponentially weighted rolling goal contributions over last 10 games
+    df['ewm_goals_contrib'] = df.groupby('player_id')['goal_contributions'].transform(
+        lambda x: x.ewm(span=10, adjust=False).mean()
+    )
+
+    # Performance vs last season
+    df['goals_change_vs_last_season'] = df['goals'] - df.groupby('player_id')['goals'].shift(1)
+    df['assists_change_vs_last_season'] = df['assists'] - df.groupby('player_id')['assists'].shift(1)
+    df[['goals_change_vs_last_season', 'assists_change_vs_last_season']] = \
+        df[['goals_change_vs_last_season', 'assists_change_vs_last_season']].fillna(0)
+
+    # Hot transfer candidate
+    df['hot_transfer_candidate'] = ((df['contract_remaining_years'] <= 1) &
+                                    (df['age'] < 25) &
+                                    (df['avg_goals_contrib_per_season'] > 5)).astype(int)
+
+    # Trusted-weighted performance
+    df['trusted_goals_contrib'] = (
+        df['goals_contrib_per_90_season'] * np.log1p(df['minutes_played'])
+    )
+
+    # Prime-age performance
+    df['prime_age_factor'] = 1 - (abs(df['age'] - 26) / 10)
+    df['prime_age_factor'] = df['prime_age_factor'].clip(lower=0)
+
+    # Contract pressure performance
+    df['contract_pressure_score'] = (
+        df['goals_contrib_per_90_season'] /
+        (1 + df['contract_remaining_years'])
+    )
+
+    # Weighted goal contributions
+    df['weighted_goals_contrib'] = (
+        df['career_goals_contrib_prev'] * 0.7 +
+        df['avg_goals_contrib_per_season_prev'] * 0.3
+    )
+
+    # Minutes trend
+    df['minutes_change_vs_last_season'] = df['minutes_played'] - df.groupby('player_id')['minutes_played'].shift(1).fillna(0)
+
+    return df
+
+
+# Mean and median of value per group over all strictly earlier seasons, 0 when there are none.
+# Only past seasons are used, so a row's features don't change when later seasons are added.
+def prior_seasons_value_stats(df, group_col):
+    seasons = df['season_start_year'].to_numpy()
+    values = df['value'].to_numpy(dtype=np.float64, na_value=np.nan)
+    means = np.zeros(len(df))
+    medians = np.zeros(len(df))
+
+    for idx in df.groupby(group_col).indices.values():
+        idx = idx[np.argsort(seasons[idx], kind='stable')]
+        group_seasons = seasons[idx]
+        group_values = values[idx]
+        starts = np.flatnonzero(np.r_[True, group_seasons[1:] != group_seasons[:-1]])
+        ends = np.r_[starts[1:], len(idx)]
+
+        for start, end in zip(starts[1:], ends[1:]):
+            prior = group_values[:start]
+            prior = prior[~np.isnan(prior)]
+            if len(prior):
+                means[idx[start:end]] = prior.mean()
+                medians[idx[start:end]] = np.median(prior)
+
+    return means, medians
+
+
+# Features that aggregate across players (competition, team/season, position/season, dataset-wide).
+# This is the reduce phase and always runs on the full frame in its sorted order.
+def add_cross_player_features(df, league_table):
+    # competition / league level aggregation
+    # Average and median value of the competition over all earlier seasons (so we don't leak)
+    df['competition_prev_avg_value'], df['competition_prev_median_value'] = prior_seasons_value_stats(df, 'competition_id')
+
+    # League strength rated from players moving between competitions in earlier seasons (see league_strength.py)
+    df = league_strength.LeagueStrengthLookup(league_table).join(df)
+
+    # season-level trend feature 
+    df['season_year_offset'] = df['season_start_year'] - df['season_start_year'].min()
+
+    # Team's total and average goals scored in season
+    # Being on a high performing team can affect market value
+    df['team_total_goals'] = df.groupby(['team_id', 'season_start_year'])['goals'].transform('sum')
+    df['team_avg_goals'] = df.groupby(['team_id', 'season_start_year'])['goals'].transform('mean')
+    df['team_avg_goals_per_player'] = df['team_total_goals'] / df.groupby(['team_id', 'season_start_year'])['player_id'].transform('nunique')
+
+    # Contract-related features
+    # Relative to the longest contract seen up to that season, not in later seasons
+    max_contract_to_date = df.groupby('season_start_year')['contract_remaining_years'].max().sort_index().cummax()
+    longest_contract = df['season_start_year'].map(max_contract_to_date).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['contract_remaining_ratio'] = np.where(longest_contract > 0,
+                                                  df['contract_remaining_years'] / longest_contract, 0.0)
+
+    df['is_goalkeeper'] = (df['main_position'] == 'Goalkeepers').astype(int)
+
+    # Normalize goals and assists vs position averages
+    df['goals_vs_pos_avg'] = df['goals'] / df.groupby(['main_position', 'season_start_year'])['goals'].transform('mean')
+    df['assists_vs_pos_avg'] = df['assists'] / df.groupby(['main_position', 'season_start_year'])['assists'].transform('mean')
+    df['goal_contrib_vs_pos_avg'] = df['goal_contributions'] / df.groupby(['main_position', 'season_start_year'])['goal_contributions'].transform('mean')
+
+    # Replace infs or NaNs from division by zero
+    df[['goals_vs_pos_avg', 'assists_vs_pos_avg', 'goal_contrib_vs_pos_avg']] = \
+        df[['goals_vs_pos_avg', 'assists_vs_pos_avg', 'goal_contrib_vs_pos_avg']].replace([float('inf'), -float('inf')], 0).fillna(0)
+
+    # Average teammate value, from the team's previous season
+    team_season_value = df.groupby(['team_id', 'season_start_year'])['value'].mean()
+    prev_team_season = pd.MultiIndex.from_arrays([df['team_id'], df['season_start_year'] - 1])
+    df['team_avg_value'] = team_season_value.reindex(prev_team_season).to_numpy()
+
+    # Minutes-weighted previous-season value of the player's current teammates, from one sparse
+    # player-season x team-season matrix (see teammate_graph.py)
+    df = add_teammate_features(df)
+
+    # Age bins
+    df['age_group'] = pd.cut(df['age'], bins=[15, 18, 21, 24, 28, 32, 40], labels=False)
+
+    # Age x Position interaction
+    position_cols = [c for c in df.columns if c.startswith('main_position_')]
+    for pos in position_cols:
+        df[f'{pos}_age'] = df[pos] * df['age']
+
+    # Encode main position and position
+    df = pd.get_dummies(df, columns=['position', 'main_position', 'age_group'], sparse=True)
+
+    # Position and age features
+
+    df['prime_attacker'] = ((df['main_position_Attack']==1) & (df['age'].between(20,26))).astype(int)
+    df['prime_midfielder'] = ((df['main_position_Midfield']==1) & (df['age'].between(22,28))).astype(int)
+    df['prime_defender'] = ((df['main_position_Defender']==1) & (df['age'].between(24,30))).astype(int)
+    df['prime_goalkeeper'] = ((df['main_position_Goalkeeper']==1) & (df['age'].between(27,33))).astype(int)
+
+    return df
+
+
+# Worker: attach to the shared input/output blocks and compute one contiguous range of players
+def _player_features_partition(task):
+    in_name, out_name, n_rows, output_columns, start, stop = task
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        inputs = np.ndarray((n_rows, len(PLAYER_INPUT_COLUMNS)), dtype=np.float64, buffer=shm_in.buf)
+        outputs = np.ndarray((n_rows, len(output_columns)), dtype=np.float64, buffer=shm_out.buf)
+
+        block = pd.DataFrame(inputs[start:stop].copy(), columns=PLAYER_INPUT_COLUMNS)
+        block = add_player_features(block)
+        outputs[start:stop] = block[output_columns].to_numpy(dtype=np.float64)
+    finally:
+        shm_in.close()
+        shm_out.close()
+    return stop - start
+
+
+# Row ranges of roughly equal size that never split a player
+def partition_bounds(player_ids, n_partitions):
+    starts = np.flatnonzero(np.r_[True, player_ids[1:] != player_ids[:-1]])
+    targets = np.linspace(0, len(player_ids), n_partitions + 1)[1:-1]
+    cuts = starts[np.minimum(np.searchsorted(starts, targets), len(starts) - 1)]
+    bounds = np.unique(np.r_[0, cuts, len(player_ids)])
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+# Map phase over player_id range partitions in a process pool.
+# Inputs and outputs live in shared memory, so workers only receive row ranges.
+def add_player_features_partitioned(df, workers, partitions_per_worker=4):
+    # Output columns and their dtypes, taken from a run on the first player
+    first_player = df['player_id'].to_numpy()[0]
+    sample = add_player_features(df.loc[df['player_id'] == first_player, PLAYER_INPUT_COLUMNS].copy())
+    output_columns = [c for c in sample.columns if c not in PLAYER_INPUT_COLUMNS]
+
+    n_rows = len(df)
+    in_bytes = max(n_rows * len(PLAYER_INPUT_COLUMNS) * 8, 1)
+    out_bytes = max(n_rows * len(output_columns) * 8, 1)
+    shm_in = shared_memory.SharedMemory(create=True, size=in_bytes)
+    shm_out = shared_memory.SharedMemory(create=True, size=out_bytes)
+    try:
+        inputs = np.ndarray((n_rows, len(PLAYER_INPUT_COLUMNS)), dtype=np.float64, buffer=shm_in.buf)
+        for i, col in enumerate(PLAYER_INPUT_COLUMNS):
+            inputs[:, i] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        bounds = partition_bounds(inputs[:, 0], workers * partitions_per_worker)
+        tasks = [(shm_in.name, shm_out.name, n_rows, output_columns, a, b) for a, b in bounds]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_player_features_partition, tasks))
+
+        outputs = np.ndarray((n_rows, len(output_columns)), dtype=np.float64, buffer=shm_out.buf)
+        features = pd.DataFrame(outputs.copy(), columns=output_columns, index=df.index)
+    finally:
+        shm_in.close()
+        shm_out.close()
+        shm_in.unlink()
+        shm_out.unlink()
+
+    # Same dtypes as the sequential path
+    features = features.astype(sample[output_columns].dtypes.to_dict())
+    return pd.concat([df, features], axis=1)
+
+
+# league_table: the stored league-strength ratings (league_strength.load_table())
+def build_features(df, league_table, workers=1):
+    timings = {}
+    df = df.sort_values(['player_id', 'season_start_year']).reset_index(drop=True)
+
+    start = time.perf_counter()
+    if workers > 1:
+        df = add_player_features_partitioned(df, workers)
+    else:
+        df = add_player_features(df)
+    timings['player_features'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df = add_cross_player_features(df, league_table)
+    timings['cross_player_features'] = time.perf_counter() - start
+
+    # Values 1-3 seasons ahead, targets of the horizon models (never model inputs)
+    df = add_horizon_targets(df)
+    return df, timings
 
 
 # Numeric features to scale
@@ -237,8 +385,13 @@ numeric_features = [
     'team_avg_goals',
     'team_avg_goals_per_player',
     'team_avg_value',
+    'teammate_prev_value_wavg',
+    'teammate_prev_value_pct',
+    'teammates_with_prev_value',
     'competition_prev_avg_value',
     'competition_prev_median_value',
+    'league_strength',
+    'league_strength_moves',
     
     # Performance / normalized
     'goals_vs_pos_avg',
@@ -270,12 +423,48 @@ numeric_features = [
     'prime_goalkeeper',
 ]
 
-# Fill missing numeric values with 0 before scaling
-# df[numeric_features] = df[numeric_features].fillna(0)
 
-# Scale numeric features
-# df[numeric_features] = scaler.fit_transform(df[numeric_features])
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the features dataset from the model-ready dataset")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processes for the per-player phase (1 runs it in-process)")
+    args = parser.parse_args(argv)
+
+    # Load DataFrame
+    df = pd.read_csv(file_path)
+
+    # League-strength lookup table written by league_strength.py, one rating per season and competition
+    league_table = league_strength.load_table()
+    print(f"Loaded league strength for {league_table['season_start_year'].nunique()} seasons "
+          f"from {league_strength.table_path}")
+
+    df, timings = build_features(df, league_table, workers=args.workers)
+    for phase, seconds in timings.items():
+        print(f"{phase}: {seconds:.1f}s")
+
+    # Fill missing numeric values with 0 before scaling
+    # df[numeric_features] = df[numeric_features].fillna(0)
+
+    # Scale numeric features
+    # df[numeric_features] = scaler.fit_transform(df[numeric_features])
+
+    # Save the feature-engineered dataset
+    df.to_csv(output_path, index=False)
+    print("Saved feature-engineered dataset")
+
+    # Publish the snapshot that training and prediction bind to
+    schema = feature_store.publish_snapshot(df)
+    print(f"Published features snapshot {schema['schema_hash'][:12]} ({len(schema['feature_columns'])} features)")
+
+    # Season partitions for as-of views; seasons whose rows didn't change are not rewritten
+    manifest, written = feature_store.publish_partitions()
+    print(f"Published {len(manifest['seasons'])} season partitions ({written} new versions)")
+
+    # Per-player running state for constant-time "career to date" features of new seasons
+    state = career_state.build_career_state(df)
+    career_state.save_career_state(state)
+    print(f"Saved career state for {len(state)} players")
+
 
-# Save the feature-engineered dataset
-df.to_csv(output_path, index=False)
-print("Saved feature-engineered dataset")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+import os
+import json
+import hashlib
+
+import pandas as pd
+import numpy as np
+
+from model_registry import hash_file
+from horizons import HORIZON_TARGETS
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Default location of the published features snapshot
+snapshot_dir = os.path.join(script_dir, '..', 'data', 'processed', 'features_snapshot')
+
+# Season partitions of the snapshot, for point-in-time (as-of) views
+partitions_dir = os.path.join(script_dir, '..', 'data', 'processed', 'feature_partitions')
+
+SCHEMA_FILE = 'schema.json'
+MATRIX_FILE = 'features.npy'
+KEYS_FILE = 'keys.pkl'
+PARTITIONS_MANIFEST = 'manifest.json'
+
+# Seasons before this year are training data
+SPLIT_YEAR = 2020
+
+# Columns never used as model inputs (ids, target, leaky or unusable columns)
+EXCLUDED_COLUMNS = [
+    'value',
+    'player_id',
+    'team_id',
+    'date_unix',
+    'season_name',
+    'season_start_year',
+    'competition_id',
+    'current_club_id',
+    'current_club_name',
+    'place_of_birth',
+    'country_of_birth',
+    'career_goals',
+    'career_assists',
+    'career_goals_contrib',
+    'career_clean_sheets',
+    'career_goals_conceded',
+    'avg_goals_per_season',
+    'avg_assists_per_season',
+    'avg_goals_conceded_per_season',
+    'avg_clean_sheets_per_season',
+    'is_eu_False',
+    'foot_Unknown',
+    'team_avg_value',
+    # Future values, targets of the multi-horizon models
+    *HORIZON_TARGETS,
+]
+
+
+class SchemaMismatchError(ValueError):
+    pass
+
+
+# Hash of the ordered feature names and their source dtypes
+def schema_hash(columns, dtypes):
+    payload = json.dumps([[c, dtypes[c]] for c in columns]).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+# Fingerprint of a snapshot's data: the feature matrix and the keys, which hold the target and the
+# horizon targets, so a label-only change gives a new hash
+def data_hash(matrix_path, keys):
+    digest = hashlib.sha256(hash_file(matrix_path).encode())
+    digest.update(pd.util.hash_pandas_object(keys, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+# Model input columns: everything not excluded, minus columns with <= 2 distinct values in the training seasons
+def select_feature_columns(df, split_year=SPLIT_YEAR):
+    candidates = [c for c in df.columns if c not in EXCLUDED_COLUMNS]
+    train_rows = df['season_start_year'] < split_year
+    low_variance_cols = [c for c in candidates if df.loc[train_rows, c].nunique() <= 2]
+    return [c for c in candidates if c not in low_variance_cols], low_variance_cols
+
+
+# Write the features as a float32 matrix, the remaining columns as keys, and a schema describing both
+def publish_snapshot(df, output_dir=snapshot_dir, split_year=SPLIT_YEAR):
+    os.makedirs(output_dir, exist_ok=True)
+
+    feature_columns, low_variance_cols = select_feature_columns(df, split_year)
+    key_columns = [c for c in df.columns if c not in feature_columns]
+    dtypes = {c: str(df[c].dtype) for c in df.columns}
+
+    matrix = np.empty((len(df), len(feature_columns)), dtype=np.float32)
+    for i, col in enumerate(feature_columns):
+        matrix[:, i] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+
+    matrix_path = os.path.join(output_dir, MATRIX_FILE)
+    np.save(matrix_path, matrix)
+    keys = df[key_columns].reset_index(drop=True)
+    keys.to_pickle(os.path.join(output_dir, KEYS_FILE))
+
+    schema = {
+        'n_rows': len(df),
+        'split_year': split_year,
+        'feature_columns': feature_columns,
+        'key_columns': key_columns,
+        'dtypes': dtypes,
+        'dropped_low_variance': low_variance_cols,
+        'schema_hash': schema_hash(feature_columns, dtypes),
+        'data_hash': data_hash(matrix_path, keys),
+    }
+    with open(os.path.join(output_dir, SCHEMA_FILE), 'w') as f:
+        json.dump(schema, f, indent=2)
+
+    return schema
+
+
+def load_schema(input_dir=snapshot_dir):
+    with open(os.path.join(input_dir, SCHEMA_FILE), 'r') as f:
+        return json.load(f)
+
+
+# A published snapshot: X wraps the memory-mapped matrix without copying, keys holds everything else
+class Snapshot:
+    def __init__(self, schema, matrix, keys):
+        self.schema = schema
+        self.matrix = matrix
+        self.keys = keys
+        self.feature_columns = schema['feature_columns']
+        self.X = pd.DataFrame(matrix, columns=self.feature_columns, copy=False)
+
+    @property
+    def schema_hash(self):
+        return self.schema['schema_hash']
+
+    def __len__(self):
+        return self.schema['n_rows']
+
+    # Any column from either the feature matrix or the keys, as a numpy array
+    def column(self, name):
+        if name in self.keys.columns:
+            return self.keys[name].to_numpy()
+        return self.matrix[:, self.feature_columns.index(name)]
+
+    # Hash of one key column's values, e.g. the target a cache or search was built for
+    def target_hash(self, name):
+        values = pd.util.hash_pandas_object(self.keys[name], index=False).to_numpy()
+        return hashlib.sha256(values.tobytes()).hexdigest()
+
+    def has_column(self, name):
+        return name in self.keys.columns or name in self.feature_columns
+
+    # Fail fast instead of silently reprojecting when a model was trained on another schema
+    def check(self, expected_hash, what='model'):
+        if expected_hash != self.schema_hash:
+            raise SchemaMismatchError(
+                f"{what} was built for feature schema {str(expected_hash)[:12]}, "
+                f"but the snapshot has schema {self.schema_hash[:12]}. "
+                "Rebuild the features or retrain the model."
+            )
+
+
+def load_snapshot(input_dir=snapshot_dir, mmap=True):
+    schema = load_schema(input_dir)
+    matrix = np.load(os.path.join(input_dir, MATRIX_FILE), mmap_mode='r' if mmap else None)
+    keys = pd.read_pickle(os.path.join(input_dir, KEYS_FILE))
+
+    if matrix.shape != (schema['n_rows'], len(schema['feature_columns'])) or len(keys) != schema['n_rows']:
+        raise SchemaMismatchError(f"Snapshot files in {input_dir} do not match their schema")
+
+    return Snapshot(schema, matrix, keys)
+
+
+# Split the published snapshot into one partition per season. Every feature of a row only uses seasons up to
+# its own, so a season's partition never changes when later seasons arrive. Partitions are versioned by content:
+# unchanged seasons are kept as they are, changed ones get a new version next to the old one.
+def publish_partitions(snapshot=None, output_dir=partitions_dir):
+    snapshot = snapshot or load_snapshot()
+    seasons = snapshot.column('season_start_year')
+
+    manifest_seasons = {}
+    written = 0
+    for season in np.unique(seasons):
+        rows = np.flatnonzero(seasons == season)
+        matrix = np.ascontiguousarray(snapshot.matrix[rows])
+        # Horizon targets are future values, so they are left out of the point-in-time partitions
+        keys = snapshot.keys.iloc[rows].drop(columns=HORIZON_TARGETS, errors='ignore').reset_index(drop=True)
+
+        digest = hashlib.sha256(snapshot.schema_hash.encode())
+        digest.update(matrix.tobytes())
+        digest.update(pd.util.hash_pandas_object(keys, index=False).to_numpy().tobytes())
+        version = digest.hexdigest()[:12]
+
+        version_dir = os.path.join(output_dir, f'season={int(season)}', version)
+        if not os.path.isdir(version_dir):
+            os.makedirs(version_dir)
+            np.save(os.path.join(version_dir, MATRIX_FILE), matrix)
+            keys.to_pickle(os.path.join(version_dir, KEYS_FILE))
+            written += 1
+        manifest_seasons[str(int(season))] = {'version': version, 'n_rows': len(rows)}
+
+    manifest = {'schema': snapshot.schema, 'seasons': manifest_seasons}
+    with open(os.path.join(output_dir, PARTITIONS_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest, written
+
+
+def load_partitions_manifest(input_dir=partitions_dir):
+    with open(os.path.join(input_dir, PARTITIONS_MANIFEST), 'r') as f:
+        return json.load(f)
+
+
+# One season's partition as (matrix, keys)
+def load_partition(season, input_dir=partitions_dir, mmap=True, manifest=None):
+    manifest = manifest or load_partitions_manifest(input_dir)
+    if str(season) not in manifest['seasons']:
+        raise ValueError(f"No feature partition for season {season} in {input_dir}")
+    version_dir = os.path.join(input_dir, f'season={season}', manifest['seasons'][str(season)]['version'])
+    matrix = np.load(os.path.join(version_dir, MATRIX_FILE), mmap_mode='r' if mmap else None)
+    return matrix, pd.read_pickle(os.path.join(version_dir, KEYS_FILE))
+
+
+# Point-in-time features: the snapshot as it would have been built with data up to the cutoff season.
+# Reads only the partitions up to the cutoff, nothing is recomputed.
+def load_as_of(cutoff_season, input_dir=partitions_dir, mmap=True, manifest=None):
+    manifest = manifest or load_partitions_manifest(input_dir)
+    seasons = sorted(int(s) for s in manifest['seasons'] if int(s) <= cutoff_season)
+    if not seasons:
+        raise ValueError(f"No feature partitions up to season {cutoff_season} in {input_dir}")
+
+    matrices = []
+    keys = []
+    versions = []
+    for season in seasons:
+        matrix, season_keys = load_partition(season, input_dir, mmap, manifest)
+        matrices.append(matrix)
+        keys.append(season_keys)
+        versions.append(manifest['seasons'][str(season)]['version'])
+
+    keys = pd.concat(keys, ignore_index=True)
+
+    # Back to the snapshot's row order (player, then season); lexsort is stable within a season
+    order = np.lexsort((keys['season_start_year'].to_numpy(), keys['player_id'].to_numpy()))
+    matrix = np.concatenate(matrices)[order]
+    keys = keys.iloc[order].reset_index(drop=True)
+
+    schema = dict(manifest['schema'])
+    schema['n_rows'] = len(keys)
+    schema['as_of'] = cutoff_season
+    schema['data_hash'] = hashlib.sha256(','.join(versions).encode()).hexdigest()
+    return Snapshot(schema, matrix, keys)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from boosters import MultiBoosterModel
+
+# Seasons ahead forecast next to the current-season estimate
+HORIZONS = (1, 2, 3)
+
+
+def horizon_target(horizon):
+    return f'value_next_{horizon}'
+
+
+HORIZON_TARGETS = [horizon_target(h) for h in HORIZONS]
+
+
+# Target of each horizon: the player's value h seasons after the row's season (the largest value of that
+# season, NaN when the player has no value then). Matched on season numbers, so gap years don't shift targets.
+def add_horizon_targets(df, horizons=HORIZONS):
+    season_value = df.groupby(['player_id', 'season_start_year'])['value'].max()
+    for h in horizons:
+        future = pd.MultiIndex.from_arrays([df['player_id'], df['season_start_year'] + h])
+        df[horizon_target(h)] = season_value.reindex(future).to_numpy()
+    return df
+
+
+# Rows usable for a horizon: known target, and for training the target season must also be before the split,
+# so no horizon model sees values from the test seasons
+def horizon_masks(snapshot, horizon):
+    y = snapshot.keys[horizon_target(horizon)]
+    has_target = y.notna().to_numpy()
+    season = snapshot.column('season_start_year')
+    split_year = snapshot.schema['split_year']
+    return has_target & (season + horizon < split_year), has_target & (season >= split_year)
+
+
+# One LightGBM per horizon on the log target, all trained on rows of the same feature matrix
+def fit_horizon_models(snapshot, params, horizons=HORIZONS):
+    import lightgbm as lgb
+
+    models = []
+    for h in horizons:
+        train_mask, _ = horizon_masks(snapshot, h)
+        y = np.log1p(snapshot.keys[horizon_target(h)].to_numpy(dtype=np.float64)[train_mask])
+        model = lgb.LGBMRegressor(random_state=42, n_jobs=-1, verbose=-1, **params)
+        model.fit(snapshot.X[train_mask], y)
+        models.append(model)
+    return HorizonModel(models, horizons, snapshot.feature_columns)
+
+
+# All horizon models scored over one shared float32 matrix
+class HorizonModel(MultiBoosterModel):
+    def __init__(self, models, horizons, features):
+        super().__init__(models, features)
+        self.horizons = tuple(horizons)
+
+    # (n_rows, n_horizons) log predictions
+    def predict_horizons(self, X, executor=None):
+        return self.predict_all(X, executor)
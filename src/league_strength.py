@@ -0,0 +1,220 @@
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Rating per (season, competition), joined onto the features
+table_path = os.path.join(script_dir, '..', 'data', 'processed', 'league_strength.csv')
+
+# Stints shorter than this are too noisy for the per-90 comparison
+MIN_OUTPUT_MINUTES = 450
+
+# Weight of a move per season of age, so ratings follow changes in league strength
+DECAY = 0.8
+
+# Ridge term of the solver: competitions without moves stay at 0 (the average league)
+DAMP = 1e-3
+
+
+# Each player's main competition per season (most minutes) with its minutes, per-90 goal contributions
+# and the player's value that season
+def main_stints(df):
+    stints = df.groupby(['player_id', 'season_start_year', 'competition_id'], as_index=False).agg(
+        minutes=('minutes_played', 'sum'), goals=('goals', 'sum'), assists=('assists', 'sum'), value=('value', 'max'))
+    stints = stints.sort_values(['player_id', 'season_start_year', 'minutes'], ascending=[True, True, False], kind='stable')
+    stints = stints.drop_duplicates(['player_id', 'season_start_year']).reset_index(drop=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stints['output_per_90'] = np.where(stints['minutes'] > 0,
+                                           90 * (stints['goals'] + stints['assists']) / stints['minutes'], np.nan)
+    return stints
+
+
+# Players whose main competition changed from one season to the next. A move into a stronger league
+# shows up as a higher value and lower per-90 output afterwards.
+def competition_moves(stints):
+    prev = stints.groupby('player_id').shift(1)
+    consecutive = (stints['season_start_year'] - prev['season_start_year'] == 1) & (stints['competition_id'] != prev['competition_id'])
+    moves = pd.DataFrame({
+        'season': stints['season_start_year'],
+        'from_competition': prev['competition_id'],
+        'to_competition': stints['competition_id'],
+        'value_change': np.log1p(stints['value']) - np.log1p(prev['value']),
+        'output_change': np.log1p(stints['output_per_90']) - np.log1p(prev['output_per_90']),
+        'output_weight': np.minimum(stints['minutes'], prev['minutes']) >= MIN_OUTPUT_MINUTES,
+    })[consecutive.to_numpy()]
+    return moves.reset_index(drop=True)
+
+
+# Sparse weighted least squares for r_to - r_from + intercept = change, one intercept per block of equations.
+# blocks: (move mask, change) pairs. Ratings are centred by a heavily weighted sum-to-zero row.
+def _solve(moves, n_competitions, weights, blocks, x0=None):
+    from scipy import sparse
+    from scipy.sparse.linalg import lsqr
+
+    from_codes = moves['from_code'].to_numpy()
+    to_codes = moves['to_code'].to_numpy()
+
+    rows, cols, data, targets, row_weights = [], [], [], [], []
+    n_rows = 0
+    for block, (mask, change) in enumerate(blocks):
+        n = int(mask.sum())
+        eq = n_rows + np.arange(n)
+        rows += [eq, eq, eq]
+        cols += [to_codes[mask], from_codes[mask], np.full(n, n_competitions + block)]
+        data += [np.ones(n), -np.ones(n), np.ones(n)]
+        targets.append(change)
+        row_weights.append(weights[mask])
+        n_rows += n
+
+    # sum(r) = 0, weighted like all moves together
+    rows.append(np.full(n_competitions, n_rows))
+    cols.append(np.arange(n_competitions))
+    data.append(np.ones(n_competitions))
+    targets.append([0.0])
+    row_weights.append([max(np.sum(np.concatenate(row_weights)), 1.0)])
+    n_rows += 1
+
+    # Each equation scaled by the square root of its weight
+    sqrt_w = np.sqrt(np.concatenate(row_weights))
+    rows = np.concatenate(rows)
+    A = sparse.csr_matrix((np.concatenate(data) * sqrt_w[rows], (rows, np.concatenate(cols))),
+                          shape=(n_rows, n_competitions + len(blocks)))
+    b = np.concatenate(targets) * sqrt_w
+
+    if x0 is not None and len(x0) != A.shape[1]:
+        x0 = np.r_[x0[:n_competitions], np.zeros(len(blocks))]
+    result = lsqr(A, b, damp=DAMP, x0=x0, atol=1e-8, btol=1e-8)
+    return result[0], result[2]
+
+
+# Ratings on the log value scale from the given moves. Value changes give the gap between two leagues
+# directly. Per-90 output changes give it with the opposite sign and an unknown scale, which is found by
+# regressing them on the gaps of a value-only solve, then both signals are solved together.
+def solve_ratings(moves, n_competitions, weights, x0=None):
+    value_change = moves['value_change'].to_numpy()
+    output_change = -moves['output_change'].to_numpy()
+    value_ok = np.isfinite(value_change)
+    output_ok = np.isfinite(output_change) & moves['output_weight'].to_numpy()
+
+    x, iterations = _solve(moves, n_competitions, weights, [(value_ok, value_change[value_ok])], x0)
+    if output_ok.sum() < 2:
+        return x, iterations
+
+    gap = x[moves['to_code'].to_numpy()[output_ok]] - x[moves['from_code'].to_numpy()[output_ok]]
+    w = weights[output_ok]
+    gap_centred = gap - np.average(gap, weights=w)
+    spread = np.sum(w * gap_centred ** 2)
+    slope = np.sum(w * gap_centred * output_change[output_ok]) / spread if spread > 0 else 0.0
+    # Output that doesn't fall in stronger leagues carries no usable signal
+    if slope <= 0:
+        return x, iterations
+
+    blocks = [(value_ok, value_change[value_ok]), (output_ok, output_change[output_ok] / slope)]
+    x, more = _solve(moves, n_competitions, weights, blocks, x)
+    return x, iterations + more
+
+
+# Ratings for every season from the moves before it, so a season's rating never uses its own values.
+# Each season is one sparse solve, warm-started from the previous season's ratings.
+def build_table(df):
+    stints = main_stints(df)
+    moves = competition_moves(stints)
+    competitions = np.sort(df['competition_id'].dropna().unique())
+    moves['from_code'] = np.searchsorted(competitions, moves['from_competition'])
+    moves['to_code'] = np.searchsorted(competitions, moves['to_competition'])
+    move_seasons = moves['season'].to_numpy()
+
+    tables = []
+    x = None
+    iterations = 0
+    for season in np.sort(df['season_start_year'].unique()):
+        past = move_seasons < season
+        counts = (np.bincount(moves['from_code'].to_numpy()[past], minlength=len(competitions))
+                  + np.bincount(moves['to_code'].to_numpy()[past], minlength=len(competitions)))
+        ratings = np.full(len(competitions), np.nan)
+        if past.any():
+            weights = DECAY ** (season - 1 - move_seasons[past]).astype(np.float64)
+            x, n_iter = solve_ratings(moves[past], len(competitions), weights, x0=x)
+            iterations += n_iter
+            ratings = np.where(counts > 0, x[:len(competitions)], np.nan)
+        tables.append(pd.DataFrame({
+            'season_start_year': season,
+            'competition_id': competitions,
+            'league_strength': ratings,
+            'league_strength_moves': counts,
+        }))
+
+    table = pd.concat(tables, ignore_index=True)
+    table.attrs['moves'] = len(moves)
+    table.attrs['iterations'] = iterations
+    return table
+
+
+# Dense (season x competition) grids of the table, so joining is one hash lookup for the competition
+# and an array index per row
+class LeagueStrengthLookup:
+    def __init__(self, table):
+        self.competitions = pd.Index(np.sort(table['competition_id'].unique()))
+        self.first_season = int(table['season_start_year'].min())
+        n_seasons = int(table['season_start_year'].max()) - self.first_season + 1
+        season_idx = table['season_start_year'].to_numpy() - self.first_season
+        comp_idx = self.competitions.get_indexer(table['competition_id'])
+        self.grids = {}
+        for col in ['league_strength', 'league_strength_moves']:
+            grid = np.full((n_seasons, len(self.competitions)), np.nan)
+            grid[season_idx, comp_idx] = table[col].to_numpy(dtype=np.float64)
+            self.grids[col] = grid
+
+    def join(self, df):
+        season_idx = df['season_start_year'].to_numpy() - self.first_season
+        comp_idx = self.competitions.get_indexer(df['competition_id'])
+        n_seasons = next(iter(self.grids.values())).shape[0]
+        found = (comp_idx >= 0) & (season_idx >= 0) & (season_idx < n_seasons)
+        for col, grid in self.grids.items():
+            values = np.full(len(df), np.nan)
+            values[found] = grid[season_idx[found], comp_idx[found]]
+            df[col] = values
+        df['league_strength_moves'] = df['league_strength_moves'].fillna(0)
+        return df
+
+
+def save_table(table, path=table_path):
+    table.to_csv(path, index=False)
+
+
+def load_table(path=table_path):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No league strength table at {path}. Run python src/league_strength.py first.")
+    return pd.read_csv(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve league-strength ratings from player moves between competitions")
+    parser.add_argument('--season', type=int, help="Print the ratings used for this season (default: latest)")
+    args = parser.parse_args(argv)
+
+    from feature_engineering import file_path
+
+    df = pd.read_csv(file_path, usecols=['player_id', 'season_start_year', 'competition_id',
+                                         'minutes_played', 'goals', 'assists', 'value'])
+    start = time.perf_counter()
+    table = build_table(df)
+    seconds = time.perf_counter() - start
+    save_table(table)
+    print(f"Solved {table['season_start_year'].nunique()} seasons from {table.attrs['moves']} moves "
+          f"in {seconds:.2f}s ({table.attrs['iterations']} solver iterations)")
+    print("Saved league strength table to:", table_path)
+
+    season = args.season or int(table['season_start_year'].max())
+    ratings = table[table['season_start_year'] == season].sort_values('league_strength', ascending=False)
+    print(f"\nRatings for {season} (log value scale, 0 = average league):")
+    print(ratings[['competition_id', 'league_strength', 'league_strength_moves']].to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Every registered model lives in models/registry/<name>/<version>/
+registry_dir = os.path.join(script_dir, '..', 'models', 'registry')
+
+MODEL_FILE = 'model.pkl'
+MANIFEST_FILE = 'manifest.json'
+
+
+# Hash a file in chunks so large datasets are never fully loaded
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Registered versions of a model, oldest first
+def list_versions(name):
+    model_dir = os.path.join(registry_dir, name)
+    if not os.path.isdir(model_dir):
+        return []
+    return sorted(
+        v for v in os.listdir(model_dir)
+        if v.startswith('v') and os.path.isfile(os.path.join(model_dir, v, MANIFEST_FILE))
+    )
+
+
+def latest_version(name):
+    versions = list_versions(name)
+    if not versions:
+        raise FileNotFoundError(f"No registered versions for model '{name}' in {registry_dir}")
+    return versions[-1]
+
+
+# Save a model as a new version with its manifest, never overwriting older ones
+def register_model(name, model, features, params=None, metrics=None, data_hash=None, extra=None):
+    import joblib
+
+    versions = list_versions(name)
+    next_number = int(versions[-1][1:]) + 1 if versions else 1
+    version = f'v{next_number:04d}'
+
+    version_dir = os.path.join(registry_dir, name, version)
+    os.makedirs(version_dir)
+
+    model_path = os.path.join(version_dir, MODEL_FILE)
+    joblib.dump(model, model_path)
+
+    manifest = {
+        'name': name,
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'features': list(features),
+        'params': _to_json(params or {}),
+        'metrics': _to_json(metrics or {}),
+        'data_hash': data_hash,
+        'model_hash': hash_file(model_path),
+    }
+    manifest.update(_to_json(extra or {}))
+
+    with open(os.path.join(version_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return version
+
+
+# numpy scalars from search results are not JSON serializable
+def _to_json(obj):
+    if isinstance(obj, dict):
+        return {k: _to_json(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_json(v) for v in obj]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return obj
+
+
+@lru_cache(maxsize=None)
+def _load_manifest(name, version):
+    with open(os.path.join(registry_dir, name, version, MANIFEST_FILE), 'r') as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def _load_artifact(name, version):
+    import joblib
+    return joblib.load(os.path.join(registry_dir, name, version, MODEL_FILE))
+
+
+def load_manifest(name, version=None):
+    return _load_manifest(name, version or latest_version(name))
+
+
+# Models are only unpickled on first use and memoized afterwards
+def load_model(name, version=None):
+    version = version or latest_version(name)
+    return _load_artifact(name, version), _load_manifest(name, version)
+
+
+# Version label that identifies a model by content, e.g. 'v0003-1a2b3c4d5e6f'. Version numbers are reused
+# when the registry is wiped, so anything kept across runs (like cached predictions) keys on this instead.
+@lru_cache(maxsize=None)
+def model_fingerprint(name, version):
+    model_hash = _load_manifest(name, version).get('model_hash')
+    if model_hash is None:
+        model_hash = hash_file(os.path.join(registry_dir, name, version, MODEL_FILE))
+    return f'{version}-{model_hash[:12]}'
+
+
+def has_model(name):
+    return bool(list_versions(name))
+
+
+# Segment functions: map each row of a features snapshot to a segment label
+
+def position_segment(snapshot):
+    if not snapshot.has_column('main_position_Goalkeeper'):
+        return np.full(len(snapshot), 'outfield', dtype=object)
+    is_goalkeeper = snapshot.column('main_position_Goalkeeper').astype(bool)
+    return np.where(is_goalkeeper, 'goalkeeper', 'outfield').astype(object)
+
+
+# Value band from the player's previous peak (current value is the target, so it can't be used)
+def value_band_segment(snapshot, edges=(1_000_000, 10_000_000), labels=('low', 'mid', 'high')):
+    prev_value = np.nan_to_num(snapshot.column('max_value_prev_seasons'))
+    return np.asarray(labels, dtype=object)[np.searchsorted(edges, prev_value, side='right')]
+
+
+SEGMENTERS = {
+    'position': position_segment,
+    'value_band': value_band_segment,
+}
+
+
+def segment_labels(snapshot, segment_by):
+    return SEGMENTERS[segment_by](snapshot) if isinstance(segment_by, str) else segment_by(snapshot)
+
+
+# Model that scores a segment: its route when that model is registered, the default otherwise
+def route_model(label, routes, default):
+    name = routes.get(label, default)
+    return name if has_model(name) else default
+
+
+# Score all rows of a snapshot in one call, sending each segment to its own model.
+# routes maps segment label -> model name; unrouted or unregistered segments use the default model.
+# rows restricts scoring to a subset (e.g. one player); with a PredictionCache only unseen rows reach the models.
+def predict_routed(snapshot, segment_by, routes, default, rows=None, cache=None):
+    labels = segment_labels(snapshot, segment_by)
+    subset = np.arange(len(snapshot)) if rows is None else np.asarray(rows)
+    labels = labels[subset]
+    predictions = np.empty(len(subset), dtype=np.float64)
+    used_models = {}
+
+    for label in np.unique(labels):
+        positions = np.flatnonzero(labels == label)
+        segment_rows = subset[positions]
+        name = route_model(label, routes, default)
+        model, manifest = load_model(name)
+        snapshot.check(manifest.get('schema_hash'), what=f"Model {name}:{manifest['version']}")
+
+        # Models bind to the snapshot matrix directly, only the segment's rows are taken
+        full = len(segment_rows) == len(snapshot)
+        X = snapshot.X if full else snapshot.X.iloc[segment_rows]
+        if cache is None:
+            predictions[positions] = model.predict(X)
+        else:
+            M = snapshot.matrix if full else snapshot.matrix[segment_rows]
+            predictions[positions] = cache.predict(name, model_fingerprint(name, manifest['version']), model, X, M)
+        used_models[label] = f"{name}:{manifest['version']}"
+
+    return predictions, used_models
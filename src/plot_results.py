@@ -1,162 +1,181 @@
+import os
+import argparse
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mtick
 
-# Load DataFrame
-df = pd.read_csv('data/processed/predictions_with_errors.csv')
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Predictions merged with features, written by analyze_predictions.py
+predictions_path = os.path.join(script_dir, '..', 'data', 'processed', 'predictions_with_errors.csv')
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Plot actual vs predicted values and the error distributions").parse_args(argv)
+
+    # matplotlib is only needed here, so it isn't loaded when the module is imported
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as mtick
+
+    # Load DataFrame
+    df = pd.read_csv(predictions_path)
+
+    # Remove invalid rows just in case
+    df = df[(df['value'] > 0) & (df['predicted_value'] > 0)]
+
+    # Actual vs Predicted (log)
 
-# Remove invalid rows just in case
-df = df[(df['value'] > 0) & (df['predicted_value'] > 0)]
+    # 1. Actual vs Predicted Player Market Value (Log Scale)
+    # This scatter plot shows each player's actual market value on the x-axis and the model's predicted value on the y-axis.
+    # Both axes are logarithmic to show errors across low- and high-value players.
+    # Points near or on the red line means an accurate prediction, while points above are an overestimations, and lines below are an underestimation
+    # The graph helps visualize how accurate the model is in predicting values, or simply put, overall model fit
 
-# Actual vs Predicted (log)
+    plt.figure(figsize=(8, 8))
 
-# 1. Actual vs Predicted Player Market Value (Log Scale)
-# This scatter plot shows each player's actual market value on the x-axis and the model's predicted value on the y-axis.
-# Both axes are logarithmic to show errors across low- and high-value players.
-# Points near or on the red line means an accurate prediction, while points above are an overestimations, and lines below are an underestimation
-# The graph helps visualize how accurate the model is in predicting values, or simply put, overall model fit
+    plt.scatter(df['value'], df['predicted_value'], alpha=0.3)
 
-plt.figure(figsize=(8, 8))
+    max_val = max(df['value'].max(), df['predicted_value'].max())
+    plt.plot([1, max_val], [1, max_val], 'r--', label='Perfect prediction')
 
-plt.scatter(df['value'], df['predicted_value'], alpha=0.3)
+    plt.xscale('log')
+    plt.yscale('log')
 
-max_val = max(df['value'].max(), df['predicted_value'].max())
-plt.plot([1, max_val], [1, max_val], 'r--', label='Perfect prediction')
+    # Format axes in millions of euros
+    plt.gca().xaxis.set_major_formatter(
+        mtick.FuncFormatter(lambda x, _: f"€{x/1e6:.2f}M" if x>=1e5 else f"€{int(x):,}")
+    )
+    plt.gca().yaxis.set_major_formatter(
+        mtick.FuncFormatter(lambda y, _: f"€{y/1e6:.2f}M" if y>=1e5 else f"€{int(y):,}")
+    )
 
-plt.xscale('log')
-plt.yscale('log')
+    plt.xlabel("Actual Market Value (€)")
+    plt.ylabel("Predicted Market Value (€)")
+    plt.title("Actual vs Predicted Market Value (Log Scale)")
 
-# Format axes in millions of euros
-plt.gca().xaxis.set_major_formatter(
-    mtick.FuncFormatter(lambda x, _: f"€{x/1e6:.2f}M" if x>=1e5 else f"€{int(x):,}")
-)
-plt.gca().yaxis.set_major_formatter(
-    mtick.FuncFormatter(lambda y, _: f"€{y/1e6:.2f}M" if y>=1e5 else f"€{int(y):,}")
-)
+    plt.tight_layout()
+    plt.show()
 
-plt.xlabel("Actual Market Value (€)")
-plt.ylabel("Predicted Market Value (€)")
-plt.title("Actual vs Predicted Market Value (Log Scale)")
+    # Prediction Error vs Value
 
-plt.tight_layout()
-plt.show()
+    # 2. Prediction Error vs Actual Market Value
+    # This scatter plot shows the absolute prediction error (in euros) on the y-axis versus the actual market value on the x-axis.
+    # The red line at 0 means a perfect predictions, above is an overestimtion, below is an underestimation
+    # This plot highlights where the model tends to perform better or worse depending on the player’s value.
+    # The model tends to mess up more with higher value players
 
-# Prediction Error vs Value
+    plt.figure(figsize=(8, 6))
 
-# 2. Prediction Error vs Actual Market Value
-# This scatter plot shows the absolute prediction error (in euros) on the y-axis versus the actual market value on the x-axis.
-# The red line at 0 means a perfect predictions, above is an overestimtion, below is an underestimation
-# This plot highlights where the model tends to perform better or worse depending on the player’s value.
-# The model tends to mess up more with higher value players
+    plt.scatter(df['value'], df['prediction_error'], alpha=0.3)
+    plt.axhline(0, color='red', linestyle="--")
 
-plt.figure(figsize=(8, 6))
+    plt.xscale('log')
 
-plt.scatter(df['value'], df['prediction_error'], alpha=0.3)
-plt.axhline(0, color='red', linestyle="--")
+    # Format axes in millions of euros
+    plt.gca().xaxis.set_major_formatter(
+        mtick.FuncFormatter(lambda x, _: f"€{x/1e6:.2f}M" if x>=1e5 else f"€{int(x):,}")
+    )
+    plt.gca().yaxis.set_major_formatter(
+        mtick.FuncFormatter(lambda y, _: f"€{y/1e6:.2f}M")
+    )
 
-plt.xscale('log')
+    plt.xlabel("Actual Market Value (€)")
+    plt.ylabel("Prediction Error (€)")
+    plt.title("Prediction Error vs Actual Market Value")
 
-# Format axes in millions of euros
-plt.gca().xaxis.set_major_formatter(
-    mtick.FuncFormatter(lambda x, _: f"€{x/1e6:.2f}M" if x>=1e5 else f"€{int(x):,}")
-)
-plt.gca().yaxis.set_major_formatter(
-    mtick.FuncFormatter(lambda y, _: f"€{y/1e6:.2f}M")
-)
+    plt.tight_layout()
+    plt.show()
 
-plt.xlabel("Actual Market Value (€)")
-plt.ylabel("Prediction Error (€)")
-plt.title("Prediction Error vs Actual Market Value")
+    # Error Distribution (Absolute €)
 
-plt.tight_layout()
-plt.show()
+    # 3. Distribution of Prediction Errors (Absolute €)
+    # Histogram of prediction errors in euros, showing the frequency of different error magnitudes.
+    # The red line is a reference to perfection.
+    # Most errors cluster near zero, representing typical model accuracy, while the tails reveal extreme over- or underestimations.
+    # This plot helps quantify the typical scale of errors and detect large outliers.
 
-# Error Distribution (Absolute €)
+    plt.figure(figsize=(8, 6))
 
-# 3. Distribution of Prediction Errors (Absolute €)
-# Histogram of prediction errors in euros, showing the frequency of different error magnitudes.
-# The red line is a reference to perfection.
-# Most errors cluster near zero, representing typical model accuracy, while the tails reveal extreme over- or underestimations.
-# This plot helps quantify the typical scale of errors and detect large outliers.
+    # Multiply prediction_error by 100 for x-axis
+    plt.hist(df['prediction_error'], bins=30)
+    # Vertical line at 0
+    plt.axvline(0, color='red', linestyle='--', linewidth=2)
 
-plt.figure(figsize=(8, 6))
+    plt.gca().xaxis.set_major_formatter(
+        mtick.FuncFormatter(lambda x, _: f"€{x/1e6:.1f}M")
+    )
 
-# Multiply prediction_error by 100 for x-axis
-plt.hist(df['prediction_error'], bins=30)
-# Vertical line at 0
-plt.axvline(0, color='red', linestyle='--', linewidth=2)
+    plt.gca().yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
 
-plt.gca().xaxis.set_major_formatter(
-    mtick.FuncFormatter(lambda x, _: f"€{x/1e6:.1f}M")
-)
+    plt.xlabel("Predictions Error (€)")
+    plt.ylabel("Number of Players")
+    plt.title("Distribution of Prediction Errors (Absolute €)")
 
-plt.gca().yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
+    plt.tight_layout()
+    plt.show()
 
-plt.xlabel("Predictions Error (€)")
-plt.ylabel("Number of Players")
-plt.title("Distribution of Prediction Errors (Absolute €)")
+    # Error Distribution Percent - Full Range (includes outliers)
 
-plt.tight_layout()
-plt.show()
+    # 4. Distribution of Prediction Errors (%) – Full Range (Including Outliers)
+    # Histogram of prediction errors as percentages, including extreme outliers.
+    # The red line at 0, again is a reference to perfection
 
-# Error Distribution Percent - Full Range (includes outliers)
+    plt.figure(figsize=(8, 6))
 
-# 4. Distribution of Prediction Errors (%) – Full Range (Including Outliers)
-# Histogram of prediction errors as percentages, including extreme outliers.
-# The red line at 0, again is a reference to perfection
+    # Use symmetric bins around 0
+    max_error = max(abs(df['error_pct'].min()), abs(df['error_pct'].max()))
+    bins = np.linspace(-max_error, max_error, 30)  
 
-plt.figure(figsize=(8, 6))
+    plt.hist(df['error_pct'], bins=bins)
 
-# Use symmetric bins around 0
-max_error = max(abs(df['error_pct'].min()), abs(df['error_pct'].max()))
-bins = np.linspace(-max_error, max_error, 30)  
+    # Vertical line at 0
+    plt.axvline(0, color='red', linestyle='--', linewidth=2)
 
-plt.hist(df['error_pct'], bins=bins)
+    plt.gca().xaxis.set_major_formatter(mtick.PercentFormatter(xmax=100, decimals=0))
+    plt.gca().yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
 
-# Vertical line at 0
-plt.axvline(0, color='red', linestyle='--', linewidth=2)
+    plt.xlabel("Prediction Error (%)")
+    plt.ylabel("Number of Players")
+    plt.title("Distribution of Prediction Errors (%) – Full Range (Including Outliers)")
 
-plt.gca().xaxis.set_major_formatter(mtick.PercentFormatter(xmax=100, decimals=0))
-plt.gca().yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
+    plt.xlim(-max_error, max_error)  # limit x-axis to symmetric range
+    plt.xticks(np.linspace(-max_error, max_error, 11))  # 11 ticks
 
-plt.xlabel("Prediction Error (%)")
-plt.ylabel("Number of Players")
-plt.title("Distribution of Prediction Errors (%) – Full Range (Including Outliers)")
+    plt.tight_layout()
+    plt.show()
 
-plt.xlim(-max_error, max_error)  # limit x-axis to symmetric range
-plt.xticks(np.linspace(-max_error, max_error, 11))  # 11 ticks
+    # Error Distribution Percent - Main Distribution (±5%)
 
-plt.tight_layout()
-plt.show()
+    # 5. Distribution of Prediction Errors (%) – Main Distribution (±5%)
+    # Histogram of prediction errors as percentages focusing on the main -+5% range
+    # The red line at 0, again is a reference to perfection
+    # This graphs helps visualize data more clearly without the outliers
 
-# Error Distribution Percent - Main Distribution (±5%)
+    plt.figure(figsize=(8, 6))
 
-# 5. Distribution of Prediction Errors (%) – Main Distribution (±5%)
-# Histogram of prediction errors as percentages focusing on the main -+5% range
-# The red line at 0, again is a reference to perfection
-# This graphs helps visualize data more clearly without the outliers
+    # Use symmetric bins around 0
+    max_error = max(abs(df['error_pct'].min()), abs(df['error_pct'].max()))
+    bins = np.arange(-5, 5 + 1, 1)  
 
-plt.figure(figsize=(8, 6))
+    plt.hist(df['error_pct'], bins=bins)
 
-# Use symmetric bins around 0
-max_error = max(abs(df['error_pct'].min()), abs(df['error_pct'].max()))
-bins = np.arange(-5, 5 + 1, 1)  
+    # Vertical line at 0
+    plt.axvline(0, color='red', linestyle='--', linewidth=2)
 
-plt.hist(df['error_pct'], bins=bins)
+    plt.gca().xaxis.set_major_formatter(mtick.PercentFormatter(xmax=100, decimals=0))
+    plt.gca().yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
 
-# Vertical line at 0
-plt.axvline(0, color='red', linestyle='--', linewidth=2)
+    plt.xlabel("Prediction Error (%)")
+    plt.ylabel("Number of Players")
+    plt.title("Distribution of Prediction Errors (%) – Main Distribution (±5%)")
 
-plt.gca().xaxis.set_major_formatter(mtick.PercentFormatter(xmax=100, decimals=0))
-plt.gca().yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}'))
+    plt.xlim(-5, 5) # limit x-axis to symmetric range
+    plt.xticks(np.arange(-5, 5 + 1, 1))
 
-plt.xlabel("Prediction Error (%)")
-plt.ylabel("Number of Players")
-plt.title("Distribution of Prediction Errors (%) – Main Distribution (±5%)")
+    plt.tight_layout()
+    plt.show()
 
-plt.xlim(-5, 5) # limit x-axis to symmetric range
-plt.xticks(np.arange(-5, 5 + 1, 1))
 
-plt.tight_layout()
-plt.show()
+if __name__ == '__main__':
+    main()
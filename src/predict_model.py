@@ -1,7 +1,12 @@
 import os
+import argparse
+
 import pandas as pd
 import numpy as np
-import joblib
+
+import model_registry
+import feature_store
+from prediction_cache import PredictionCache
 
 # Round predicted values like Transfermarkt
 def round_market_value(val):
@@ -12,79 +17,210 @@ def round_market_value(val):
     else:
         return round(val, -6)
 
+
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(script_dir, '..', 'models', 'lgb_market_value_model.pkl')
 feature_list_path = os.path.join(script_dir, '..', 'models', 'features.txt')
-data_path = os.path.join(script_dir, '..', 'data', 'processed', 'features_dataset.csv')
 output_path = os.path.join(script_dir, '..', 'data', 'processed', 'predictions.csv')
 
-# Turn off scientific notation and force commas
-pd.options.display.float_format = '{:,.0f}'.format
-
-# Load model
-model = joblib.load(model_path)
-
-# Load training feature list correctly
-with open(feature_list_path, 'r') as f:
-    trained_features = [line.strip() for line in f.readlines()]  # <-- readlines(), not readline()
-
-# Load data
-df = pd.read_csv(data_path)
-
-# Drop columns not used in training
-cols_to_drop = [
-    'value',
-    'player_id',
-    'team_id',
-    'date_unix',
-    'season_name',
-    'season_start_year',
-    'competition_id',
-    'current_club_id',
-    'current_club_name',
-    'place_of_birth',
-    'country_of_birth',
-    'career_goals',
-    'career_assists',
-    'career_goals_contrib',
-    'career_clean_sheets',
-    'career_goals_conceded',
-    'avg_goals_per_season',
-    'avg_assists_per_season',
-    'avg_goals_conceded_per_season',
-    'avg_clean_sheets_per_season',
-    'is_eu_False',
-    'foot_Unknown',
-    'team_avg_value',
-]
-
-X = df.drop(columns=[c for c in cols_to_drop if c in df.columns])
-
-# Reindex to match training features
-X = X.reindex(columns=trained_features, fill_value=0)
-
-# Predict
-y_pred_log = model.predict(X)
-df['predicted_value'] = np.expm1(y_pred_log)
-
-# Round values like Transfermarkt
-df['predicted_value'] = df['predicted_value'].apply(round_market_value)
-
-# Handle duplicates
-df = df.groupby(['player_id', 'season_name', 'season_start_year', 'date_unix']).agg({
-    'predicted_value': 'max',   # Take the largest prediction
-    'value': 'first',
-    'age': 'first',
-    'minutes_played': 'sum'
-}).reset_index()
-
-
-# Save predictions
-df[['player_id', 'season_name', 'season_start_year', 'date_unix', 'predicted_value']].to_csv(output_path, index=False)
-
-# Print prediction description
-print(df['predicted_value'].describe())
-
-print("Predictions saved to:", output_path)
-print(df[['player_id', 'season_name', 'season_start_year', 'date_unix', 'predicted_value']].head(10))
+# Registered models; goalkeepers and outfield players are routed to their segment models when available
+default_model = 'lgb_market_value'
+segment_by = 'position'
+segment_routes = {
+    'goalkeeper': 'lgb_goalkeeper',
+    'outfield': 'lgb_outfield',
+}
+
+# LGB + HGB blend, added to the output as predicted_value_ensemble when registered
+ensemble_model_name = 'ensemble_market_value'
+
+# P10/P50/P90 bands, added to the output when the quantile models are registered
+quantile_model_name = 'lgb_quantiles_market_value'
+
+# Forecasts 1-3 seasons ahead, added to the output when the horizon models are registered
+horizon_model_name = 'lgb_horizons_market_value'
+
+# Output grain: one prediction per player valuation date
+output_keys = ['player_id', 'season_name', 'season_start_year', 'date_unix']
+
+
+# Rows to send to the models: one per distinct feature vector among the given snapshot rows.
+# Returns those rows (in snapshot order) and, for every input row, the position of its scored row.
+def distinct_feature_rows(snapshot, rows=None):
+    subset = np.arange(len(snapshot)) if rows is None else np.asarray(rows)
+    M = np.ascontiguousarray(snapshot.matrix[subset])
+
+    # Each row's bytes as a single value, so identical vectors (NaNs included) compare equal
+    row_bytes = M.view(np.dtype((np.void, M.dtype.itemsize * M.shape[1]))).ravel()
+    _, first, inverse = np.unique(row_bytes, return_index=True, return_inverse=True)
+
+    order = np.argsort(first)
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    return subset[first[order]], position[inverse.ravel()]
+
+
+# Rows of each output group, grouped by output_keys in sorted key order.
+# Returns the row order and the start of every group in it; rows with a missing key are left out.
+def output_groups(keys):
+    codes = [pd.factorize(keys[col], sort=True)[0] for col in output_keys]
+    valid = np.flatnonzero(np.all(np.column_stack(codes) >= 0, axis=1))
+    order = valid[np.lexsort([c[valid] for c in reversed(codes)])]
+
+    sorted_codes = np.column_stack([c[order] for c in codes])
+    starts = np.flatnonzero(np.r_[True, np.any(sorted_codes[1:] != sorted_codes[:-1], axis=1)])
+    return order, starts
+
+
+# First non-missing value of each group in the output_groups order, NaN for a group with none (like groupby first)
+def first_valid(values, order, starts):
+    values = np.asarray(values, dtype=np.float64)[order]
+    position = np.where(np.isnan(values), len(values), np.arange(len(values)))
+    first = np.minimum.reduceat(position, starts)
+    found = first < np.r_[starts[1:], len(values)]
+    result = np.full(len(starts), np.nan)
+    result[found] = values[first[found]]
+    return result
+
+
+# Log predictions for all snapshot rows, or only the given rows
+def score_snapshot(snapshot, rows=None, cache=None):
+    if model_registry.has_model(default_model):
+        # Predict every segment in one batched call, models are loaded lazily.
+        # Rows already scored by the same model version come from the cache.
+        y_pred_log, used_models = model_registry.predict_routed(
+            snapshot, segment_by, segment_routes, default_model, rows=rows, cache=cache,
+        )
+        print("Models used:", used_models)
+        return y_pred_log
+
+    # Fall back to the unversioned model from before the registry existed
+    import joblib
+    model = joblib.load(model_path)
+
+    with open(feature_list_path, 'r') as f:
+        trained_features = [line.strip() for line in f.readlines()]
+
+    # The legacy model has no schema hash, so at least require the exact same columns
+    if trained_features != snapshot.feature_columns:
+        raise feature_store.SchemaMismatchError(
+            f"{model_path} was trained on different features than the snapshot. Retrain the model."
+        )
+
+    return model.predict(snapshot.X if rows is None else snapshot.X.iloc[rows])
+
+
+# Rounded predictions (and the ensemble, P10/P50/P90 bands and horizons when registered), one row per player valuation date.
+# Each distinct feature vector is scored once and broadcast back to its rows, then the
+# competition rows of a valuation date are reduced to the largest prediction.
+def build_predictions(snapshot, rows=None, cache=None):
+    subset = np.arange(len(snapshot)) if rows is None else np.asarray(rows)
+    scored_rows, scored_position = distinct_feature_rows(snapshot, subset)
+    print(f"Scoring {len(scored_rows)} distinct feature rows for {len(subset)} rows")
+
+    predictions = {'predicted_value': np.expm1(score_snapshot(snapshot, scored_rows, cache))}
+
+    # The distinct rows are gathered once and shared by the ensemble, quantile and horizon models
+    M = None
+    if any(model_registry.has_model(name) for name in (ensemble_model_name, quantile_model_name, horizon_model_name)):
+        M = np.ascontiguousarray(snapshot.matrix[scored_rows])
+
+    if model_registry.has_model(ensemble_model_name):
+        ensemble_model, ensemble_manifest = model_registry.load_model(ensemble_model_name)
+        snapshot.check(ensemble_manifest.get('schema_hash'), what=f"Model {ensemble_model_name}")
+
+        # Both models score the shared matrix in one threaded pass; rows seen before come from the cache
+        if cache is None:
+            ens_pred = ensemble_model.predict(M)
+        else:
+            fingerprint = model_registry.model_fingerprint(ensemble_model_name, ensemble_manifest['version'])
+            ens_pred = cache.predict(ensemble_model_name, fingerprint, ensemble_model, snapshot.X.iloc[scored_rows], M)
+        predictions['predicted_value_ensemble'] = np.expm1(ens_pred)
+
+    if model_registry.has_model(quantile_model_name):
+        quantile_model, quantile_manifest = model_registry.load_model(quantile_model_name)
+        snapshot.check(quantile_manifest.get('schema_hash'), what=f"Model {quantile_model_name}")
+
+        # All quantiles in one pass over the shared snapshot matrix. The quantile models are trained on every
+        # player, not per segment, so P50 can differ from predicted_value.
+        q_pred = np.expm1(quantile_model.predict_quantiles(M))
+        for i, alpha in enumerate(quantile_model.quantiles):
+            predictions[f'predicted_value_p{int(round(alpha * 100))}'] = q_pred[:, i]
+
+    if model_registry.has_model(horizon_model_name):
+        horizon_model, horizon_manifest = model_registry.load_model(horizon_model_name)
+        snapshot.check(horizon_manifest.get('schema_hash'), what=f"Model {horizon_model_name}")
+
+        # All horizons in one batched call over the same matrix
+        h_pred = np.expm1(horizon_model.predict_horizons(M))
+        for i, h in enumerate(horizon_model.horizons):
+            predictions[f'predicted_value_next_{h}'] = h_pred[:, i]
+    prediction_cols = list(predictions)
+
+    # Largest prediction per valuation date, first value and age, total minutes. Missing values are skipped
+    # as groupby max/first/sum would: fmax ignores NaN, first_valid takes the first non-missing value and
+    # missing minutes count as 0.
+    keys = snapshot.keys.iloc[subset].reset_index(drop=True)
+    order, starts = output_groups(keys)
+
+    df = keys.loc[order[starts], output_keys].reset_index(drop=True)
+    for col, values in predictions.items():
+        df[col] = np.fmax.reduceat(values[scored_position][order], starts)
+    df['value'] = first_valid(keys['value'], order, starts)
+    df['age'] = first_valid(snapshot.column('age')[subset], order, starts)
+    minutes = snapshot.column('minutes_played')[subset][order].astype(np.float64)
+    df['minutes_played'] = np.add.reduceat(np.where(np.isnan(minutes), 0.0, minutes), starts)
+
+    # Round values like Transfermarkt, rounding is monotonic so it can follow the max
+    for col in prediction_cols:
+        df[col] = df[col].apply(round_market_value)
+
+    return df, prediction_cols
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predict market values for the features snapshot")
+    parser.add_argument('--player-id', type=int, help="Only score this player's rows and print them, predictions.csv is left as is")
+    parser.add_argument('--no-cache', action='store_true', help="Rescore every row without the prediction cache")
+    args = parser.parse_args(argv)
+
+    # Turn off scientific notation and force commas
+    pd.options.display.float_format = '{:,.0f}'.format
+
+    # Load the published features snapshot
+    snapshot = feature_store.load_snapshot()
+
+    # All rows, or the single-player path
+    rows = None
+    if args.player_id is not None:
+        rows = np.flatnonzero(snapshot.column('player_id') == args.player_id)
+        if len(rows) == 0:
+            raise KeyError(f"Player {args.player_id} is not in the features snapshot")
+
+    cache = None if args.no_cache else PredictionCache.load()
+    df, prediction_cols = build_predictions(snapshot, rows, cache)
+
+    if cache is not None:
+        cache.save()
+        cache.export_metrics()
+        metrics = cache.metrics()
+        if metrics['hit_rate'] is not None:
+            print(f"Prediction cache: {metrics['hits']} hits, {metrics['misses']} misses ({metrics['hit_rate']:.1%} hit rate)")
+
+    # A single player is only printed, the batch output stays complete
+    if rows is not None:
+        print(df[['player_id', 'season_name', 'season_start_year', 'date_unix', 'value'] + prediction_cols].to_string(index=False))
+    else:
+        # Save predictions
+        df[['player_id', 'season_name', 'season_start_year', 'date_unix'] + prediction_cols].to_csv(output_path, index=False)
+
+        # Print prediction description
+        print(df['predicted_value'].describe())
+
+        print("Predictions saved to:", output_path)
+        print(df[['player_id', 'season_name', 'season_start_year', 'date_unix'] + prediction_cols].head(10))
+
+
+if __name__ == '__main__':
+    main()
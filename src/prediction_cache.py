@@ -0,0 +1,232 @@
+import os
+import json
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Persisted predictions and the hit-rate metrics of the last run
+cache_path = os.path.join(script_dir, '..', 'data', 'processed', 'prediction_cache.pkl')
+metrics_path = os.path.join(script_dir, '..', 'data', 'processed', 'prediction_cache_metrics.json')
+
+# Total cached rows across all models before the least recently used are evicted
+MAX_ENTRIES = 2_000_000
+
+# 64-bit FNV-1a constants
+FNV_OFFSET = np.uint64(0xcbf29ce484222325)
+FNV_PRIME = np.uint64(0x100000001b3)
+
+# Constants of the second, independent row hash (golden-ratio increment and MurmurHash3 finalizer multiplier)
+MIX_GOLDEN = np.uint64(0x9e3779b97f4a7c15)
+MIX_MULT = np.uint64(0xff51afd7ed558ccd)
+
+
+# One 64-bit hash per row of a float32 matrix, mixing the raw bits of each column in turn.
+# Vectorized over rows, so hashing a full snapshot costs one pass per feature column.
+def hash_rows(M):
+    bits = np.ascontiguousarray(M, dtype=np.float32).view(np.uint32)
+    h = np.full(len(bits), FNV_OFFSET, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(bits.shape[1]):
+            h ^= bits[:, j].astype(np.uint64)
+            h *= FNV_PRIME
+    return h
+
+
+# Second 64-bit hash per row with unrelated mixing: each value is tagged with its column position
+# and scrambled before it is combined. It is stored next to hash_rows and compared on lookup, so a
+# cached prediction is only served when both hashes of the row agree.
+def check_rows(M):
+    bits = np.ascontiguousarray(M, dtype=np.float32).view(np.uint32)
+    h = np.zeros(len(bits), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for j in range(bits.shape[1]):
+            x = (bits[:, j].astype(np.uint64) + np.uint64(j + 1)) * MIX_GOLDEN
+            x ^= x >> np.uint64(32)
+            h = (h ^ x) * MIX_MULT
+            h ^= h >> np.uint64(29)
+    return h
+
+
+def model_key(name, version):
+    return f'{name}:{version}'
+
+
+# Predictions keyed by (model version, feature-row hash). Versions are model_registry.model_fingerprint
+# labels, which include a hash of the model file, so a re-created registry never serves stale predictions.
+# Each model version holds sorted hashes so a batch lookup is one searchsorted, plus each row's check_rows
+# hash to confirm a match; a logical clock tracks recency for LRU eviction.
+class PredictionCache:
+    def __init__(self, entries=None, clock=0, max_entries=MAX_ENTRIES):
+        self.entries = entries or {}
+        self.clock = clock
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.by_model = {}
+
+    @staticmethod
+    def load(path=cache_path, max_entries=MAX_ENTRIES):
+        import joblib
+
+        if not os.path.exists(path):
+            return PredictionCache(max_entries=max_entries)
+        state = joblib.load(path)
+        # Entries saved before rows carried a check hash can't be verified, so they are rescored
+        entries = {key: entry for key, entry in state['entries'].items() if 'checks' in entry}
+        return PredictionCache(entries, state['clock'], max_entries)
+
+    def save(self, path=cache_path):
+        import joblib
+
+        self.evict()
+        tmp_path = path + '.tmp'
+        joblib.dump({'entries': self.entries, 'clock': self.clock}, tmp_path)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return sum(len(e['hashes']) for e in self.entries.values())
+
+    # A new version of a model makes its older cached versions unreachable, so they are dropped
+    def invalidate(self, name=None, keep_version=None):
+        for key in list(self.entries):
+            key_name, key_version = key.rsplit(':', 1)
+            if (name is None or key_name == name) and key_version != keep_version:
+                del self.entries[key]
+
+    # Cached predictions for the given hashes and a mask of which ones were found.
+    # A row whose hash matches but whose check hash doesn't is a collision and counts as not found.
+    def lookup(self, key, hashes, checks):
+        predictions = np.full(len(hashes), np.nan)
+        found = np.zeros(len(hashes), dtype=bool)
+        entry = self.entries.get(key)
+        if entry is None or len(hashes) == 0:
+            return predictions, found
+
+        pos = np.searchsorted(entry['hashes'], hashes)
+        pos_clipped = np.minimum(pos, len(entry['hashes']) - 1)
+        found = (
+            (pos < len(entry['hashes']))
+            & (entry['hashes'][pos_clipped] == hashes)
+            & (entry['checks'][pos_clipped] == checks)
+        )
+
+        predictions[found] = entry['predictions'][pos_clipped[found]]
+        entry['last_used'][pos_clipped[found]] = self.clock
+        return predictions, found
+
+    def store(self, key, hashes, checks, predictions):
+        hashes, first = np.unique(hashes, return_index=True)
+        checks = np.asarray(checks, dtype=np.uint64)[first]
+        predictions = np.asarray(predictions, dtype=np.float64)[first]
+        last_used = np.full(len(hashes), self.clock, dtype=np.int64)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            # New values win over stale ones with the same hash
+            keep = ~np.isin(entry['hashes'], hashes)
+            hashes = np.concatenate([entry['hashes'][keep], hashes])
+            checks = np.concatenate([entry['checks'][keep], checks])
+            predictions = np.concatenate([entry['predictions'][keep], predictions])
+            last_used = np.concatenate([entry['last_used'][keep], last_used])
+            order = np.argsort(hashes, kind='stable')
+            hashes, checks = hashes[order], checks[order]
+            predictions, last_used = predictions[order], last_used[order]
+
+        self.entries[key] = {'hashes': hashes, 'checks': checks, 'predictions': predictions, 'last_used': last_used}
+
+    # Drop the least recently used rows across all models until the cache fits
+    def evict(self):
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        all_used = np.concatenate([e['last_used'] for e in self.entries.values()])
+        cutoff = np.partition(all_used, excess - 1)[excess - 1]
+
+        # Rows used strictly before the cutoff go first, then as many at the cutoff as needed
+        to_drop = excess - int((all_used < cutoff).sum())
+        for key, entry in list(self.entries.items()):
+            drop = entry['last_used'] < cutoff
+            at_cutoff = np.flatnonzero(entry['last_used'] == cutoff)
+            take = at_cutoff[:max(to_drop, 0)]
+            drop[take] = True
+            to_drop -= len(take)
+
+            keep = ~drop
+            if not keep.any():
+                del self.entries[key]
+                continue
+            self.entries[key] = {k: v[keep] for k, v in entry.items()}
+        return excess
+
+    def _count(self, key, hits, misses):
+        self.hits += hits
+        self.misses += misses
+        stats = self.by_model.setdefault(key, {'hits': 0, 'misses': 0})
+        stats['hits'] += hits
+        stats['misses'] += misses
+
+    # Score only the rows the cache hasn't seen for this model version
+    def predict(self, name, version, model, X, M=None):
+        self.clock += 1
+        key = model_key(name, version)
+        self.invalidate(name, keep_version=version)
+
+        M = X.to_numpy(dtype=np.float32) if M is None else M
+        hashes = hash_rows(M)
+        checks = check_rows(M)
+        predictions, found = self.lookup(key, hashes, checks)
+        missing = np.flatnonzero(~found)
+
+        if len(missing):
+            X_missing = X if len(missing) == len(X) else X.iloc[missing]
+            predictions[missing] = model.predict(X_missing)
+            self.store(key, hashes[missing], checks[missing], predictions[missing])
+
+        self._count(key, len(found) - len(missing), len(missing))
+        return predictions
+
+    def metrics(self):
+        total = self.hits + self.misses
+        return {
+            'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else None,
+            'cached_rows': len(self),
+            'max_entries': self.max_entries,
+            'models': {
+                key: {**s, 'hit_rate': s['hits'] / (s['hits'] + s['misses']) if s['hits'] + s['misses'] else None}
+                for key, s in self.by_model.items()
+            },
+        }
+
+    def export_metrics(self, path=metrics_path):
+        with open(path, 'w') as f:
+            json.dump(self.metrics(), f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the persistent prediction cache")
+    parser.add_argument('--clear', action='store_true', help="Drop every cached prediction")
+    args = parser.parse_args(argv)
+
+    cache = PredictionCache.load()
+    if args.clear:
+        cache.invalidate()
+        cache.save()
+        print("Cleared prediction cache:", cache_path)
+    else:
+        for key, entry in cache.entries.items():
+            print(f"{key}: {len(entry['hashes'])} rows")
+        print(f"Total: {len(cache)} of {cache.max_entries} rows")
+        if os.path.exists(metrics_path):
+            with open(metrics_path, 'r') as f:
+                print("Last run:", json.dumps(json.load(f), indent=2))
+
+
+if __name__ == '__main__':
+    main()
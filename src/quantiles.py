@@ -0,0 +1,45 @@
+import numpy as np
+
+from boosters import MultiBoosterModel
+
+# Prediction band reported next to the point estimate
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+# Pinball loss of one quantile prediction, lower is better
+def pinball_loss(y, pred, alpha):
+    diff = np.asarray(y, dtype=np.float64) - np.asarray(pred, dtype=np.float64)
+    return float(np.mean(np.maximum(alpha * diff, (alpha - 1) * diff)))
+
+
+# One quantile-objective LightGBM per quantile, trained on the log target.
+# Quantiles are preserved by expm1, so the bands transform back to euros unchanged.
+def fit_quantile_models(X, y, params, quantiles=QUANTILES):
+    import lightgbm as lgb
+
+    models = []
+    for alpha in quantiles:
+        model = lgb.LGBMRegressor(objective='quantile', alpha=alpha, random_state=42, n_jobs=-1, verbose=-1, **params)
+        model.fit(X, y)
+        models.append(model)
+    return QuantileModel(models, quantiles, X.columns)
+
+
+# All quantile models scored over one shared float32 matrix
+class QuantileModel(MultiBoosterModel):
+    def __init__(self, models, quantiles, features):
+        super().__init__(models, features)
+        self.quantiles = tuple(quantiles)
+
+    # (n_rows, n_quantiles) log predictions. Each row is sorted so quantiles never cross
+    # (monotone=False returns the raw model outputs).
+    def predict_quantiles(self, X, executor=None, monotone=True):
+        P = self.predict_all(X, executor)
+        if monotone:
+            P.sort(axis=1)
+        return P
+
+    # Median as the point estimate, so the model can stand in anywhere a regressor is expected
+    def predict(self, X, executor=None):
+        P = self.predict_quantiles(X, executor)
+        return P[:, self.quantiles.index(0.5)] if 0.5 in self.quantiles else P.mean(axis=1)
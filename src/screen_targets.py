@@ -0,0 +1,190 @@
+import os
+import time
+import argparse
+
+import pandas as pd
+import numpy as np
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Predictions merged with features, written by analyze_predictions.py
+predictions_path = os.path.join(script_dir, '..', 'data', 'processed', 'predictions_with_errors.csv')
+
+# Saved screening index
+index_path = os.path.join(script_dir, '..', 'data', 'processed', 'screening_index.pkl')
+
+output_targets_path = os.path.join(script_dir, '..', 'data', 'processed', 'top_transfer_targets.csv')
+
+# Columns with a sorted index; predicates on any of them are answered by binary search
+INDEXED_COLUMNS = [
+    'age',
+    'minutes_played',
+    'contract_remaining_years',
+    'prediction_error',
+    'error_pct',
+    'value',
+    'predicted_value',
+    'season_start_year',
+]
+
+# Keep useful columns only
+TARGET_COLUMNS = [
+    'player_id',
+    'season_name',
+    'season_start_year',
+    'date_unix',
+    'age',
+    'main_position_Attack',
+    'main_position_Midfield',
+    'main_position_Defender',
+    'main_position_Goalkeeper',
+    'minutes_played',
+    'contract_remaining_years',
+    'value',
+    'predicted_value',
+    'prediction_error',
+    'error_pct',
+]
+
+# The original transfer-target screen, as inclusive (low, high) bounds
+DEFAULT_SCREEN = {
+    'prediction_error': (np.nextafter(1_000_000, np.inf), None),  # undervalued by €1m+
+    'age': (None, 25),                                             # young players
+    'minutes_played': (np.nextafter(900, np.inf), None),           # actually plays
+    'contract_remaining_years': (None, 2),                         # realistic transfers
+}
+
+
+# Sorted column indexes over predictions_with_errors: one argsort per indexed column,
+# plus row order by prediction_error so top-N needs no sort at query time
+class ScreeningIndex:
+    def __init__(self, rows, sorted_values, sorted_rows, rank_by):
+        self.rows = rows
+        self.sorted_values = sorted_values
+        self.sorted_rows = sorted_rows
+        self.rank_by = rank_by
+
+    @classmethod
+    def build(cls, df, rank_by='prediction_error'):
+        columns = [c for c in TARGET_COLUMNS if c in df.columns]
+        indexed = [c for c in INDEXED_COLUMNS if c in df.columns]
+
+        # Rows stored in descending rank order: the rank of a row is its position
+        order = np.argsort(-df[rank_by].to_numpy(dtype=np.float64), kind='stable')
+        rows = df[list(dict.fromkeys(columns + indexed))].iloc[order].reset_index(drop=True)
+
+        sorted_values = {}
+        sorted_rows = {}
+        for col in indexed:
+            values = rows[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            col_order = np.argsort(values, kind='stable')
+            # NaNs sort last and never satisfy a predicate
+            n_valid = int((~np.isnan(values)).sum())
+            sorted_values[col] = values[col_order[:n_valid]]
+            sorted_rows[col] = col_order[:n_valid].astype(np.int32)
+
+        return cls(rows, sorted_values, sorted_rows, rank_by)
+
+    def save(self, path=index_path):
+        import joblib
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path=index_path):
+        import joblib
+        return joblib.load(path)
+
+    # Rank positions satisfying low <= column <= high, from two binary searches
+    def _range(self, col, low, high):
+        values = self.sorted_values[col]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return self.sorted_rows[col][start:stop]
+
+    # predicates: {column: (low, high)} with inclusive bounds, None for open ends.
+    # Columns without a sorted index are filtered on the candidate rows only.
+    def screen(self, predicates, top_n=50):
+        other = {}
+
+        # Start from the most selective indexed range, intersect the rest as boolean masks
+        ranges = []
+        for col, (low, high) in predicates.items():
+            if col in self.sorted_values:
+                ranges.append(self._range(col, low, high))
+            else:
+                other[col] = (low, high)
+        ranges.sort(key=len)
+
+        if ranges:
+            mask = np.zeros(len(self.rows), dtype=bool)
+            mask[ranges[0]] = True
+            for r in ranges[1:]:
+                if not mask.any():
+                    break
+                keep = np.zeros(len(self.rows), dtype=bool)
+                keep[r] = True
+                mask &= keep
+            candidates = np.flatnonzero(mask)
+        else:
+            candidates = np.arange(len(self.rows))
+
+        for col, (low, high) in other.items():
+            values = self.rows[col].to_numpy()[candidates]
+            keep = np.ones(len(candidates), dtype=bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            candidates = candidates[keep]
+
+        # Rows are stored in rank order, so the first candidates are the top-N
+        return self.rows.iloc[candidates[:top_n]].reset_index(drop=True)
+
+
+def screen_targets(predicates=None, top_n=50, index=None):
+    index = index or ScreeningIndex.load()
+    return index.screen(predicates or DEFAULT_SCREEN, top_n=top_n)
+
+
+# "col:low:high" with either bound optional, e.g. "age::25" or "minutes_played:900:"
+def parse_predicate(text):
+    col, low, high = text.split(':')
+    return col, (float(low) if low else None, float(high) if high else None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen predictions for undervalued transfer targets")
+    parser.add_argument('--build', action='store_true', help="Rebuild the index from predictions_with_errors.csv")
+    parser.add_argument('--where', action='append', type=parse_predicate, default=[],
+                        help="Range predicate col:low:high (repeatable); replaces the default screen")
+    parser.add_argument('--top', type=int, default=50)
+    parser.add_argument('--save', action='store_true', help=f"Write the result to {output_targets_path}")
+    args = parser.parse_args(argv)
+
+    # Turn off scientific notation and force commas
+    pd.options.display.float_format = '{:,.0f}'.format
+
+    if args.build or not os.path.exists(index_path):
+        start = time.perf_counter()
+        index = ScreeningIndex.build(pd.read_csv(predictions_path))
+        index.save()
+        print(f"Indexed {len(index.rows)} rows in {time.perf_counter() - start:.1f}s")
+    else:
+        index = ScreeningIndex.load()
+
+    predicates = dict(args.where) if args.where else DEFAULT_SCREEN
+    start = time.perf_counter()
+    targets = index.screen(predicates, top_n=args.top)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(targets.to_string(formatters={'error_pct': '{:.0%}'.format, 'age': '{:.1f}'.format}))
+    print(f"\n{len(targets)} targets in {elapsed_ms:.1f} ms")
+
+    if args.save:
+        targets.to_csv(output_targets_path, index=False)
+        print("Saved targets to:", output_targets_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+import os
+import time
+import argparse
+
+import pandas as pd
+import numpy as np
+
+from feature_engineering import numeric_features
+
+# Path to the current directory this script is in
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Predictions merged with features, written by analyze_predictions.py
+predictions_path = os.path.join(script_dir, '..', 'data', 'processed', 'predictions_with_errors.csv')
+
+# Saved index
+index_path = os.path.join(script_dir, '..', 'data', 'processed', 'similar_players_index.pkl')
+
+POSITIONS = ['Attack', 'Midfield', 'Defender', 'Goalkeeper']
+
+# Columns returned with every match
+RESULT_COLUMNS = ['player_id', 'season_start_year', 'main_position', 'age', 'minutes_played', 'value', 'predicted_value']
+
+
+def main_position_labels(df):
+    dummies = [f'main_position_{p}' for p in POSITIONS if f'main_position_{p}' in df.columns]
+    if not dummies:
+        return pd.Series('Unknown', index=df.index)
+    flags = df[dummies].astype(bool)
+    labels = flags.idxmax(axis=1).str.replace('main_position_', '', regex=False)
+    return labels.where(flags.any(axis=1), 'Unknown')
+
+
+# Nearest-neighbour index over standardized numeric features, one BallTree per main position
+class SimilarPlayerIndex:
+    def __init__(self, features, mean, std, Z, trees, rows, positions):
+        self.features = features
+        self.mean = mean
+        self.std = std
+        self.Z = Z
+        self.trees = trees
+        self.rows = rows
+        self.positions = positions
+
+        # (player_id, season) -> positional row
+        keys = zip(rows['player_id'].to_numpy().tolist(), rows['season_start_year'].to_numpy().tolist())
+        self.lookup = {key: i for i, key in enumerate(keys)}
+
+    @classmethod
+    def build(cls, df, leaf_size=40):
+        from sklearn.neighbors import BallTree
+
+        # One row per player-season
+        df = df.drop_duplicates(subset=['player_id', 'season_start_year']).reset_index(drop=True)
+
+        features = [c for c in numeric_features if c in df.columns]
+        X = df[features].to_numpy(dtype=np.float64, na_value=np.nan)
+        X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1
+        Z = ((X - mean) / std).astype(np.float32)
+
+        rows = df.assign(main_position=main_position_labels(df))
+        rows = rows[[c for c in RESULT_COLUMNS if c in rows.columns]].copy()
+
+        trees = {}
+        positions = {}
+        for position, idx in rows.groupby('main_position').indices.items():
+            trees[position] = BallTree(Z[idx], leaf_size=leaf_size)
+            positions[position] = idx
+
+        return cls(features, mean, std, Z, trees, rows, positions)
+
+    def save(self, path=index_path):
+        import joblib
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path=index_path):
+        import joblib
+        return joblib.load(path)
+
+    # Positional row of a player-season in the index
+    def locate(self, player_id, season_start_year):
+        if (player_id, season_start_year) not in self.lookup:
+            raise KeyError(f"Player {player_id} has no row for season {season_start_year}")
+        return self.lookup[(player_id, season_start_year)]
+
+    # Top-k most similar player-seasons in the same position, optionally within an age band.
+    # Candidates are over-fetched from the tree and filtered, widening until k matches are found.
+    def query(self, player_id, season_start_year, k=10, age_band=2, same_season=False):
+        row = self.locate(player_id, season_start_year)
+        position = self.rows['main_position'].iat[row]
+        tree = self.trees[position]
+        members = self.positions[position]
+        target = self.Z[row:row + 1]
+        target_age = self.rows['age'].iat[row]
+
+        fetch = min(len(members), (k + 1) * 4)
+        while True:
+            dist, ind = tree.query(target, k=fetch)
+            candidates = self.rows.iloc[members[ind[0]]].assign(distance=dist[0])
+
+            candidates = candidates[candidates['player_id'] != player_id]
+            if age_band is not None:
+                candidates = candidates[(candidates['age'] - target_age).abs() <= age_band]
+            if same_season:
+                candidates = candidates[candidates['season_start_year'] == season_start_year]
+
+            if len(candidates) >= k or fetch == len(members):
+                return candidates.head(k).reset_index(drop=True)
+            fetch = min(len(members), fetch * 4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find players similar to a target player-season")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('build', help="Build the index from predictions_with_errors.csv")
+
+    query_parser = subparsers.add_parser('query', help="Top-k similar players for a player-season")
+    query_parser.add_argument('--player-id', type=int, required=True)
+    query_parser.add_argument('--season', type=int, required=True)
+    query_parser.add_argument('-k', type=int, default=10)
+    query_parser.add_argument('--age-band', type=float, default=2)
+    query_parser.add_argument('--same-season', action='store_true')
+    args = parser.parse_args(argv)
+
+    # Turn off scientific notation and force commas
+    pd.options.display.float_format = '{:,.0f}'.format
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        index = SimilarPlayerIndex.build(pd.read_csv(predictions_path))
+        index.save()
+        print(f"Indexed {len(index.rows)} player-seasons in {time.perf_counter() - start:.1f}s")
+        print("Saved index to:", index_path)
+    else:
+        index = SimilarPlayerIndex.load()
+        start = time.perf_counter()
+        result = index.query(args.player_id, args.season, k=args.k, age_band=args.age_band,
+                             same_season=args.same_season)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(result.to_string(formatters={'distance': '{:.3f}'.format, 'age': '{:.1f}'.format}))
+        print(f"\nQuery took {elapsed_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+# Teammate features added to the features dataset
+teammate_features = [
+    'teammate_prev_value_wavg',
+    'teammate_prev_value_pct',
+    'teammates_with_prev_value',
+]
+
+
+# (id, season) packed into one int64, so the previous season of a key is key - 1
+SEASON_SPAN = 1 << 12
+
+
+def season_keys(ids, seasons):
+    return np.asarray(ids, dtype=np.int64) * SEASON_SPAN + np.asarray(seasons, dtype=np.int64)
+
+
+# Sparse incidence of player-seasons (rows) on team-seasons (columns), weighted by minutes played.
+# Rows of the same player, team and season (one per competition) are summed into one entry.
+def incidence_matrix(df):
+    from scipy import sparse
+
+    seasons = df['season_start_year'].to_numpy()
+    ps_codes, ps_keys = pd.factorize(season_keys(df['player_id'].to_numpy(), seasons))
+    ts_codes, ts_keys = pd.factorize(season_keys(df['team_id'].to_numpy(), seasons))
+    minutes = df['minutes_played'].fillna(0).to_numpy(dtype=np.float64)
+
+    matrix = sparse.csr_matrix((minutes, (ps_codes, ts_codes)), shape=(len(ps_keys), len(ts_keys)))
+    matrix.sum_duplicates()
+    return matrix, ps_codes, ts_codes, ps_keys
+
+
+# Each player-season's value in the player's previous season (max over its rows), NaN when there is none
+def previous_season_values(df, ps_codes, ps_keys):
+    season_value = pd.Series(df['value'].to_numpy(dtype=np.float64, na_value=np.nan)).groupby(ps_codes).max()
+    season_value = season_value.reindex(np.arange(len(ps_keys))).to_numpy()
+    prev = pd.Index(ps_keys).get_indexer(ps_keys - 1)
+    return np.where(prev >= 0, season_value[prev], np.nan)
+
+
+# Minutes-weighted previous-season value of each row's teammates (the player itself excluded),
+# its percentile among the rows of the season, and the number of teammates it is based on.
+# Only previous-season values are used, so the current season's target never leaks in.
+def add_teammate_features(df):
+    matrix, ps_codes, ts_codes, ps_keys = incidence_matrix(df)
+    prev_value = previous_season_values(df, ps_codes, ps_keys)
+    has_value = ~np.isnan(prev_value)
+    prev_value = np.where(has_value, prev_value, 0.0)
+
+    # One product per weighting: per team-season, the sum of minutes x value and the minutes behind it,
+    # then (unweighted) the number of players with a previous value
+    weighted = matrix.T @ np.column_stack([prev_value, has_value.astype(np.float64)])
+    counts = (matrix != 0).astype(np.float64).T @ has_value.astype(np.float64)
+
+    # Remove the player's own contribution to their team-season
+    own_minutes = np.asarray(matrix[ps_codes, ts_codes]).ravel()
+    own_value = prev_value[ps_codes]
+    own_has = has_value[ps_codes]
+    value_sum = weighted[ts_codes, 0] - own_minutes * own_value
+    minutes_sum = weighted[ts_codes, 1] - own_minutes * own_has
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        df['teammate_prev_value_wavg'] = np.where(minutes_sum > 0, value_sum / minutes_sum, np.nan)
+    df['teammate_prev_value_pct'] = df.groupby('season_start_year')['teammate_prev_value_wavg'].rank(pct=True)
+    df['teammates_with_prev_value'] = counts[ts_codes] - own_has * (own_minutes > 0)
+    return df
@@ -1,87 +1,18 @@
-import os
+import time
+import argparse
+
 import pandas as pd
 import numpy as np
-import lightgbm as lgb
-import joblib
-
-from sklearn.model_selection import RandomizedSearchCV, TimeSeriesSplit
-from sklearn.metrics import mean_absolute_error, r2_score
-from sklearn.ensemble import HistGradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.inspection import permutation_importance
-
-# Path to the current directory this script is in
-script_dir = os.path.dirname(os.path.abspath(__file__))
 
-# Path to models directory for saving models
-models_dir = os.path.join(script_dir, '..', 'models')
-
-# Path to the features dataset
-file_path = os.path.join(script_dir, '..', 'data', 'processed', 'features_dataset.csv')
-
-# Load DataFrames
-df = pd.read_csv(file_path)
+import model_registry
+import feature_store
+import drift_monitor
+from dataset_cache import DatasetCache
+from experiment_store import ExperimentStore, snapshot_id
 
 # Target variable
 TARGET = 'value'
 
-# Drop rows with missing target
-df = df.dropna(subset=[TARGET])
-
-# Columns to exclude from training
-cols_to_drop = [
-    'value',
-    'player_id',
-    'team_id',
-    'date_unix',
-    'season_name',
-    'season_start_year',
-    'competition_id',
-    'current_club_id',
-    'current_club_name',
-    'place_of_birth',
-    'country_of_birth',
-    'career_goals',
-    'career_assists',
-    'career_goals_contrib',
-    'career_clean_sheets',
-    'career_goals_conceded',
-    'avg_goals_per_season',
-    'avg_assists_per_season',
-    'avg_goals_conceded_per_season',
-    'avg_clean_sheets_per_season',
-    'is_eu_False',
-    'foot_Unknown',
-    'team_avg_value',
-]
-
-X = df.drop(columns=[c for c in cols_to_drop if c in df.columns])
-y = df[TARGET]
-y_log = np.log1p(y)
-
-# Time-based train/test split
-split_year = 2020
-train_mask = df['season_start_year'] < split_year
-test_mask = df['season_start_year'] >= split_year
-
-X_train, X_test = X[train_mask].copy(), X[test_mask].copy()
-y_train, y_test = y_log[train_mask], y_log[test_mask]
-
-# Drop low-variance columns
-low_variance_cols = [c for c in X_train.columns if X_train[c].nunique() <= 2]
-X_train = X_train.drop(columns=low_variance_cols)
-X_test = X_test.drop(columns=low_variance_cols)
-print(f"Dropped {len(low_variance_cols)} low-variance columns")
-print(f"Train samples: {len(X_train)}, Test samples: {len(X_test)}")
-
-# Save feature list for later
-feature_list_path = os.path.join(models_dir, 'features.txt')
-with open(feature_list_path, 'w') as f:
-    for col in X_train.columns:
-        f.write(col + '\n')
-print(f"Saved training feature list ({len(X_train.columns)} columns) to {feature_list_path}")
-
-
 numeric_features = [
     # Age / experience
     'age', 'age_squared', 'experience_years',
@@ -102,7 +33,8 @@ numeric_features = [
     'avg_goals_contrib_per_season_prev', 'avg_clean_sheets_per_season_prev', 'avg_goals_conceded_per_season_prev',
     # Team / competition
     'team_total_goals', 'team_avg_goals', 'team_avg_goals_per_player', 'team_avg_value', 'competition_prev_avg_value',
-    'competition_prev_median_value',
+    'competition_prev_median_value', 'teammate_prev_value_wavg', 'teammate_prev_value_pct', 'teammates_with_prev_value',
+    'league_strength', 'league_strength_moves',
     # Performance / normalized
     'goals_vs_pos_avg', 'assists_vs_pos_avg', 'goal_contrib_vs_pos_avg', 'ewm_goals_contrib',
     'goals_change_vs_last_season', 'assists_change_vs_last_season', 'trusted_goals_contrib',
@@ -116,11 +48,6 @@ numeric_features = [
     # Position
     'prime_attacker', 'prime_midfielder', 'prime_defender', 'prime_goalkeeper',
 ]
-numeric_features = [c for c in numeric_features if c in X_train.columns]
-
-# LGBM model
-tscv = TimeSeriesSplit(n_splits=3)
-lgb_model = lgb.LGBMRegressor(random_state=42, n_jobs=-1, verbose=-1)  # reduced verbose
 
 param_grid_lgb = {
     'num_leaves': [31, 63],
@@ -133,37 +60,54 @@ param_grid_lgb = {
     'reg_lambda': [0, 1, 5]
 }
 
-search_lgb = RandomizedSearchCV(
-    estimator=lgb_model,
-    param_distributions=param_grid_lgb,
-    n_iter=20,
-    scoring='neg_mean_absolute_error',
-    cv=tscv,
-    n_jobs=-1,
-    verbose=1,
-    random_state=42
-)
-search_lgb.fit(X_train, y_train)
-best_lgb = search_lgb.best_estimator_
-print("Best LGB params:", search_lgb.best_params_)
-
-y_pred_log = best_lgb.predict(X_test)
-y_pred = np.expm1(y_pred_log)
-
-mae = mean_absolute_error(np.expm1(y_test), y_pred)
-r2 = r2_score(np.expm1(y_test), y_pred)
-print(f"\nLGB MAE: €{mae:,.0f}")
-print(f"LGB R²: {r2:.3f}")
-
-# HGB model
-scaler = StandardScaler()
-X_train_hgb = X_train.copy()
-X_test_hgb = X_test.copy()
-X_train_hgb[numeric_features] = scaler.fit_transform(X_train_hgb[numeric_features])
-X_test_hgb[numeric_features] = scaler.transform(X_test_hgb[numeric_features])
-
-hgb = HistGradientBoostingRegressor(random_state=42, early_stopping=True)
-param_grid = {
+
+# Time-based train/test split of the snapshot, the split year is fixed by the feature stage.
+# Rows with missing target are left out.
+def split_snapshot(snapshot):
+    y = snapshot.keys[TARGET]
+    has_target = y.notna().to_numpy()
+    y_log = np.log1p(y)
+
+    season = snapshot.column('season_start_year')
+    train_mask = has_target & (season < snapshot.schema['split_year'])
+    test_mask = has_target & (season >= snapshot.schema['split_year'])
+
+    return snapshot.X[train_mask], snapshot.X[test_mask], y_log[train_mask], y_log[test_mask], train_mask, test_mask
+
+
+# MAE and R² in euros for log predictions
+def evaluate(y_test, y_pred_log):
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    y_pred = np.expm1(y_pred_log)
+    return mean_absolute_error(np.expm1(y_test), y_pred), r2_score(np.expm1(y_test), y_pred)
+
+
+# LGBM model: randomized search over time-series folds of the training rows.
+# Every candidate trains on the same binned fold datasets, loaded from the dataset cache, and
+# folds already scored on this snapshot are read from the experiment store instead of refitted.
+def tune_lgb(cache, train_rows, cv, n_iter=20, store=None):
+    import lightgbm as lgb
+    from sklearn.model_selection import ParameterSampler
+
+    candidates = list(ParameterSampler(param_grid_lgb, n_iter=n_iter, random_state=42))
+    folds = [(train_rows[fold_train_idx], train_rows[fold_val_idx]) for fold_train_idx, fold_val_idx in cv.split(train_rows)]
+    y = np.log1p(cache.snapshot.keys[TARGET].to_numpy(dtype=np.float64))
+    print(f"Evaluating {len(folds)} folds for each of {len(candidates)} candidates, totalling "
+          f"{len(folds) * len(candidates)} fits")
+
+    def fit_fold(params, fold_train_rows, fold_val_rows):
+        booster = cache.train(params, fold_train_rows)
+        return booster, np.mean(np.abs(booster.predict(cache.snapshot.X.iloc[fold_val_rows]) - y[fold_val_rows]))
+
+    store = store or ExperimentStore()
+    scores = store.evaluate('lgb', cache.snapshot, folds, candidates, fit_fold, TARGET,
+                            preprocessing={'bin_params': cache.bin_params, 'lightgbm': lgb.__version__})
+    return candidates[int(np.argmin(scores))]
+
+
+# HGB grid, searched with the same sampler and seed as before
+param_grid_hgb = {
     'max_iter': [500, 700, 1000],
     'learning_rate': [0.05, 0.07, 0.1],
     'max_depth': [4, 6, 8],
@@ -171,43 +115,301 @@ param_grid = {
     'l2_regularization': [0, 1, 5]
 }
 
-search_hgb = RandomizedSearchCV(
-    estimator=hgb,
-    param_distributions=param_grid,
-    n_iter=20,
-    scoring='neg_mean_absolute_error',
-    cv=3,
-    n_jobs=1,
-    verbose=2,
-    random_state=42
-)
-search_hgb.fit(X_train_hgb, y_train)
-best_hgb = search_hgb.best_estimator_
-print("\nBest HGB params:", search_hgb.best_params_)
-
-# Evaluate HGB
-y_pred_log_hgb = best_hgb.predict(X_test_hgb)
-y_pred_hgb = np.expm1(y_pred_log_hgb)
-mae_hgb = mean_absolute_error(np.expm1(y_test), y_pred_hgb)
-r2_hgb = r2_score(np.expm1(y_test), y_pred_hgb)
-print(f"\nHGB MAE: €{mae_hgb:,.0f}")
-print(f"HGB R²: {r2_hgb:.3f}")
-
-# Baseline
-baseline_pred = np.full(shape=len(y_test), fill_value=np.expm1(y_train.mean()))
-baseline_mae = mean_absolute_error(np.expm1(y_test), baseline_pred)
-print(f"\nBaseline MAE (mean prediction): €{baseline_mae:,.0f}")
-print(f"MAE improvement: €{baseline_mae - mae:,.0f}")
-
-# Save model(s)
-
-model_path = os.path.join(models_dir, 'lgb_market_value_model.pkl')
-joblib.dump(best_lgb, model_path)
-print("\nSaved lgb model")
+
+# HGB model, trained on scaled numeric features. 3-fold CV as in RandomizedSearchCV(cv=3),
+# with folds read from the experiment store when they were scored before; the best
+# candidate is refit on all training rows.
+def tune_hgb(snapshot, train_rows, X_train, X_test, y_train, scaled_features, n_iter=20, store=None):
+    import sklearn
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.model_selection import KFold, ParameterSampler
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    X_train_hgb = X_train.copy()
+    X_test_hgb = X_test.copy()
+    X_train_hgb[scaled_features] = scaler.fit_transform(X_train_hgb[scaled_features])
+    X_test_hgb[scaled_features] = scaler.transform(X_test_hgb[scaled_features])
+
+    estimator_params = {'random_state': 42, 'early_stopping': True}
+    candidates = list(ParameterSampler(param_grid_hgb, n_iter=n_iter, random_state=42))
+    fold_positions = list(KFold(n_splits=3).split(X_train_hgb))
+    folds = [(train_rows[fold_train_idx], train_rows[fold_val_idx]) for fold_train_idx, fold_val_idx in fold_positions]
+    print(f"Evaluating {len(folds)} folds for each of {len(candidates)} HGB candidates")
+
+    def fit_fold(params, fold_train_rows, fold_val_rows):
+        # Snapshot rows -> positions in X_train_hgb (train_rows is sorted)
+        fold_train_idx = np.searchsorted(train_rows, fold_train_rows)
+        fold_val_idx = np.searchsorted(train_rows, fold_val_rows)
+        model = HistGradientBoostingRegressor(**estimator_params, **params)
+        model.fit(X_train_hgb.iloc[fold_train_idx], y_train.iloc[fold_train_idx])
+        return model, np.mean(np.abs(model.predict(X_train_hgb.iloc[fold_val_idx]) - y_train.iloc[fold_val_idx]))
+
+    store = store or ExperimentStore()
+    scores = store.evaluate('hgb', snapshot, folds, candidates, fit_fold, TARGET, preprocessing={
+        'scaled_features': scaled_features, 'estimator': estimator_params, 'sklearn': sklearn.__version__,
+    })
+    best_params = candidates[int(np.argmin(scores))]
+    best_hgb = HistGradientBoostingRegressor(**estimator_params, **best_params).fit(X_train_hgb, y_train)
+    return best_hgb, best_params, scaler, X_train_hgb, X_test_hgb
+
+
+# Ensemble: blend weights are learned on the last time-series fold of the training data.
+# The LGB fold model reuses that fold's cached dataset from the search.
+def fit_ensemble(best_lgb, best_hgb, scaler, scaled_features, X_train, X_train_hgb, y_train, cv,
+                 cache, train_rows, lgb_params):
+    from sklearn.base import clone
+    from ensemble import EnsembleModel, fit_blend_weights
+
+    fold_train_idx, fold_val_idx = list(cv.split(X_train))[-1]
+    fold_lgb = cache.train(lgb_params, train_rows[fold_train_idx])
+    fold_hgb = clone(best_hgb).fit(X_train_hgb.iloc[fold_train_idx], y_train.iloc[fold_train_idx])
+    blend_weights = fit_blend_weights(
+        [fold_lgb.predict(X_train.iloc[fold_val_idx]), fold_hgb.predict(X_train_hgb.iloc[fold_val_idx])],
+        y_train.iloc[fold_val_idx],
+    )
+    return EnsembleModel(best_lgb, best_hgb, scaler, scaled_features, X_train.columns, blend_weights), blend_weights
+
+
+# Segment models: goalkeepers and outfield players refit with the tuned LGB params
+def fit_segment_models(snapshot, train_mask, test_mask, X_train, X_test, y_train, y_test, params):
+    import lightgbm as lgb
+
+    segments = model_registry.position_segment(snapshot)
+    train_segments = segments[train_mask]
+    test_segments = segments[test_mask]
+
+    segment_models = {}
+    for segment in ['goalkeeper', 'outfield']:
+        seg_train = train_segments == segment
+        seg_test = test_segments == segment
+        if seg_train.sum() < 100 or seg_test.sum() == 0:
+            print(f"Skipping {segment} model: not enough rows")
+            continue
+
+        seg_model = lgb.LGBMRegressor(random_state=42, n_jobs=-1, verbose=-1, **params)
+        seg_model.fit(X_train[seg_train], y_train[seg_train])
+
+        seg_mae, seg_r2 = evaluate(y_test[seg_test], seg_model.predict(X_test[seg_test]))
+        print(f"{segment.capitalize()} LGB MAE: €{seg_mae:,.0f}, R²: {seg_r2:.3f}")
+
+        segment_models[segment] = (seg_model, {'mae': seg_mae, 'r2': seg_r2, 'train_rows': int(seg_train.sum())})
+    return segment_models
+
+
+# Quantile models for P10/P50/P90 bands, with the tuned LGB params (all of the tuned trees)
+def fit_quantiles(X_train, X_test, y_train, y_test, params):
+    from quantiles import QUANTILES, fit_quantile_models, pinball_loss
+
+    quantile_model = fit_quantile_models(X_train, y_train, params)
+
+    q_pred = quantile_model.predict_quantiles(X_test)
+    coverage = np.mean((y_test.to_numpy() >= q_pred[:, 0]) & (y_test.to_numpy() <= q_pred[:, -1]))
+    quantile_metrics = {'coverage': coverage}
+    for i, alpha in enumerate(QUANTILES):
+        quantile_metrics[f'pinball_p{int(alpha * 100)}'] = pinball_loss(y_test, q_pred[:, i], alpha)
+    print(f"\nP{int(QUANTILES[0] * 100)}-P{int(QUANTILES[-1] * 100)} coverage on test: {coverage:.1%} "
+          f"(expected {QUANTILES[-1] - QUANTILES[0]:.0%})")
+    print("Pinball loss (log scale): " + ", ".join(
+        f"P{int(alpha * 100)} {quantile_metrics[f'pinball_p{int(alpha * 100)}']:.4f}" for alpha in QUANTILES))
+
+    params = {**params, 'quantiles': list(QUANTILES)}
+    return quantile_model, params, quantile_metrics
+
+
+# Forecasts 1-3 seasons ahead, one model per horizon with the tuned LGB params. Each is evaluated on the
+# test seasons against the naive forecast that the value stays at the current season's.
+def fit_horizons(snapshot, params):
+    from horizons import fit_horizon_models, horizon_masks, horizon_target
+
+    horizon_model = fit_horizon_models(snapshot, params)
+
+    test_masks = [horizon_masks(snapshot, h)[1] for h in horizon_model.horizons]
+    test_rows = np.flatnonzero(np.any(test_masks, axis=0))
+    P = horizon_model.predict_horizons(snapshot.matrix[test_rows])
+
+    current = snapshot.keys[TARGET].to_numpy(dtype=np.float64)
+    horizon_metrics = {}
+    print()
+    for i, h in enumerate(horizon_model.horizons):
+        test_mask = test_masks[i]
+        in_test = test_mask[test_rows]
+        # Both forecasts are scored on the same rows: test rows that also have a current value
+        has_current = ~np.isnan(current[test_mask])
+        y_test = np.log1p(snapshot.keys[horizon_target(h)].to_numpy(dtype=np.float64)[test_mask][has_current])
+        mae, r2 = evaluate(y_test, P[in_test, i][has_current])
+        naive_mae, _ = evaluate(y_test, np.log1p(current[test_mask][has_current]))
+        print(f"+{h} season LGB MAE: €{mae:,.0f}, R²: {r2:.3f} (same value as now: €{naive_mae:,.0f}, "
+              f"{int(has_current.sum())} test rows)")
+        horizon_metrics[f'h{h}'] = {'mae': mae, 'r2': r2, 'naive_mae': naive_mae,
+                                    'train_rows': int(horizon_masks(snapshot, h)[0].sum()),
+                                    'test_rows': int(has_current.sum())}
+
+    return horizon_model, {**params, 'horizons': list(horizon_model.horizons)}, horizon_metrics
+
 
 # Feature importance
-best_model = best_lgb if mae < mae_hgb else best_hgb
-result = permutation_importance(best_model, X_test, y_test, n_repeats=10, random_state=42, n_jobs=-1)
-feat_importance = pd.Series(result.importances_mean, index=X_train.columns).sort_values(ascending=False)
-print("\nTop 15 important features:")
-print(feat_importance.head(15))
+def feature_importance(model, X_test, y_test):
+    from sklearn.inspection import permutation_importance
+
+    result = permutation_importance(model, X_test, y_test, n_repeats=10, random_state=42, n_jobs=-1)
+    return pd.Series(result.importances_mean, index=X_test.columns).sort_values(ascending=False)
+
+
+def main(argv=None):
+    argparse.ArgumentParser(description="Tune, evaluate and register the market value models").parse_args(argv)
+
+    import lightgbm as lgb
+    from sklearn.model_selection import TimeSeriesSplit
+
+    # Load the published features snapshot, the model trains on its feature matrix as is
+    snapshot = feature_store.load_snapshot()
+    print(f"Loaded features snapshot {snapshot.schema_hash[:12]} ({len(snapshot)} rows)")
+
+    # Fingerprint of the training data, stored in every model manifest
+    data_hash = snapshot.schema['data_hash']
+    split_year = snapshot.schema['split_year']
+
+    X_train, X_test, y_train, y_test, train_mask, test_mask = split_snapshot(snapshot)
+
+    low_variance_cols = snapshot.schema['dropped_low_variance']
+    print(f"Dropped {len(low_variance_cols)} low-variance columns")
+    print(f"Train samples: {len(X_train)}, Test samples: {len(X_test)}")
+
+    feature_list = list(X_train.columns)
+    scaled_features = [c for c in numeric_features if c in X_train.columns]
+
+    # Binned LightGBM datasets per fold, reused by later runs on the same snapshot
+    cache = DatasetCache(snapshot)
+    cache.prune()
+    train_rows = np.flatnonzero(train_mask)
+
+    # Scored search folds, shared by the LGB and HGB searches of every run
+    store = ExperimentStore()
+
+    tscv = TimeSeriesSplit(n_splits=3)
+    start = time.perf_counter()
+    lgb_params = tune_lgb(cache, train_rows, tscv, store=store)
+    print(f"LGB search took {time.perf_counter() - start:.1f}s ({cache.summary()}; {store.summary()})")
+    print("Best LGB params:", lgb_params)
+
+    # The registered model is refit through the sklearn wrapper, which the ensemble,
+    # prediction and importance code use
+    best_lgb = lgb.LGBMRegressor(random_state=42, n_jobs=-1, verbose=-1, **lgb_params).fit(X_train, y_train)
+
+    mae, r2 = evaluate(y_test, best_lgb.predict(X_test))
+    print(f"\nLGB MAE: €{mae:,.0f}")
+    print(f"LGB R²: {r2:.3f}")
+
+    start = time.perf_counter()
+    best_hgb, hgb_params, scaler, X_train_hgb, X_test_hgb = tune_hgb(
+        snapshot, train_rows, X_train, X_test, y_train, scaled_features, store=store,
+    )
+    print(f"HGB search took {time.perf_counter() - start:.1f}s ({store.summary()})")
+    # Fold models of earlier snapshots are never read again
+    store.prune_models(snapshot_id(snapshot, TARGET))
+    print("\nBest HGB params:", hgb_params)
+
+    # Evaluate HGB
+    mae_hgb, r2_hgb = evaluate(y_test, best_hgb.predict(X_test_hgb))
+    print(f"\nHGB MAE: €{mae_hgb:,.0f}")
+    print(f"HGB R²: {r2_hgb:.3f}")
+
+    ensemble_model, blend_weights = fit_ensemble(
+        best_lgb, best_hgb, scaler, scaled_features, X_train, X_train_hgb, y_train, tscv,
+        cache, train_rows, lgb_params,
+    )
+    print(f"\nEnsemble weights: LGB {blend_weights[0]:.2f}, HGB {blend_weights[1]:.2f}")
+    mae_ens, r2_ens = evaluate(y_test, ensemble_model.predict(X_test))
+    print(f"Ensemble MAE: €{mae_ens:,.0f}")
+    print(f"Ensemble R²: {r2_ens:.3f}")
+
+    # Baseline
+    baseline_mae, _ = evaluate(y_test, np.full(shape=len(y_test), fill_value=y_train.mean()))
+    print(f"\nBaseline MAE (mean prediction): €{baseline_mae:,.0f}")
+    print(f"MAE improvement: €{baseline_mae - mae:,.0f}")
+
+    segment_models = fit_segment_models(
+        snapshot, train_mask, test_mask, X_train, X_test, y_train, y_test, lgb_params,
+    )
+    quantile_model, quantile_params, quantile_metrics = fit_quantiles(
+        X_train, X_test, y_train, y_test, lgb_params,
+    )
+    horizon_model, horizon_params, horizon_metrics = fit_horizons(snapshot, lgb_params)
+
+    # Save model(s) to the registry as new versions, bound to the snapshot's feature schema
+    model_extra = {'split_year': split_year, 'target': f'log1p({TARGET})', 'schema_hash': snapshot.schema_hash}
+
+    lgb_version = model_registry.register_model(
+        'lgb_market_value', best_lgb, feature_list,
+        params=lgb_params,
+        metrics={'mae': mae, 'r2': r2, 'baseline_mae': baseline_mae},
+        data_hash=data_hash,
+        extra=model_extra,
+    )
+    print(f"\nSaved lgb model as lgb_market_value:{lgb_version}")
+
+    hgb_version = model_registry.register_model(
+        'hgb_market_value',
+        {'model': best_hgb, 'scaler': scaler, 'scaled_features': scaled_features},
+        feature_list,
+        params=hgb_params,
+        metrics={'mae': mae_hgb, 'r2': r2_hgb, 'baseline_mae': baseline_mae},
+        data_hash=data_hash,
+        extra=model_extra,
+    )
+    print(f"Saved hgb model and scaler as hgb_market_value:{hgb_version}")
+
+    ens_version = model_registry.register_model(
+        'ensemble_market_value', ensemble_model, feature_list,
+        params={'weights': {'lgb': blend_weights[0], 'hgb': blend_weights[1]}},
+        metrics={'mae': mae_ens, 'r2': r2_ens, 'baseline_mae': baseline_mae},
+        data_hash=data_hash,
+        extra={
+            **model_extra,
+            'components': {'lgb': f'lgb_market_value:{lgb_version}', 'hgb': f'hgb_market_value:{hgb_version}'},
+        },
+    )
+    print(f"Saved ensemble model as ensemble_market_value:{ens_version}")
+
+    for segment, (seg_model, seg_metrics) in segment_models.items():
+        seg_version = model_registry.register_model(
+            f'lgb_{segment}', seg_model, feature_list,
+            params=lgb_params,
+            metrics=seg_metrics,
+            data_hash=data_hash,
+            extra={**model_extra, 'segment': segment},
+        )
+        print(f"Saved {segment} model as lgb_{segment}:{seg_version}")
+
+    q_version = model_registry.register_model(
+        'lgb_quantiles_market_value', quantile_model, feature_list,
+        params=quantile_params,
+        metrics=quantile_metrics,
+        data_hash=data_hash,
+        extra=model_extra,
+    )
+    print(f"Saved quantile models as lgb_quantiles_market_value:{q_version}")
+
+    h_version = model_registry.register_model(
+        'lgb_horizons_market_value', horizon_model, feature_list,
+        params=horizon_params,
+        metrics=horizon_metrics,
+        data_hash=data_hash,
+        extra={**model_extra, 'targets': {f'h{h}': f'log1p(value_next_{h})' for h in horizon_model.horizons}},
+    )
+    print(f"Saved horizon models as lgb_horizons_market_value:{h_version}")
+
+    # Sketches of the training features, new seasons are checked against them without re-reading this data
+    drift_baseline = drift_monitor.baseline_from_snapshot(snapshot)
+    drift_monitor.save_baseline(drift_baseline)
+    print("Saved drift baseline to:", drift_monitor.baseline_path)
+
+    best_model = best_lgb if mae < mae_hgb else best_hgb
+    feat_importance = feature_importance(best_model, X_test, y_test)
+    print("\nTop 15 important features:")
+    print(feat_importance.head(15))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+import time
+import argparse
+from itertools import product
+
+import pandas as pd
+import numpy as np
+
+import feature_store
+import model_registry
+import predict_model
+from career_state import EWM_ALPHA, per_90
+
+# Raw inputs that can be perturbed, each applied as a delta to the player's actual season
+PERTURBATIONS = ['extra_contract_years', 'extra_minutes', 'extra_goals', 'extra_assists']
+
+POSITIONS = ['Attack', 'Midfield', 'Defender', 'Goalkeeper']
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+
+# Scores grids of raw-input changes for one player-season. Only the derived features that depend
+# on the changed inputs are recomputed; every other feature keeps the player's snapshot value.
+# Rows are scored by the same routed segment models as predict_model.py unless a model_name is given.
+class WhatIfSimulator:
+    def __init__(self, snapshot=None, model_name=None):
+        self.snapshot = snapshot or feature_store.load_snapshot()
+        self.model_name = model_name
+        self.labels = model_registry.segment_labels(self.snapshot, predict_model.segment_by)
+
+        self.features = self.snapshot.feature_columns
+        self.col = {c: i for i, c in enumerate(self.features)}
+        self.player_ids = self.snapshot.column('player_id')
+        self.seasons = self.snapshot.column('season_start_year')
+        self.contract_years = self.snapshot.column('contract_remaining_years')
+
+    # All rows of the player-season, one per competition
+    def locate(self, player_id, season_start_year):
+        rows = np.flatnonzero((self.player_ids == player_id) & (self.seasons == season_start_year))
+        if len(rows) == 0:
+            raise KeyError(f"Player {player_id} has no row for season {season_start_year}")
+        return rows
+
+    # The row's segment model, or the model asked for
+    def _model(self, row):
+        name = self.model_name or model_registry.route_model(
+            self.labels[row], predict_model.segment_routes, predict_model.default_model,
+        )
+        model, manifest = model_registry.load_model(name)
+        self.snapshot.check(manifest.get('schema_hash'), what=f"Model {name}:{manifest['version']}")
+        return model
+
+    # Current log prediction of each row
+    def _base(self, rows):
+        if self.model_name is None:
+            predictions, _ = model_registry.predict_routed(
+                self.snapshot, predict_model.segment_by, predict_model.segment_routes, predict_model.default_model,
+                rows=rows,
+            )
+            return predictions
+        return self._model(rows[0]).predict(self.snapshot.X.iloc[rows])
+
+    # Player- and team-level context that stays fixed across the grid
+    def _context(self, row):
+        keys = self.snapshot.keys
+        value = lambda name: float(self.snapshot.column(name)[row])
+
+        player_rows = np.flatnonzero(self.player_ids == self.player_ids[row])
+        seasons_played = int(np.searchsorted(player_rows, row)) + 1
+
+        team_rows = np.flatnonzero(
+            (keys['team_id'].to_numpy() == keys['team_id'].iat[row]) & (self.seasons == self.seasons[row])
+        )
+        team_players = keys['player_id'].iloc[team_rows].nunique()
+
+        # Rows sharing the player's main position and season, for the *_vs_pos_avg features
+        position_cols = [f'main_position_{p}' for p in POSITIONS if self.snapshot.has_column(f'main_position_{p}')]
+        same_position = np.ones(len(self.snapshot), dtype=bool)
+        for col in position_cols:
+            flags = self.snapshot.column(col)
+            same_position &= flags == flags[row]
+        pos_rows = np.flatnonzero(same_position & (self.seasons == self.seasons[row]))
+        pos_goals = self.snapshot.column('goals')[pos_rows].astype(np.float64)
+        pos_assists = self.snapshot.column('assists')[pos_rows].astype(np.float64)
+
+        return {
+            'goals': value('goals'),
+            'assists': value('assists'),
+            'minutes': value('minutes_played'),
+            'contract_years': value('contract_remaining_years'),
+            # contract_remaining_ratio is relative to the longest contract seen up to this season
+            'max_contract_years': float(np.nanmax(self.contract_years[self.seasons <= self.seasons[row]])),
+            'age': value('age'),
+            'seasons_played': seasons_played,
+            'career_goals_contrib_prev': value('career_goals_contrib_prev'),
+            'goals_last_season': value('goals') - value('goals_change_vs_last_season'),
+            'assists_last_season': value('assists') - value('assists_change_vs_last_season'),
+            'minutes_last_season': value('minutes_last_season'),
+            'ewm_goals_contrib': value('ewm_goals_contrib'),
+            'team_total_goals': value('team_total_goals'),
+            'team_rows': len(team_rows),
+            'team_players': team_players,
+            'pos_rows': len(pos_rows),
+            'pos_total_goals': pos_goals.sum(),
+            'pos_total_assists': pos_assists.sum(),
+        }
+
+    # Derived features as arrays over the grid, same formulas as feature_engineering.py
+    def _derived(self, ctx, goals, assists, minutes, contract_years):
+        gc = goals + assists
+        n = ctx['seasons_played']
+        base_gc = ctx['goals'] + ctx['assists']
+
+        d = {
+            'goals': goals,
+            'assists': assists,
+            'minutes_played': minutes,
+            'contract_remaining_years': contract_years,
+            'goal_contributions': gc,
+            'goals_per_90_season': per_90(goals, minutes),
+            'assists_per_90_season': per_90(assists, minutes),
+            'goals_contrib_per_90_season': per_90(gc, minutes),
+            'avg_goals_contrib_per_season': (ctx['career_goals_contrib_prev'] + gc) / n,
+            'short_contract': (contract_years <= 1).astype(np.float64),
+            'contract_remaining_ratio': _ratio(contract_years, np.maximum(ctx['max_contract_years'], contract_years)),
+            'goals_change_vs_last_season': goals - ctx['goals_last_season'] if n > 1 else np.zeros_like(goals),
+            'assists_change_vs_last_season': assists - ctx['assists_last_season'] if n > 1 else np.zeros_like(goals),
+            'minutes_change_vs_last_season': minutes - ctx['minutes_last_season'],
+        }
+        d['trusted_goals_contrib'] = d['goals_contrib_per_90_season'] * np.log1p(minutes)
+        d['contract_pressure_score'] = d['goals_contrib_per_90_season'] / (1 + contract_years)
+        d['hot_transfer_candidate'] = (
+            (contract_years <= 1) & (ctx['age'] < 25) & (d['avg_goals_contrib_per_season'] > 5)
+        ).astype(np.float64)
+
+        # ewm_goals_contrib: undo this season's step to get last season's level, then redo it
+        if n > 1:
+            prev_ewm = (ctx['ewm_goals_contrib'] - EWM_ALPHA * base_gc) / (1 - EWM_ALPHA)
+            d['ewm_goals_contrib'] = EWM_ALPHA * gc + (1 - EWM_ALPHA) * prev_ewm
+        else:
+            d['ewm_goals_contrib'] = gc
+
+        # Team totals move with the player's own goals
+        team_total = ctx['team_total_goals'] + (goals - ctx['goals'])
+        d['team_total_goals'] = team_total
+        d['team_avg_goals'] = team_total / ctx['team_rows']
+        d['team_avg_goals_per_player'] = team_total / ctx['team_players']
+
+        # Position-season averages also include the player's own changed season
+        pos_goals = (ctx['pos_total_goals'] + goals - ctx['goals']) / ctx['pos_rows']
+        pos_assists = (ctx['pos_total_assists'] + assists - ctx['assists']) / ctx['pos_rows']
+        for feature, raw, mean in [
+            ('goals_vs_pos_avg', goals, pos_goals),
+            ('assists_vs_pos_avg', assists, pos_assists),
+            ('goal_contrib_vs_pos_avg', gc, pos_goals + pos_assists),
+        ]:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                d[feature] = np.where(mean > 0, raw / mean, 0.0)
+        return d
+
+    # Log predictions of one row under every scenario, scored in one batched call
+    def _score_grid(self, row, deltas, n_scenarios):
+        ctx = self._context(row)
+        zeros = np.zeros(n_scenarios)
+
+        goals = ctx['goals'] + deltas.get('extra_goals', zeros)
+        assists = ctx['assists'] + deltas.get('extra_assists', zeros)
+        minutes = np.maximum(ctx['minutes'] + deltas.get('extra_minutes', zeros), 0)
+        contract_years = np.maximum(ctx['contract_years'] + deltas.get('extra_contract_years', zeros), 0)
+
+        # Base feature vector repeated once per scenario, then the dependent columns overwritten
+        M = np.repeat(self.snapshot.matrix[row:row + 1].astype(np.float32), n_scenarios, axis=0)
+        for feature, values in self._derived(ctx, goals, assists, minutes, contract_years).items():
+            if feature in self.col:
+                M[:, self.col[feature]] = values
+
+        return self._model(row).predict(pd.DataFrame(M, columns=self.features, copy=False))
+
+    # grid: {perturbation: list of deltas}. Each of the player-season's competition rows is scored under every
+    # combination, and like predict_model.py the largest prediction across them is the season's valuation.
+    def simulate(self, player_id, season_start_year, grid):
+        rows = self.locate(player_id, season_start_year)
+
+        names = [p for p in PERTURBATIONS if p in grid]
+        combos = np.array(list(product(*[grid[p] for p in names])), dtype=np.float64).reshape(-1, len(names))
+        deltas = {p: combos[:, i] for i, p in enumerate(names)}
+
+        predicted = np.expm1(np.max([self._score_grid(row, deltas, len(combos)) for row in rows], axis=0))
+        base_predicted = float(np.expm1(np.max(self._base(rows))))
+
+        result = pd.DataFrame({p: deltas[p] for p in names})
+        result['predicted_value'] = predicted
+        result['change_vs_current'] = predicted - base_predicted
+        return result, base_predicted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate how a player's valuation moves under changed inputs")
+    parser.add_argument('--player-id', type=int, required=True)
+    parser.add_argument('--season', type=int, required=True)
+    parser.add_argument('--extra-contract-years', type=float, nargs='+', default=[0, 1, 2, 3])
+    parser.add_argument('--extra-minutes', type=float, nargs='+', default=[0, 450, 900])
+    parser.add_argument('--extra-goals', type=float, nargs='+', default=[0, 1, 2, 3, 4, 5])
+    parser.add_argument('--extra-assists', type=float, nargs='+', default=[0])
+    parser.add_argument('--model', default=None,
+                        help="Score with this registered model instead of the routed segment models")
+    args = parser.parse_args(argv)
+
+    # Turn off scientific notation and force commas
+    pd.options.display.float_format = '{:,.0f}'.format
+
+    simulator = WhatIfSimulator(model_name=args.model)
+    grid = {
+        'extra_contract_years': args.extra_contract_years,
+        'extra_minutes': args.extra_minutes,
+        'extra_goals': args.extra_goals,
+        'extra_assists': args.extra_assists,
+    }
+
+    start = time.perf_counter()
+    result, base = simulator.simulate(args.player_id, args.season, grid)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"Current predicted value: €{base:,.0f}")
+    print(result.sort_values('predicted_value', ascending=False).to_string(index=False))
+    print(f"\n{len(result)} scenarios scored in {elapsed_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()